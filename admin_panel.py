@@ -5,52 +5,826 @@ Modern Admin Panel - Giao diện quản trị hiện đại với Sidebar Naviga
 Full screen, với sidebar menu chuyên nghiệp
 """
 
+import os
 import sys
 import logging as log
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache, partial
+from html import escape
+from concurrent.futures import ThreadPoolExecutor
+from statistics import fmean
+from typing import Optional
 
-import cv2
-import numpy as np
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QFileDialog, QStackedWidget,
-    QTableWidget, QTableWidgetItem, QHeaderView,
+    QTableView, QHeaderView, QStyledItemDelegate, QStyleOptionViewItem,
     QAbstractItemView, QDialog, QDialogButtonBox, QFormLayout,
     QLineEdit, QDoubleSpinBox, QMessageBox, QFrame,
-    QGridLayout, QScrollArea, QSpinBox, QComboBox, QStatusBar
+    QGridLayout, QScrollArea, QSpinBox, QComboBox, QStatusBar, QApplication,
+    QProgressDialog
 )
-from PyQt5.QtCore import Qt, QTimer, QSize, pyqtSignal, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QFont, QPixmap, QImage, QIcon, QPalette, QColor
+from PyQt5.QtCore import (
+    Qt, QTimer, QSize, pyqtSignal, QPropertyAnimation, QEasingCurve,
+    QObject, QRunnable, QThread, QThreadPool, QAbstractTableModel, QModelIndex
+)
+from PyQt5.QtGui import QFont, QPixmap, QPixmapCache, QImage, QIcon, QPalette, QColor
 
 from database import Database
 from models import CustomerSegment, EventType
 
 # Import các dialog cần thiết
+# (CustomerManagementDialog kéo theo cv2 + utils nên được import lazy trong manage_customers)
 from user_management_dialog import UserManagementDialog
-from customer_management_dialog import CustomerManagementDialog
-
-# Import OpenVINO and face recognition modules
-try:
-    from openvino import Core, get_version
-except ImportError:
-    print("Vui lòng cài đặt OpenVINO: pip install openvino")
-    Core = None
-    get_version = None
-
-try:
-    from utils import (
-        FaceDetector,
-        LandmarksDetector,
-        FaceIdentifier,
-        FacesDatabase
-    )
-except ImportError:
-    print("Không thể import utils. Vui lòng đảm bảo file utils.py tồn tại.")
-    FaceDetector = None
-    LandmarksDetector = None
-    FaceIdentifier = None
-    FacesDatabase = None
+
+
+# OpenVINO, utils (và cv2 đi kèm) chỉ được import khi thực sự load models
+def _get_openvino():
+    """Import OpenVINO lazily, returns (Core, get_version) or (None, None)"""
+    try:
+        from openvino import Core, get_version
+    except ImportError:
+        print("Vui lòng cài đặt OpenVINO: pip install openvino")
+        return None, None
+    return Core, get_version
+
+
+def _get_face_modules():
+    """Import face recognition modules lazily, returns None if unavailable"""
+    try:
+        from utils import (
+            FaceDetector,
+            LandmarksDetector,
+            FaceIdentifier,
+            FacesDatabase,
+            get_core,
+            resolve_model_path
+        )
+    except ImportError:
+        print("Không thể import utils. Vui lòng đảm bảo file utils.py tồn tại.")
+        return None
+    return (FaceDetector, LandmarksDetector, FaceIdentifier, FacesDatabase,
+            get_core, resolve_model_path)
+
+
+# Nhãn hiển thị cho event type (dùng chung cho dialog và các bảng)
+EVENT_TYPE_LABELS = {
+    EventType.VIP_DETECTED: "VIP",
+    EventType.NEW_CUSTOMER: "Khách mới",
+    EventType.REGULAR_VISIT: "Khách thường",
+    EventType.BLACKLIST: "Blacklist",
+    EventType.UNKNOWN: "Unknown",
+}
+
+
+def _format_timestamp(ts):
+    """Format datetime as 'YYYY-MM-DD HH:MM:SS' (isoformat nhanh hơn strftime)"""
+    return ts.isoformat(sep=' ', timespec='seconds') if ts else "N/A"
+
+
+@lru_cache(maxsize=64)
+def _camera_label(camera_id):
+    """Camera column text, built once per camera"""
+    return f"Camera #{camera_id}" if camera_id else "N/A"
+
+
+# Một dòng (nhãn, giá trị) của info block trong detail dialog, style như DetailLabel
+DETAIL_ROW_HTML = ("<tr><td style='color:#64748b; font-weight:600; font-size:13px; "
+                   "padding:6px 12px 6px 0'>{}</td><td style='padding:6px 0'>{}</td></tr>")
+
+
+def _detail_table_html(details):
+    """Render (label, value) pairs thành một HTML table (value đã escape)"""
+    rows = "".join(DETAIL_ROW_HTML.format(escape(label), escape(str(value)))
+                   for label, value in details)
+    return f"<table cellspacing='0'>{rows}</table>"
+
+
+# Số trang crops giữ lại (LRU) để chuyển trang qua lại không query lại database
+CROPS_PAGE_CACHE_SIZE = 5
+
+# Setting device riêng của từng model (get_model_config), theo key đường dẫn model
+MODEL_DEVICE_KEYS = {
+    'model_fd_path': 'device_fd',
+    'model_lm_path': 'device_lm',
+    'model_reid_path': 'device_reid',
+}
+
+
+def _mkfont(size, bold=False):
+    """Build a QFont once for reuse across widgets"""
+    font = QFont()
+    font.setPointSize(size)
+    font.setBold(bold)
+    return font
+
+
+# Font dùng chung (QFont là value type, copy-on-write nên share an toàn)
+TITLE_24 = _mkfont(24, True)
+TITLE_18 = _mkfont(18, True)
+TITLE_16 = _mkfont(16, True)
+HEADING_14 = _mkfont(14, True)
+VALUE_28 = _mkfont(28, True)
+
+
+# Stylesheet dùng chung cho toàn bộ admin panel - parse một lần, widget chọn rule qua objectName
+ADMIN_STYLESHEET = """
+QWidget#ContentArea {
+    background-color: #f8fafc;
+}
+QFrame#Header {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 #6366f1, stop:1 #8b5cf6);
+    border: none;
+}
+QFrame#Header QLabel {
+    color: white;
+    border: none;
+}
+QLabel#HeaderLogo {
+    font-size: 36px;
+}
+QLabel#HeaderSubtitle {
+    color: rgba(255,255,255,0.8);
+    font-size: 12px;
+}
+QLabel#HeaderUser {
+    font-size: 14px;
+    font-weight: 600;
+}
+QFrame#Sidebar {
+    background-color: white;
+    border-right: 1px solid #e2e8f0;
+}
+QLabel#NavTitle {
+    color: #94a3b8;
+    font-size: 11px;
+    font-weight: 700;
+    padding: 8px 12px;
+}
+QLabel#VersionLabel {
+    color: #cbd5e1;
+    font-size: 11px;
+    padding: 8px 12px;
+}
+QPushButton#SidebarButton {
+    background-color: transparent;
+    color: #64748b;
+    border: none;
+    border-radius: 8px;
+    padding: 12px 16px;
+    text-align: left;
+    font-size: 14px;
+    font-weight: 500;
+}
+QPushButton#SidebarButton:hover {
+    background-color: #f1f5f9;
+    color: #1e293b;
+}
+QPushButton#SidebarButton[active="true"] {
+    background-color: #6366f1;
+    color: white;
+    font-weight: 600;
+}
+QStatusBar {
+    background-color: white;
+    color: #64748b;
+    border-top: 1px solid #e2e8f0;
+    padding: 8px;
+}
+QLabel#PageTitle, QLabel#DialogHeader {
+    color: #0f172a;
+}
+QLabel#PageDescription {
+    color: #64748b;
+    font-size: 14px;
+    margin-bottom: 16px;
+}
+QLabel#InfoBox {
+    color: #64748b;
+    background-color: #f8fafc;
+    padding: 16px;
+    border-radius: 8px;
+    border: none;
+    margin-top: 12px;
+}
+QLabel#FieldLabel, QLabel#PaginationLabel {
+    color: #475569;
+    font-weight: 600;
+}
+QLabel#PaginationLabel {
+    padding: 0 16px;
+}
+QFrame#ModernCard {
+    background-color: white;
+    border-radius: 12px;
+    border: 1px solid #e2e8f0;
+}
+QLabel#CardTitle {
+    color: #1e293b;
+    border: none;
+}
+QFrame#StatsCard QLabel {
+    color: white;
+    border: none;
+}
+QLabel#StatsIcon {
+    font-size: 32px;
+}
+QLabel#StatsTitle {
+    color: rgba(255,255,255,0.9);
+    font-size: 13px;
+    font-weight: 600;
+}
+QTableView {
+    border: none;
+    background-color: transparent;
+    gridline-color: #e2e8f0;
+}
+QTableView::item {
+    padding: 12px;
+}
+QTableView::item:selected {
+    background-color: #e0e7ff;
+    color: #1e293b;
+}
+QHeaderView::section {
+    background-color: #f8fafc;
+    color: #475569;
+    padding: 12px;
+    border: none;
+    border-bottom: 2px solid #e2e8f0;
+    font-weight: 600;
+}
+QTableView#ActivityTable::item {
+    padding: 8px;
+}
+QTableView#ActivityTable QHeaderView::section {
+    padding: 10px;
+}
+QDialog#DetailDialog {
+    background-color: #f8fafc;
+}
+QLabel#DetailLabel {
+    color: #64748b;
+    font-weight: 600;
+    font-size: 13px;
+}
+QLabel#DetailValue {
+    color: #0f172a;
+    font-size: 14px;
+}
+QLabel#ErrorLabel {
+    color: #ef4444;
+}
+QPushButton#PrimaryButton {
+    background-color: #6366f1;
+    color: white;
+    border: none;
+    border-radius: 8px;
+    font-size: 14px;
+    font-weight: 600;
+    padding: 12px 24px;
+}
+QPushButton#PrimaryButton:hover {
+    background-color: #4f46e5;
+}
+QPushButton#LogoutButton {
+    background-color: rgba(255,255,255,0.2);
+    color: white;
+    border: 1px solid rgba(255,255,255,0.3);
+    border-radius: 8px;
+    padding: 0 20px;
+    font-size: 13px;
+    font-weight: 600;
+}
+QPushButton#LogoutButton:hover {
+    background-color: rgba(255,255,255,0.3);
+}
+QLineEdit#SearchInput {
+    border: 2px solid #e2e8f0;
+    border-radius: 8px;
+    padding: 0 16px;
+    font-size: 14px;
+    background-color: #f8fafc;
+}
+QLineEdit#SearchInput:focus {
+    border-color: #6366f1;
+    background-color: white;
+}
+QComboBox#FilterCombo, QComboBox#PerPageCombo {
+    border: 2px solid #e2e8f0;
+    border-radius: 8px;
+    padding: 0 16px;
+    font-size: 14px;
+    background-color: #f8fafc;
+}
+QComboBox#PerPageCombo {
+    min-width: 80px;
+}
+QComboBox#FilterCombo:focus, QComboBox#PerPageCombo:focus {
+    border-color: #6366f1;
+}
+QPushButton#ToolbarButton {
+    background-color: #6366f1;
+    color: white;
+    border: none;
+    border-radius: 8px;
+    padding: 0 24px;
+    font-size: 14px;
+    font-weight: 600;
+}
+QPushButton#ToolbarButton:hover {
+    background-color: #4f46e5;
+}
+QPushButton#PaginationButton {
+    background-color: white;
+    color: #475569;
+    border: 2px solid #e2e8f0;
+    border-radius: 8px;
+    padding: 8px 16px;
+    font-size: 13px;
+    font-weight: 600;
+}
+QPushButton#PaginationButton:hover {
+    border-color: #6366f1;
+    color: #6366f1;
+}
+QPushButton#PaginationButton:disabled {
+    color: #cbd5e1;
+    border-color: #f1f5f9;
+}
+QPushButton#ActionButton {
+    background-color: #10b981;
+    color: white;
+    border: none;
+    border-radius: 8px;
+    font-size: 15px;
+    font-weight: 600;
+    padding: 12px 32px;
+}
+QPushButton#ActionButton:hover {
+    background-color: #059669;
+}
+QPushButton#ActionButton[variant="primary"] {
+    background-color: #6366f1;
+}
+QPushButton#ActionButton[variant="primary"]:hover {
+    background-color: #4f46e5;
+}
+QPushButton#ActionButton[variant="purple"] {
+    background-color: #8b5cf6;
+}
+QPushButton#ActionButton[variant="purple"]:hover {
+    background-color: #7c3aed;
+}
+"""
+
+
+def _load_scaled_image(path: str, w: int, h: int, smooth: Optional[bool] = True) -> QImage:
+    """Decode + scale image (kết quả được cache dạng QPixmap ở QPixmapCache bởi caller)"""
+    # QImage (không phải QPixmap) để có thể decode an toàn ngoài GUI thread
+    image = QImage(path)
+    if image.isNull():
+        return image
+    if smooth is None:
+        # Tự chọn: chỉ lọc mượt khi thu nhỏ ảnh lớn (> 2x khung), ảnh nhỏ dùng nearest là đủ
+        smooth = max(image.width(), image.height()) > 2 * max(w, h)
+    mode = Qt.SmoothTransformation if smooth else Qt.FastTransformation
+    return image.scaled(w, h, Qt.KeepAspectRatio, mode)
+
+
+class PixmapLoaderSignals(QObject):
+    """Signals for PixmapLoader"""
+    loaded = pyqtSignal(QImage)
+
+
+class PixmapLoader(QRunnable):
+    """Decode + scale image trên QThreadPool, trả kết quả qua signal"""
+
+    def __init__(self, path: str, width: int, height: int, smooth: Optional[bool] = True):
+        super().__init__()
+        self.path = path
+        self.width = width
+        self.height = height
+        self.smooth = smooth
+        self.signals = PixmapLoaderSignals()
+
+    def run(self):
+        """Worker thread entry point"""
+        try:
+            image = _load_scaled_image(self.path, self.width, self.height, self.smooth)
+        except Exception as e:
+            log.error(f"Error loading image {self.path}: {e}")
+            image = QImage()
+        self.signals.loaded.emit(image)
+
+
+class DbReadSignals(QObject):
+    """Signals for DbReadTask"""
+    finished = pyqtSignal(object)
+
+
+class DbReadTask(QRunnable):
+    """Chạy một query database trên QThreadPool, trả kết quả về UI thread qua signal"""
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = DbReadSignals()
+
+    def run(self):
+        """Worker thread entry point"""
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            log.error(f"Error in database read {getattr(self.fn, '__name__', self.fn)}: {e}")
+            result = None
+        try:
+            self.signals.finished.emit(result)
+        except RuntimeError:
+            # Cửa sổ/ứng dụng đã đóng trong lúc query đang chạy
+            pass
+
+
+class ModelLoaderThread(QThread):
+    """Load OpenVINO models + FacesDatabase ngoài UI thread"""
+
+    progress_changed = pyqtSignal(str)  # Bước đang load
+    loaded = pyqtSignal(object)  # (model_config, models dict hoặc None nếu lỗi)
+
+    def __init__(self, db, reuse=None, parent=None):
+        super().__init__(parent)
+        self.db = db
+        # config key -> (path, detector) đã load trước đó, dùng lại nếu path không đổi
+        self.reuse = reuse or {}
+
+    def run(self):
+        """Thread entry point"""
+        model_config, models = {}, None
+        try:
+            # Reload model config from database (in case it was updated)
+            model_config = self.db.get_model_config()
+            models = self._load(model_config)
+        except Exception as e:
+            log.error(f"Error loading models: {e}", exc_info=True)
+        self.loaded.emit((model_config, models))
+
+    def _load(self, model_config):
+        """Build detectors + FacesDatabase, returns dict or None"""
+        model_fd_path = model_config.get('model_fd_path', '')
+        model_lm_path = model_config.get('model_lm_path', '')
+        model_reid_path = model_config.get('model_reid_path', '')
+        gallery_path = model_config.get('gallery_path', './gallery')
+        device = model_config.get('model_device', 'CPU')
+        # Device từng model, mặc định theo model_device
+        devices = {path_key: model_config.get(device_key, device)
+                   for path_key, device_key in MODEL_DEVICE_KEYS.items()}
+        use_int8 = model_config.get('use_int8', '1') == '1'
+
+        log.info(f"Loading models from config: FD={model_fd_path}, LM={model_lm_path}, ReID={model_reid_path}, Device={device}")
+
+        # Check if Core and utils are available
+        Core, get_version = _get_openvino()
+        face_modules = _get_face_modules()
+        if Core is None or face_modules is None:
+            log.error("OpenVINO or utils modules not available")
+            return None
+        (FaceDetector, LandmarksDetector, FaceIdentifier, FacesDatabase,
+         get_core, resolve_model_path) = face_modules
+
+        # Check if model files exist
+        if not all([
+            Path(model_fd_path).exists() if model_fd_path else False,
+            Path(model_lm_path).exists() if model_lm_path else False,
+            Path(model_reid_path).exists() if model_reid_path else False
+        ]):
+            log.warning(f"Model files not found. FD={model_fd_path}, LM={model_lm_path}, ReID={model_reid_path}")
+            return None
+
+        # Initialize OpenVINO Core
+        self.progress_changed.emit("Đang khởi tạo OpenVINO...")
+        # Core dùng chung giữa các lần reload; model cache đã bật sẵn trên Core
+        core = get_core()
+        log.info(f"OpenVINO Version: {get_version()}")
+
+        def load_face_detector():
+            log.info(f"Loading Face Detection model: {model_fd_path}")
+            face_detector = FaceDetector(
+                core,
+                resolve_model_path(model_fd_path, use_int8=use_int8),
+                input_size=(0, 0),
+                confidence_threshold=0.6,
+                roi_scale_factor=1.15
+            )
+            face_detector.deploy(devices['model_fd_path'])
+            return face_detector
+
+        def load_landmarks_detector():
+            log.info(f"Loading Landmarks model: {model_lm_path}")
+            landmarks_detector = LandmarksDetector(
+                core,
+                resolve_model_path(model_lm_path, use_int8=use_int8)
+            )
+            landmarks_detector.deploy(devices['model_lm_path'], 16)
+            return landmarks_detector
+
+        def load_face_identifier():
+            log.info(f"Loading Re-ID model: {model_reid_path}")
+            face_identifier = FaceIdentifier(
+                core,
+                resolve_model_path(model_reid_path, use_int8=use_int8),
+                match_threshold=0.3,
+                match_algo='HUNGARIAN'
+            )
+            face_identifier.deploy(devices['model_reid_path'], 16)
+            return face_identifier
+
+        stages = {
+            'Face Detection': ('model_fd_path', load_face_detector),
+            'Landmarks Detection': ('model_lm_path', load_landmarks_detector),
+            'Face Reidentification': ('model_reid_path', load_face_identifier),
+        }
+
+        # 3 models độc lập: compile song song (OpenVINO nhả GIL trong lúc compile)
+        self.progress_changed.emit("Đang load Face Detection, Landmarks, Re-ID models...")
+        loaded, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {}
+            for name, (path_key, load) in stages.items():
+                previous = self.reuse.get(path_key)
+                path = model_config.get(path_key, '')
+                # So cả file IR thực sự load (use_int8 có thể đã đổi)
+                if (previous is not None and previous[0] == (path, devices[path_key])
+                        and Path(previous[1].model_path) == Path(resolve_model_path(path, use_int8=use_int8))):
+                    loaded[name] = previous[1]
+                    log.info(f"✓ {name} model reused (path and device unchanged)")
+                else:
+                    futures[name] = executor.submit(load)
+
+        for name, future in futures.items():
+            try:
+                loaded[name] = future.result()
+                log.info(f"✓ {name} model loaded successfully")
+            except Exception as e:
+                errors[name] = e
+        for name, e in errors.items():
+            log.error(f"Failed to load {name} model: {e}", exc_info=e)
+        if errors:
+            raise next(iter(errors.values()))
+
+        face_detector = loaded['Face Detection']
+        landmarks_detector = loaded['Landmarks Detection']
+        face_identifier = loaded['Face Reidentification']
+
+        # Ensure gallery folder exists before loading Faces Database
+        gallery_path_obj = Path(gallery_path)
+        if not gallery_path_obj.exists():
+            log.info(f"Gallery folder does not exist, creating: {gallery_path}")
+            gallery_path_obj.mkdir(parents=True, exist_ok=True)
+
+        # Load Faces Database
+        self.progress_changed.emit("Đang xây dựng Faces Database...")
+        log.info(f"Building faces database from: {gallery_path}")
+        try:
+            faces_database = FacesDatabase(
+                gallery_path,
+                face_identifier,
+                landmarks_detector,
+                face_detector,
+                no_show=True
+            )
+            face_identifier.set_faces_database(faces_database)
+            log.info("✓ Faces database built successfully")
+        except Exception as e:
+            log.error(f"Error initializing FacesDatabase: {e}", exc_info=True)
+            raise  # Re-raise to be caught in run()
+
+        return {
+            'core': core,
+            'face_detector': face_detector,
+            'landmarks_detector': landmarks_detector,
+            'face_identifier': face_identifier,
+            'faces_database': faces_database,
+        }
+
+
+def _confidence_avg(metadata):
+    """Average confidence của event: dùng giá trị đã lưu lúc ghi, fallback fmean cho event cũ"""
+    if not metadata or not isinstance(metadata, dict):
+        return None
+    if 'confidence_avg' in metadata:
+        return metadata['confidence_avg']
+    if metadata.get('confidences'):
+        return fmean(metadata['confidences'])
+    return None
+
+
+def _event_confidence_text(event):
+    """Confidence summary từ metadata nếu có, nếu không dùng confidence của event"""
+    avg_conf = _confidence_avg(event.metadata)
+    return f"{event.confidence if avg_conf is None else avg_conf:.1f}%"
+
+
+class RecordTableModel(QAbstractTableModel):
+    """Read-only table model, columns là list (header, formatter(record) -> str)"""
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self._columns = columns
+        self._rows = []
+        # row -> tuple các chuỗi đã format, tính một lần khi row được hiển thị lần đầu
+        self._display_cache = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        # Chỉ format khi view cần hiển thị cell
+        if role == Qt.DisplayRole and index.isValid():
+            row = index.row()
+            values = self._display_cache.get(row)
+            if values is None:
+                record = self._rows[row]
+                values = tuple(formatter(record) for _, formatter in self._columns)
+                self._display_cache[row] = values
+            return values[index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._columns[section][0]
+        return super().headerData(section, orientation, role)
+
+    def set_rows(self, rows):
+        """Replace all records"""
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._display_cache = {}
+        self.endResetModel()
+
+    def row_at(self, row):
+        """Record shown at given row"""
+        return self._rows[row]
+
+
+class EventsTableModel(RecordTableModel):
+    """Model cho bảng Events"""
+
+    COLUMNS = [
+        ("ID", lambda event: str(event.id)),
+        ("Khách hàng", lambda event: event.customer_name),
+        ("Loại", lambda event: EVENT_TYPE_LABELS.get(event.event_type, event.event_type)),
+        ("Camera", lambda event: _camera_label(event.camera_id)),
+        ("Độ tin cậy", _event_confidence_text),
+        ("Thời gian", lambda event: _format_timestamp(event.timestamp)),
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(self.COLUMNS, parent)
+
+
+class ActivityTableModel(RecordTableModel):
+    """Model cho bảng hoạt động gần đây trên Dashboard"""
+
+    COLUMNS = [
+        ("Khách hàng", lambda event: event.customer_name),
+        # Hiển thị event type theo segment (đã được set trong events_manager)
+        ("Loại", lambda event: EVENT_TYPE_LABELS.get(event.event_type, event.event_type)),
+        ("Thời gian", lambda event: event.timestamp.time().isoformat(timespec='seconds') if event.timestamp else "N/A"),
+        ("Độ tin cậy", _event_confidence_text),
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(self.COLUMNS, parent)
+
+
+class CenteredDecorationDelegate(QStyledItemDelegate):
+    """Vẽ pixmap (Qt.DecorationRole) ở giữa ô thay vì sát lề trái"""
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        option.decorationPosition = QStyleOptionViewItem.Top
+        option.decorationAlignment = Qt.AlignCenter
+
+
+class FixedWidthTableView(QTableView):
+    """QTableView với độ rộng cột cố định, không đo nội dung từng row để tính width"""
+
+    def __init__(self, column_widths=None, parent=None):
+        super().__init__(parent)
+        self.column_widths = column_widths or {}
+        # Nếu có resize theo nội dung thì chỉ lấy mẫu 1 row
+        self.horizontalHeader().setResizeContentsPrecision(1)
+        self.verticalHeader().setResizeContentsPrecision(1)
+
+    def sizeHintForColumn(self, column):
+        return self.column_widths.get(column, self.horizontalHeader().defaultSectionSize())
+
+    def setModel(self, model):
+        super().setModel(model)
+        for column, width in self.column_widths.items():
+            self.setColumnWidth(column, width)
+
+
+class CropsTableModel(RecordTableModel):
+    """Model cho bảng Crops (cột Thumbnail trả pixmap qua Qt.DecorationRole)"""
+
+    THUMBNAIL_COLUMN = 1
+    THUMBNAIL_SIZE = 76
+
+    def __init__(self, parent=None):
+        super().__init__([
+            ("ID", lambda crop: str(crop.id)),
+            ("Thumbnail", lambda crop: None),
+            ("Khách hàng", lambda crop: self._customer_names.get(crop.customer_id, "Unknown")),
+            ("Độ tin cậy", lambda crop: f"{crop.confidence:.1f}%"),
+            ("Event Type", self._event_type_text),
+            ("Thời gian", lambda crop: _format_timestamp(crop.timestamp)),
+        ], parent)
+        self._customer_names = {}
+        self._event_types = {}
+        # crop.id -> QPixmap khi đã load, hoặc text placeholder ("…" / "N/A")
+        self._thumbnails = {}
+        self._thumbnail_loaders = {}
+        self._thumbnail_generation = 0
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and index.column() == self.THUMBNAIL_COLUMN:
+            thumbnail = self._thumbnails.get(self._rows[index.row()].id)
+            if role == Qt.DecorationRole and isinstance(thumbnail, QPixmap):
+                return thumbnail
+            if role == Qt.DisplayRole and isinstance(thumbnail, str):
+                return thumbnail
+            if role == Qt.TextAlignmentRole:
+                return Qt.AlignCenter
+            return None
+        return super().data(index, role)
+
+    def _event_type_text(self, crop):
+        """Event type label for the crop's event"""
+        event_type = self._event_types.get(crop.event_id)
+        if event_type is None:
+            return "N/A"
+        return EVENT_TYPE_LABELS.get(event_type, event_type)
+
+    def set_rows(self, rows, customer_names=None, event_types=None, thumb_sources=None):
+        """Replace crops + lookups (customer_id -> name, event_id -> event type, crop.id -> (path, mtime))"""
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._display_cache = {}
+        self._customer_names = customer_names or {}
+        self._event_types = event_types or {}
+        self._thumbnails = {}
+        self.endResetModel()
+        self._load_thumbnails(thumb_sources or {})
+
+    def _load_thumbnails(self, thumb_sources):
+        """Lấy thumbnail từ QPixmapCache, phần còn lại decode trên QThreadPool"""
+        # Kết quả của các loader thuộc lần set_rows trước sẽ bị bỏ qua
+        self._thumbnail_generation += 1
+        self._thumbnail_loaders = {}
+        for row, crop in enumerate(self._rows):
+            source = thumb_sources.get(crop.id)
+            if source is None:
+                self._thumbnails[crop.id] = "N/A"
+                continue
+
+            path, mtime = source
+            cache_key = f"thumb:{path}:{mtime}:{self.THUMBNAIL_SIZE}"
+            pixmap = QPixmapCache.find(cache_key)
+            if pixmap is not None and not pixmap.isNull():
+                self._thumbnails[crop.id] = pixmap
+                continue
+
+            self._thumbnails[crop.id] = "…"
+            loader = PixmapLoader(path, self.THUMBNAIL_SIZE, self.THUMBNAIL_SIZE, smooth=False)
+            loader.signals.loaded.connect(
+                partial(self._on_thumbnail_loaded, self._thumbnail_generation, row, crop.id, cache_key)
+            )
+            self._thumbnail_loaders[crop.id] = loader
+            QThreadPool.globalInstance().start(loader)
+
+    def _on_thumbnail_loaded(self, generation, row, crop_id, cache_key, image):
+        """Store decoded thumbnail and repaint its cell (GUI thread)"""
+        if generation != self._thumbnail_generation:
+            return
+        self._thumbnail_loaders.pop(crop_id, None)
+        if image.isNull():
+            self._thumbnails[crop_id] = "N/A"
+        else:
+            pixmap = QPixmap.fromImage(image)
+            QPixmapCache.insert(cache_key, pixmap)
+            self._thumbnails[crop_id] = pixmap
+        index = self.index(row, self.THUMBNAIL_COLUMN)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole, Qt.DisplayRole])
 
 
 class ModernCard(QFrame):
@@ -58,13 +832,7 @@ class ModernCard(QFrame):
     
     def __init__(self, title="", parent=None):
         super().__init__(parent)
-        self.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-radius: 12px;
-                border: 1px solid #e2e8f0;
-            }
-        """)
+        self.setObjectName("ModernCard")
         
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
@@ -72,11 +840,8 @@ class ModernCard(QFrame):
         
         if title:
             title_label = QLabel(title)
-            title_font = QFont()
-            title_font.setPointSize(14)
-            title_font.setBold(True)
-            title_label.setFont(title_font)
-            title_label.setStyleSheet("color: #1e293b; border: none;")
+            title_label.setFont(HEADING_14)
+            title_label.setObjectName("CardTitle")
             layout.addWidget(title_label)
         
         self.content_layout = QVBoxLayout()
@@ -94,19 +859,33 @@ class ModernCard(QFrame):
         self.content_layout.addLayout(layout)
 
 
+# Gradient stops (màu gốc -> màu sáng hơn) cho từng StatsCard
+_GRADIENT_STOPS = {
+    "#6366f1": ("#6366f1", "#7879f1"),
+    "#8b5cf6": ("#8b5cf6", "#a78bfa"),
+    "#ec4899": ("#ec4899", "#f472b6"),
+    "#10b981": ("#10b981", "#34d399"),
+}
+
+STATS_CARD_QSS = """
+    QFrame#StatsCard {{
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 {start}, stop:1 {end});
+        border-radius: 12px;
+    }}
+"""
+
+
 class StatsCard(QFrame):
     """Statistics card widget"""
     
     def __init__(self, icon="", title="", value="0", color="#6366f1", parent=None):
         super().__init__(parent)
+        self.setObjectName("StatsCard")
         self.setFixedHeight(120)
-        self.setStyleSheet(f"""
-            QFrame {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 {color}, stop:1 {self.adjust_color(color, 0.8)});
-                border-radius: 12px;
-            }}
-        """)
+        # Chỉ gradient phụ thuộc màu của từng card, phần còn lại nằm trong ADMIN_STYLESHEET
+        start, end = _GRADIENT_STOPS.get(color, (color, color))
+        self.setStyleSheet(STATS_CARD_QSS.format(start=start, end=end))
         
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 16, 20, 16)
@@ -117,11 +896,11 @@ class StatsCard(QFrame):
         top_row.setSpacing(12)
         
         icon_label = QLabel(icon)
-        icon_label.setStyleSheet("color: white; font-size: 32px; border: none;")
+        icon_label.setObjectName("StatsIcon")
         top_row.addWidget(icon_label)
         
         title_label = QLabel(title)
-        title_label.setStyleSheet("color: rgba(255,255,255,0.9); font-size: 13px; font-weight: 600; border: none;")
+        title_label.setObjectName("StatsTitle")
         top_row.addWidget(title_label)
         top_row.addStretch()
         
@@ -130,19 +909,11 @@ class StatsCard(QFrame):
         
         # Value
         self.value_label = QLabel(value)
-        value_font = QFont()
-        value_font.setPointSize(28)
-        value_font.setBold(True)
-        self.value_label.setFont(value_font)
-        self.value_label.setStyleSheet("color: white; border: none;")
+        self.value_label.setFont(VALUE_28)
         layout.addWidget(self.value_label)
         
         self.setLayout(layout)
     
-    def adjust_color(self, color, factor):
-        """Adjust color brightness"""
-        return color
-    
     def set_value(self, value):
         """Update value"""
         self.value_label.setText(str(value))
@@ -157,6 +928,7 @@ class SidebarButton(QPushButton):
         self.label_text = text
         self.is_active = False
         
+        self.setObjectName("SidebarButton")
         self.setText(f"{icon}  {text}")
         self.setMinimumHeight(50)
         self.setCursor(Qt.PointingHandCursor)
@@ -169,36 +941,10 @@ class SidebarButton(QPushButton):
     
     def update_style(self):
         """Update button style based on state"""
-        if self.is_active:
-            self.setStyleSheet("""
-                QPushButton {
-                    background-color: #6366f1;
-                    color: white;
-                    border: none;
-                    border-radius: 8px;
-                    padding: 12px 16px;
-                    text-align: left;
-                    font-size: 14px;
-                    font-weight: 600;
-                }
-            """)
-        else:
-            self.setStyleSheet("""
-                QPushButton {
-                    background-color: transparent;
-                    color: #64748b;
-                    border: none;
-                    border-radius: 8px;
-                    padding: 12px 16px;
-                    text-align: left;
-                    font-size: 14px;
-                    font-weight: 500;
-                }
-                QPushButton:hover {
-                    background-color: #f1f5f9;
-                    color: #1e293b;
-                }
-            """)
+        # Chỉ đổi dynamic property rồi re-polish, không parse lại stylesheet
+        self.setProperty("active", self.is_active)
+        self.style().unpolish(self)
+        self.style().polish(self)
 
 
 class EventDetailDialog(QDialog):
@@ -209,9 +955,9 @@ class EventDetailDialog(QDialog):
         self.event = event
         self.db = db
         
+        self.setObjectName("DetailDialog")
         self.setWindowTitle(f"Chi tiết Event #{event.id}")
         self.setMinimumSize(600, 500)
-        self.setStyleSheet("background-color: #f8fafc;")
         
         layout = QVBoxLayout()
         layout.setSpacing(20)
@@ -219,11 +965,8 @@ class EventDetailDialog(QDialog):
         
         # Header
         header = QLabel(f"Event #{event.id}")
-        header_font = QFont()
-        header_font.setPointSize(18)
-        header_font.setBold(True)
-        header.setFont(header_font)
-        header.setStyleSheet("color: #0f172a;")
+        header.setFont(TITLE_18)
+        header.setObjectName("DialogHeader")
         layout.addWidget(header)
         
         # Image card
@@ -231,10 +974,9 @@ class EventDetailDialog(QDialog):
         
         # Load crop image
         try:
-            all_crops = self.db.get_recent_crops(limit=1000)
-            # Tìm crop theo event_id trước
-            event_crops = [c for c in all_crops if hasattr(c, 'event_id') and c.event_id == event.id]
-            
+            # Tìm crop theo event_id trước (indexed lookup)
+            event_crops = self.db.get_crops_by_event(event.id)
+
             # Nếu không tìm thấy theo event_id, tìm theo customer_id và timestamp (fallback)
             if not event_crops and event.customer_id:
                 event_time = event.timestamp
@@ -243,32 +985,27 @@ class EventDetailDialog(QDialog):
                     from datetime import timedelta
                     time_window_start = event_time - timedelta(minutes=10)
                     time_window_end = event_time + timedelta(minutes=10)
-                    event_crops = [
-                        c for c in all_crops 
-                        if hasattr(c, 'customer_id') and c.customer_id == event.customer_id
-                        and hasattr(c, 'timestamp') and c.timestamp
-                        and time_window_start <= c.timestamp <= time_window_end
-                    ]
+                    event_crops = self.db.get_crops_by_customer_between(
+                        event.customer_id, time_window_start, time_window_end
+                    )
             
             if event_crops and len(event_crops) > 0:
                 crop = event_crops[0]
-                file_path = Path(crop.file_path)
-                if file_path.exists():
-                    pixmap = QPixmap(str(file_path))
-                    if not pixmap.isNull():
-                        image_label = QLabel()
-                        scaled = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                        image_label.setPixmap(scaled)
-                        image_label.setAlignment(Qt.AlignCenter)
-                        image_card.add_widget(image_label)
-                    else:
-                        no_image = QLabel("Không có ảnh")
-                        no_image.setAlignment(Qt.AlignCenter)
-                        image_card.add_widget(no_image)
-                else:
+                try:
+                    os.stat(crop.file_path)
+                except OSError:
                     no_image = QLabel("Không tìm thấy file ảnh")
                     no_image.setAlignment(Qt.AlignCenter)
                     image_card.add_widget(no_image)
+                else:
+                    # Decode ảnh trên worker thread, hiển thị placeholder trong lúc chờ
+                    self.image_label = QLabel("Đang tải…")
+                    self.image_label.setAlignment(Qt.AlignCenter)
+                    image_card.add_widget(self.image_label)
+
+                    self._loader = PixmapLoader(crop.file_path, 400, 400)
+                    self._loader.signals.loaded.connect(self.on_image_loaded)
+                    QThreadPool.globalInstance().start(self._loader)
             else:
                 no_crop = QLabel("Không có crop cho event này")
                 no_crop.setAlignment(Qt.AlignCenter)
@@ -277,7 +1014,7 @@ class EventDetailDialog(QDialog):
             log.error(f"Error loading crops for event {event.id}: {e}")
             error_label = QLabel(f"Lỗi tải ảnh: {str(e)}")
             error_label.setAlignment(Qt.AlignCenter)
-            error_label.setStyleSheet("color: #ef4444;")
+            error_label.setObjectName("ErrorLabel")
             image_card.add_widget(error_label)
         
         layout.addWidget(image_card)
@@ -289,26 +1026,15 @@ class EventDetailDialog(QDialog):
         
         # Event details
         # Format event type
-        event_type_display = event.event_type
-        if event.event_type == EventType.VIP_DETECTED:
-            event_type_display = "VIP"
-        elif event.event_type == EventType.NEW_CUSTOMER:
-            event_type_display = "Khách mới"
-        elif event.event_type == EventType.REGULAR_VISIT:
-            event_type_display = "Khách thường"
-        elif event.event_type == EventType.BLACKLIST:
-            event_type_display = "Blacklist"
+        event_type_display = EVENT_TYPE_LABELS.get(event.event_type, event.event_type)
         
         # Get confidence summary from metadata
         confidence_display = f"{event.confidence:.1f}%"
         duration_display = "N/A"
+        avg_conf = _confidence_avg(event.metadata)
+        if avg_conf is not None:
+            confidence_display = f"{avg_conf:.1f}% (avg)"
         if event.metadata and isinstance(event.metadata, dict):
-            if 'confidence_avg' in event.metadata:
-                confidence_display = f"{event.metadata['confidence_avg']:.1f}% (avg)"
-            elif 'confidences' in event.metadata and len(event.metadata['confidences']) > 0:
-                avg_conf = sum(event.metadata['confidences']) / len(event.metadata['confidences'])
-                confidence_display = f"{avg_conf:.1f}% (avg)"
-            
             if 'duration_formatted' in event.metadata:
                 duration_display = event.metadata['duration_formatted']
             elif 'duration_seconds' in event.metadata:
@@ -321,15 +1047,15 @@ class EventDetailDialog(QDialog):
             ("Camera:", f"#{event.camera_id}" if event.camera_id else "N/A"),
             ("Độ tin cậy:", confidence_display),
             ("Thời lượng:", duration_display),
-            ("Thời gian:", event.timestamp.strftime("%Y-%m-%d %H:%M:%S") if event.timestamp else "N/A"),
+            ("Thời gian:", _format_timestamp(event.timestamp)),
         ]
         
         for label_text, value_text in details:
             label = QLabel(label_text)
-            label.setStyleSheet("color: #64748b; font-weight: 600; font-size: 13px;")
+            label.setObjectName("DetailLabel")
             
             value = QLabel(str(value_text))
-            value.setStyleSheet("color: #0f172a; font-size: 14px;")
+            value.setObjectName("DetailValue")
             
             info_form.addRow(label, value)
         
@@ -338,27 +1064,21 @@ class EventDetailDialog(QDialog):
         
         # Close button
         close_btn = QPushButton("Đóng")
+        close_btn.setObjectName("PrimaryButton")
         close_btn.setMinimumHeight(44)
         close_btn.setCursor(Qt.PointingHandCursor)
-        close_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #6366f1;
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: 600;
-                padding: 12px 24px;
-            }
-            QPushButton:hover {
-                background-color: #4f46e5;
-            }
-        """)
         close_btn.clicked.connect(self.accept)
         layout.addWidget(close_btn, alignment=Qt.AlignRight)
         
         self.setLayout(layout)
 
+    def on_image_loaded(self, image):
+        """Show decoded image (GUI thread)"""
+        if image.isNull():
+            self.image_label.setText("Không có ảnh")
+        else:
+            self.image_label.setPixmap(QPixmap.fromImage(image))
+
 
 class ModernAdminPanel(QMainWindow):
     """Modern Admin Panel - Full screen với Sidebar Navigation"""
@@ -371,6 +1091,10 @@ class ModernAdminPanel(QMainWindow):
         self.db = db
         
         self.setWindowTitle("Admin Panel - Face Recognition System")
+        self.setStyleSheet(ADMIN_STYLESHEET)
+
+        # 64 MB cho thumbnails + ảnh crop detail đã decode (đơn vị KB)
+        QPixmapCache.setCacheLimit(64 * 1024)
         
         # Models - OpenVINO components
         self.core = None
@@ -379,6 +1103,9 @@ class ModernAdminPanel(QMainWindow):
         self.face_identifier = None
         self.faces_database = None
         self.models_loaded = False
+        self._model_loader = None
+        # Detectors của lần load trước theo config key, xem ModelLoaderThread.reuse
+        self._reusable_models = {}
         
         # Model paths - Load from database
         model_config = self.db.get_model_config()
@@ -386,12 +1113,30 @@ class ModernAdminPanel(QMainWindow):
         self.model_lm_path = model_config.get('model_lm_path', '')
         self.model_reid_path = model_config.get('model_reid_path', '')
         self.gallery_path = model_config.get('gallery_path', './gallery')
+        self.model_device = model_config.get('model_device', 'CPU')
+
+        # Customer theo id cho crop detail; xoá cache sau khi quản lý khách hàng
+        self._customer_by_id = lru_cache(maxsize=512)(self.db.get_customer)
         
         # Pagination
         self.events_page = 1
         self.events_per_page = 20
         self.crops_page = 1
         self.crops_per_page = 20
+        # Keyset pagination: page -> id cuối của trang trước (reset khi đổi filter)
+        self._events_page_cursors = {}
+        self._crops_page_cursors = {}
+        # COUNT(*) của crops theo filter hiện tại; None = cần đếm lại
+        self._crops_total = None
+        # page -> kết quả _load_crops, chỉ hợp lệ cho (search, crops_per_page) = _crops_cache_key
+        self._crops_page_cache = OrderedDict()
+        self._crops_cache_key = None
+        # db.get_crops_version() lúc cache được tạo; timer chỉ bỏ cache khi version đổi
+        self._crops_version = None
+
+        # Async DB reads: generation theo key để bỏ kết quả cũ, giữ task đến khi xong
+        self._read_generations = {}
+        self._pending_reads = set()
         
         # Sidebar buttons list
         self.sidebar_buttons = []
@@ -399,11 +1144,15 @@ class ModernAdminPanel(QMainWindow):
         # Init UI
         self.init_ui()
         
-        # Refresh timer
+        # Refresh timer - chỉ chạy khi cửa sổ hiển thị (start/stop trong showEvent/hideEvent)
         self.refresh_timer = QTimer()
         self.refresh_timer.timeout.connect(self.refresh_current_page)
         self.refresh_timer.setInterval(5000)
-        self.refresh_timer.start()
+
+        # Tạm dừng refresh khi ứng dụng không active
+        app = QApplication.instance()
+        if app is not None:
+            app.applicationStateChanged.connect(self.on_application_state_changed)
         
         # Initial load
         self.navigate_to(0)
@@ -434,7 +1183,7 @@ class ModernAdminPanel(QMainWindow):
         
         # Main content area
         self.content_widget = QWidget()
-        self.content_widget.setStyleSheet("background-color: #f8fafc;")
+        self.content_widget.setObjectName("ContentArea")
         
         content_inner_layout = QVBoxLayout()
         content_inner_layout.setContentsMargins(24, 24, 24, 24)
@@ -442,15 +1191,20 @@ class ModernAdminPanel(QMainWindow):
         # Stacked widget for different pages
         self.stacked_widget = QStackedWidget()
         
-        # Add pages
-        self.stacked_widget.addWidget(self.create_dashboard_page())      # 0
-        self.stacked_widget.addWidget(self.create_events_page())         # 1
-        self.stacked_widget.addWidget(self.create_crops_page())          # 2
-        self.stacked_widget.addWidget(self.create_user_management_page())     # 3
-        self.stacked_widget.addWidget(self.create_customer_management_page()) # 4
-        self.stacked_widget.addWidget(self.create_model_config_page())   # 5
-        self.stacked_widget.addWidget(self.create_system_settings_page())# 6
-        
+        # Pages được tạo lazy khi navigate_to() lần đầu - giữ placeholder để index ổn định
+        self._page_factories = {
+            0: self.create_dashboard_page,
+            1: self.create_events_page,
+            2: self.create_crops_page,
+            3: self.create_user_management_page,
+            4: self.create_customer_management_page,
+            5: self.create_model_config_page,
+            6: self.create_system_settings_page,
+        }
+        self._pages_built = {}
+        for _ in self._page_factories:
+            self.stacked_widget.addWidget(QWidget())
+
         content_inner_layout.addWidget(self.stacked_widget)
         self.content_widget.setLayout(content_inner_layout)
         
@@ -461,14 +1215,6 @@ class ModernAdminPanel(QMainWindow):
         
         # Status bar
         self.status_bar = QStatusBar()
-        self.status_bar.setStyleSheet("""
-            QStatusBar {
-                background-color: white;
-                color: #64748b;
-                border-top: 1px solid #e2e8f0;
-                padding: 8px;
-            }
-        """)
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage(f"Chế độ Admin | {self.user_info['username']}")
         
@@ -477,14 +1223,8 @@ class ModernAdminPanel(QMainWindow):
     def create_header(self):
         """Create header bar"""
         header = QFrame()
+        header.setObjectName("Header")
         header.setFixedHeight(70)
-        header.setStyleSheet("""
-            QFrame {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #6366f1, stop:1 #8b5cf6);
-                border: none;
-            }
-        """)
         
         layout = QHBoxLayout()
         layout.setContentsMargins(24, 0, 24, 0)
@@ -494,22 +1234,18 @@ class ModernAdminPanel(QMainWindow):
         logo_layout.setSpacing(16)
         
         logo = QLabel("👁️")
-        logo.setStyleSheet("font-size: 36px; border: none; color: white;")
+        logo.setObjectName("HeaderLogo")
         logo_layout.addWidget(logo)
         
         title_layout = QVBoxLayout()
         title_layout.setSpacing(2)
         
         title = QLabel("Face Recognition System")
-        title_font = QFont()
-        title_font.setPointSize(16)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("color: white; border: none;")
+        title.setFont(TITLE_16)
         title_layout.addWidget(title)
         
         subtitle = QLabel("Admin Panel")
-        subtitle.setStyleSheet("color: rgba(255,255,255,0.8); font-size: 12px; border: none;")
+        subtitle.setObjectName("HeaderSubtitle")
         title_layout.addWidget(subtitle)
         
         logo_layout.addLayout(title_layout)
@@ -522,26 +1258,13 @@ class ModernAdminPanel(QMainWindow):
         user_layout.setSpacing(16)
         
         user_info = QLabel(f"👤 {self.user_info['username']}")
-        user_info.setStyleSheet("color: white; font-size: 14px; font-weight: 600; border: none;")
+        user_info.setObjectName("HeaderUser")
         user_layout.addWidget(user_info)
         
         logout_btn = QPushButton("🚪 Đăng xuất")
         logout_btn.setCursor(Qt.PointingHandCursor)
         logout_btn.setFixedHeight(40)
-        logout_btn.setStyleSheet("""
-            QPushButton {
-                background-color: rgba(255,255,255,0.2);
-                color: white;
-                border: 1px solid rgba(255,255,255,0.3);
-                border-radius: 8px;
-                padding: 0 20px;
-                font-size: 13px;
-                font-weight: 600;
-            }
-            QPushButton:hover {
-                background-color: rgba(255,255,255,0.3);
-            }
-        """)
+        logout_btn.setObjectName("LogoutButton")
         logout_btn.clicked.connect(self.logout)
         user_layout.addWidget(logout_btn)
         
@@ -553,13 +1276,8 @@ class ModernAdminPanel(QMainWindow):
     def create_sidebar(self):
         """Create sidebar navigation"""
         sidebar = QFrame()
+        sidebar.setObjectName("Sidebar")
         sidebar.setFixedWidth(280)
-        sidebar.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-right: 1px solid #e2e8f0;
-            }
-        """)
         
         layout = QVBoxLayout()
         layout.setContentsMargins(16, 24, 16, 24)
@@ -567,7 +1285,7 @@ class ModernAdminPanel(QMainWindow):
         
         # Navigation title
         nav_title = QLabel("ĐIỀU HƯỚNG")
-        nav_title.setStyleSheet("color: #94a3b8; font-size: 11px; font-weight: 700; padding: 8px 12px;")
+        nav_title.setObjectName("NavTitle")
         layout.addWidget(nav_title)
         
         # Navigation buttons
@@ -583,7 +1301,8 @@ class ModernAdminPanel(QMainWindow):
         
         for i, (icon, text) in enumerate(nav_items):
             btn = SidebarButton(icon, text)
-            btn.clicked.connect(lambda checked, idx=i: self.navigate_to(idx))
+            btn._nav_index = i
+            btn.clicked.connect(self._on_nav_clicked)
             self.sidebar_buttons.append(btn)
             layout.addWidget(btn)
         
@@ -591,18 +1310,25 @@ class ModernAdminPanel(QMainWindow):
         
         # Version info
         version = QLabel("Version 2.0.0")
-        version.setStyleSheet("color: #cbd5e1; font-size: 11px; padding: 8px 12px;")
+        version.setObjectName("VersionLabel")
         layout.addWidget(version)
         
         sidebar.setLayout(layout)
         return sidebar
     
+    def _on_nav_clicked(self):
+        """Shared slot for all sidebar buttons"""
+        self.navigate_to(self.sender()._nav_index)
+
     def navigate_to(self, index):
         """Navigate to specific page"""
         # Update sidebar buttons
         for i, btn in enumerate(self.sidebar_buttons):
             btn.set_active(i == index)
-        
+
+        # Build page on first visit
+        self.ensure_page_built(index)
+
         # Switch page
         self.stacked_widget.setCurrentIndex(index)
         
@@ -613,7 +1339,19 @@ class ModernAdminPanel(QMainWindow):
             self.refresh_events()
         elif index == 2:
             self.refresh_crops()
-    
+
+    def ensure_page_built(self, index):
+        """Build page from its factory, replacing the placeholder"""
+        if index in self._pages_built or index not in self._page_factories:
+            return
+
+        page = self._page_factories[index]()
+        placeholder = self.stacked_widget.widget(index)
+        self.stacked_widget.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.stacked_widget.insertWidget(index, page)
+        self._pages_built[index] = page
+
     def create_dashboard_page(self):
         """Create dashboard page"""
         widget = QWidget()
@@ -622,11 +1360,8 @@ class ModernAdminPanel(QMainWindow):
         
         # Page title
         title = QLabel("📊 Dashboard")
-        title_font = QFont()
-        title_font.setPointSize(24)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("color: #0f172a;")
+        title.setFont(TITLE_24)
+        title.setObjectName("PageTitle")
         layout.addWidget(title)
         
         # Stats cards row
@@ -650,32 +1385,15 @@ class ModernAdminPanel(QMainWindow):
         # Recent activity card
         activity_card = ModernCard("📊 Hoạt động gần đây")
         
-        self.activity_table = QTableWidget()
-        self.activity_table.setColumnCount(4)
-        self.activity_table.setHorizontalHeaderLabels(["Khách hàng", "Loại", "Thời gian", "Độ tin cậy"])
+        self.activity_table = FixedWidthTableView()
+        self.activity_model = ActivityTableModel(self)
+        self.activity_table.setModel(self.activity_model)
         self.activity_table.horizontalHeader().setStretchLastSection(True)
         self.activity_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.activity_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.activity_table.setAlternatingRowColors(True)
         self.activity_table.setMaximumHeight(300)
-        self.activity_table.setStyleSheet("""
-            QTableWidget {
-                border: none;
-                background-color: transparent;
-                gridline-color: #e2e8f0;
-            }
-            QTableWidget::item {
-                padding: 8px;
-            }
-            QHeaderView::section {
-                background-color: #f8fafc;
-                color: #475569;
-                padding: 10px;
-                border: none;
-                border-bottom: 2px solid #e2e8f0;
-                font-weight: 600;
-            }
-        """)
+        self.activity_table.setObjectName("ActivityTable")
         
         activity_card.add_widget(self.activity_table)
         layout.addWidget(activity_card)
@@ -692,11 +1410,8 @@ class ModernAdminPanel(QMainWindow):
         
         # Page title
         title = QLabel("📋 Quản lý Events")
-        title_font = QFont()
-        title_font.setPointSize(24)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("color: #0f172a;")
+        title.setFont(TITLE_24)
+        title.setObjectName("PageTitle")
         layout.addWidget(title)
         
         # Search + Filter card
@@ -708,38 +1423,20 @@ class ModernAdminPanel(QMainWindow):
         self.events_search = QLineEdit()
         self.events_search.setPlaceholderText("🔍 Tìm kiếm theo tên khách hàng...")
         self.events_search.setMinimumHeight(40)
-        self.events_search.setStyleSheet("""
-            QLineEdit {
-                border: 2px solid #e2e8f0;
-                border-radius: 8px;
-                padding: 0 16px;
-                font-size: 14px;
-                background-color: #f8fafc;
-            }
-            QLineEdit:focus {
-                border-color: #6366f1;
-                background-color: white;
-            }
-        """)
-        self.events_search.textChanged.connect(self.filter_events)
+        self.events_search.setObjectName("SearchInput")
+        # Debounce: chỉ query sau khi ngừng gõ 250ms
+        self._events_search_timer = QTimer(self)
+        self._events_search_timer.setSingleShot(True)
+        self._events_search_timer.setInterval(250)
+        self._events_search_timer.timeout.connect(self.filter_events)
+        self.events_search.textChanged.connect(self._on_events_search_changed)
         search_layout.addWidget(self.events_search, stretch=3)
         
         # Type filter
         self.event_type_filter = QComboBox()
         self.event_type_filter.addItems(["Tất cả", "ENTRY", "EXIT", "RECOGNIZED"])
         self.event_type_filter.setMinimumHeight(40)
-        self.event_type_filter.setStyleSheet("""
-            QComboBox {
-                border: 2px solid #e2e8f0;
-                border-radius: 8px;
-                padding: 0 16px;
-                font-size: 14px;
-                background-color: #f8fafc;
-            }
-            QComboBox:focus {
-                border-color: #6366f1;
-            }
-        """)
+        self.event_type_filter.setObjectName("FilterCombo")
         self.event_type_filter.currentTextChanged.connect(self.filter_events)
         search_layout.addWidget(self.event_type_filter, stretch=1)
         
@@ -747,20 +1444,7 @@ class ModernAdminPanel(QMainWindow):
         refresh_btn = QPushButton("🔄 Làm mới")
         refresh_btn.setMinimumHeight(40)
         refresh_btn.setCursor(Qt.PointingHandCursor)
-        refresh_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #6366f1;
-                color: white;
-                border: none;
-                border-radius: 8px;
-                padding: 0 24px;
-                font-size: 14px;
-                font-weight: 600;
-            }
-            QPushButton:hover {
-                background-color: #4f46e5;
-            }
-        """)
+        refresh_btn.setObjectName("ToolbarButton")
         refresh_btn.clicked.connect(self.refresh_events)
         search_layout.addWidget(refresh_btn)
         
@@ -770,37 +1454,13 @@ class ModernAdminPanel(QMainWindow):
         # Table card
         table_card = ModernCard()
         
-        self.events_table = QTableWidget()
-        self.events_table.setColumnCount(6)
-        self.events_table.setHorizontalHeaderLabels([
-            "ID", "Khách hàng", "Loại", "Camera", "Độ tin cậy", "Thời gian"
-        ])
+        self.events_table = FixedWidthTableView({0: 60})
+        self.events_model = EventsTableModel(self)
+        self.events_table.setModel(self.events_model)
         self.events_table.horizontalHeader().setStretchLastSection(True)
         self.events_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.events_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.events_table.setAlternatingRowColors(True)
-        self.events_table.setStyleSheet("""
-            QTableWidget {
-                border: none;
-                background-color: transparent;
-                gridline-color: #e2e8f0;
-            }
-            QTableWidget::item {
-                padding: 12px;
-            }
-            QTableWidget::item:selected {
-                background-color: #e0e7ff;
-                color: #1e293b;
-            }
-            QHeaderView::section {
-                background-color: #f8fafc;
-                color: #475569;
-                padding: 12px;
-                border: none;
-                border-bottom: 2px solid #e2e8f0;
-                font-weight: 600;
-            }
-        """)
         self.events_table.doubleClicked.connect(self.show_event_detail)
         
         table_card.add_widget(self.events_table)
@@ -814,18 +1474,18 @@ class ModernAdminPanel(QMainWindow):
         prev_btn.setMinimumHeight(36)
         prev_btn.setCursor(Qt.PointingHandCursor)
         prev_btn.clicked.connect(self.events_prev_page)
-        prev_btn.setStyleSheet(self.pagination_btn_style())
+        prev_btn.setObjectName("PaginationButton")
         pagination_layout.addWidget(prev_btn)
         
         self.events_page_label = QLabel("Trang 1")
-        self.events_page_label.setStyleSheet("padding: 0 16px; font-weight: 600; color: #475569;")
+        self.events_page_label.setObjectName("PaginationLabel")
         pagination_layout.addWidget(self.events_page_label)
         
         next_btn = QPushButton("Sau →")
         next_btn.setMinimumHeight(36)
         next_btn.setCursor(Qt.PointingHandCursor)
         next_btn.clicked.connect(self.events_next_page)
-        next_btn.setStyleSheet(self.pagination_btn_style())
+        next_btn.setObjectName("PaginationButton")
         pagination_layout.addWidget(next_btn)
         
         pagination_layout.addStretch()
@@ -842,11 +1502,8 @@ class ModernAdminPanel(QMainWindow):
         
         # Page title
         title = QLabel("🖼️ Quản lý Crops")
-        title_font = QFont()
-        title_font.setPointSize(24)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("color: #0f172a;")
+        title.setFont(TITLE_24)
+        title.setObjectName("PageTitle")
         layout.addWidget(title)
         
         # Search + Filter bar
@@ -858,44 +1515,25 @@ class ModernAdminPanel(QMainWindow):
         self.crops_search = QLineEdit()
         self.crops_search.setPlaceholderText("🔍 Tìm kiếm crops theo tên khách hàng...")
         self.crops_search.setMinimumHeight(40)
-        self.crops_search.setStyleSheet("""
-            QLineEdit {
-                border: 2px solid #e2e8f0;
-                border-radius: 8px;
-                padding: 0 16px;
-                font-size: 14px;
-                background-color: #f8fafc;
-            }
-            QLineEdit:focus {
-                border-color: #6366f1;
-                background-color: white;
-            }
-        """)
-        self.crops_search.textChanged.connect(self.filter_crops)
+        self.crops_search.setObjectName("SearchInput")
+        # Debounce: chỉ query sau khi ngừng gõ 250ms
+        self._crops_search_timer = QTimer(self)
+        self._crops_search_timer.setSingleShot(True)
+        self._crops_search_timer.setInterval(250)
+        self._crops_search_timer.timeout.connect(self.filter_crops)
+        self.crops_search.textChanged.connect(self._on_crops_search_changed)
         search_layout.addWidget(self.crops_search, stretch=2)
         
         # Items per page selector
         per_page_label = QLabel("Hiển thị:")
-        per_page_label.setStyleSheet("color: #475569; font-weight: 600;")
+        per_page_label.setObjectName("FieldLabel")
         search_layout.addWidget(per_page_label)
         
         self.crops_per_page_combo = QComboBox()
         self.crops_per_page_combo.addItems(["10", "20", "30", "50"])
         self.crops_per_page_combo.setCurrentText("20")
         self.crops_per_page_combo.setMinimumHeight(40)
-        self.crops_per_page_combo.setStyleSheet("""
-            QComboBox {
-                border: 2px solid #e2e8f0;
-                border-radius: 8px;
-                padding: 0 16px;
-                font-size: 14px;
-                background-color: #f8fafc;
-                min-width: 80px;
-            }
-            QComboBox:focus {
-                border-color: #6366f1;
-            }
-        """)
+        self.crops_per_page_combo.setObjectName("PerPageCombo")
         self.crops_per_page_combo.currentTextChanged.connect(self.change_crops_per_page)
         search_layout.addWidget(self.crops_per_page_combo)
         
@@ -903,20 +1541,7 @@ class ModernAdminPanel(QMainWindow):
         refresh_btn = QPushButton("🔄 Làm mới")
         refresh_btn.setMinimumHeight(40)
         refresh_btn.setCursor(Qt.PointingHandCursor)
-        refresh_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #6366f1;
-                color: white;
-                border: none;
-                border-radius: 8px;
-                padding: 0 24px;
-                font-size: 14px;
-                font-weight: 600;
-            }
-            QPushButton:hover {
-                background-color: #4f46e5;
-            }
-        """)
+        refresh_btn.setObjectName("ToolbarButton")
         refresh_btn.clicked.connect(self.refresh_crops)
         search_layout.addWidget(refresh_btn)
         
@@ -926,48 +1551,21 @@ class ModernAdminPanel(QMainWindow):
         # Table card
         table_card = ModernCard()
         
-        self.crops_table = QTableWidget()
-        self.crops_table.setColumnCount(6)
-        self.crops_table.setHorizontalHeaderLabels([
-            "ID", "Thumbnail", "Khách hàng", "Độ tin cậy", "Event Type", "Thời gian"
-        ])
-        
-        # Configure columns
+        # Configure columns (cột 2 stretch, các cột khác cố định)
+        self.crops_table = FixedWidthTableView({0: 60, 1: 100, 3: 100, 4: 120, 5: 160})
+        self.crops_model = CropsTableModel(self)
+        self.crops_table.setModel(self.crops_model)
+        self.crops_table.setIconSize(QSize(CropsTableModel.THUMBNAIL_SIZE, CropsTableModel.THUMBNAIL_SIZE))
+        self.crops_table.setItemDelegateForColumn(
+            CropsTableModel.THUMBNAIL_COLUMN, CenteredDecorationDelegate(self.crops_table)
+        )
         self.crops_table.horizontalHeader().setStretchLastSection(False)
         self.crops_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
-        self.crops_table.setColumnWidth(0, 60)
-        self.crops_table.setColumnWidth(1, 100)
-        self.crops_table.setColumnWidth(3, 100)
-        self.crops_table.setColumnWidth(4, 120)
-        self.crops_table.setColumnWidth(5, 160)
         
         self.crops_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.crops_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.crops_table.setAlternatingRowColors(True)
         self.crops_table.verticalHeader().setDefaultSectionSize(90)
-        
-        self.crops_table.setStyleSheet("""
-            QTableWidget {
-                border: none;
-                background-color: transparent;
-                gridline-color: #e2e8f0;
-            }
-            QTableWidget::item {
-                padding: 12px;
-            }
-            QTableWidget::item:selected {
-                background-color: #e0e7ff;
-                color: #1e293b;
-            }
-            QHeaderView::section {
-                background-color: #f8fafc;
-                color: #475569;
-                padding: 12px;
-                border: none;
-                border-bottom: 2px solid #e2e8f0;
-                font-weight: 600;
-            }
-        """)
         self.crops_table.doubleClicked.connect(self.show_crop_detail_from_table)
         
         table_card.add_widget(self.crops_table)
@@ -977,23 +1575,23 @@ class ModernAdminPanel(QMainWindow):
         pagination_layout = QHBoxLayout()
         pagination_layout.addStretch()
         
-        prev_btn = QPushButton("← Trước")
-        prev_btn.setMinimumHeight(36)
-        prev_btn.setCursor(Qt.PointingHandCursor)
-        prev_btn.clicked.connect(self.crops_prev_page)
-        prev_btn.setStyleSheet(self.pagination_btn_style())
-        pagination_layout.addWidget(prev_btn)
+        self.crops_prev_btn = QPushButton("← Trước")
+        self.crops_prev_btn.setMinimumHeight(36)
+        self.crops_prev_btn.setCursor(Qt.PointingHandCursor)
+        self.crops_prev_btn.clicked.connect(self.crops_prev_page)
+        self.crops_prev_btn.setObjectName("PaginationButton")
+        pagination_layout.addWidget(self.crops_prev_btn)
         
         self.crops_page_label = QLabel("Trang 1")
-        self.crops_page_label.setStyleSheet("padding: 0 16px; font-weight: 600; color: #475569;")
+        self.crops_page_label.setObjectName("PaginationLabel")
         pagination_layout.addWidget(self.crops_page_label)
         
-        next_btn = QPushButton("Sau →")
-        next_btn.setMinimumHeight(36)
-        next_btn.setCursor(Qt.PointingHandCursor)
-        next_btn.clicked.connect(self.crops_next_page)
-        next_btn.setStyleSheet(self.pagination_btn_style())
-        pagination_layout.addWidget(next_btn)
+        self.crops_next_btn = QPushButton("Sau →")
+        self.crops_next_btn.setMinimumHeight(36)
+        self.crops_next_btn.setCursor(Qt.PointingHandCursor)
+        self.crops_next_btn.clicked.connect(self.crops_next_page)
+        self.crops_next_btn.setObjectName("PaginationButton")
+        pagination_layout.addWidget(self.crops_next_btn)
         
         pagination_layout.addStretch()
         layout.addLayout(pagination_layout)
@@ -1009,11 +1607,8 @@ class ModernAdminPanel(QMainWindow):
         
         # Page title
         title = QLabel("👥 Quản lý Người dùng")
-        title_font = QFont()
-        title_font.setPointSize(24)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("color: #0f172a;")
+        title.setFont(TITLE_24)
+        title.setObjectName("PageTitle")
         layout.addWidget(title)
         
         # Action card
@@ -1021,26 +1616,14 @@ class ModernAdminPanel(QMainWindow):
         
         desc = QLabel("Thêm, sửa, xóa tài khoản người dùng và phân quyền truy cập hệ thống.")
         desc.setWordWrap(True)
-        desc.setStyleSheet("color: #64748b; font-size: 14px; margin-bottom: 16px;")
+        desc.setObjectName("PageDescription")
         action_card.add_widget(desc)
         
         open_btn = QPushButton("🔓 Mở Quản lý Người dùng")
         open_btn.setMinimumHeight(50)
         open_btn.setCursor(Qt.PointingHandCursor)
-        open_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #6366f1;
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: 15px;
-                font-weight: 600;
-                padding: 12px 32px;
-            }
-            QPushButton:hover {
-                background-color: #4f46e5;
-            }
-        """)
+        open_btn.setObjectName("ActionButton")
+        open_btn.setProperty("variant", "primary")
         open_btn.clicked.connect(self.manage_users)
         action_card.add_widget(open_btn)
         
@@ -1058,11 +1641,8 @@ class ModernAdminPanel(QMainWindow):
         
         # Page title
         title = QLabel("🧑 Quản lý Khách hàng")
-        title_font = QFont()
-        title_font.setPointSize(24)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("color: #0f172a;")
+        title.setFont(TITLE_24)
+        title.setObjectName("PageTitle")
         layout.addWidget(title)
         
         # Action card
@@ -1070,26 +1650,14 @@ class ModernAdminPanel(QMainWindow):
         
         desc = QLabel("Thêm, chỉnh sửa thông tin khách hàng, quản lý phân khúc khách hàng và cập nhật dữ liệu nhận diện khuôn mặt.")
         desc.setWordWrap(True)
-        desc.setStyleSheet("color: #64748b; font-size: 14px; margin-bottom: 16px;")
+        desc.setObjectName("PageDescription")
         action_card.add_widget(desc)
         
         open_btn = QPushButton("🔓 Mở Quản lý Khách hàng")
         open_btn.setMinimumHeight(50)
         open_btn.setCursor(Qt.PointingHandCursor)
-        open_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #8b5cf6;
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: 15px;
-                font-weight: 600;
-                padding: 12px 32px;
-            }
-            QPushButton:hover {
-                background-color: #7c3aed;
-            }
-        """)
+        open_btn.setObjectName("ActionButton")
+        open_btn.setProperty("variant", "purple")
         open_btn.clicked.connect(self.manage_customers)
         action_card.add_widget(open_btn)
         
@@ -1107,11 +1675,8 @@ class ModernAdminPanel(QMainWindow):
         
         # Page title
         title = QLabel("🤖 Cấu hình Models AI")
-        title_font = QFont()
-        title_font.setPointSize(24)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("color: #0f172a;")
+        title.setFont(TITLE_24)
+        title.setObjectName("PageTitle")
         layout.addWidget(title)
         
         # Configuration card
@@ -1168,26 +1733,20 @@ class ModernAdminPanel(QMainWindow):
         gallery_layout.addWidget(gallery_btn)
         form.addRow("Gallery:", gallery_layout)
         
+        # Device: AUTO/MULTI chia tải sang iGPU, nhả CPU cho UI
+        self.device_input = QComboBox()
+        self.device_input.setEditable(True)
+        self.device_input.addItems(["AUTO:GPU,CPU", "CPU", "GPU", "MULTI:GPU,CPU"])
+        self.device_input.setMinimumHeight(40)
+        form.addRow("Device:", self.device_input)
+        
         config_card.add_layout(form)
         
         # Save button
         save_btn = QPushButton("💾 Lưu Cấu hình")
         save_btn.setMinimumHeight(50)
         save_btn.setCursor(Qt.PointingHandCursor)
-        save_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #10b981;
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: 15px;
-                font-weight: 600;
-                padding: 12px 32px;
-            }
-            QPushButton:hover {
-                background-color: #059669;
-            }
-        """)
+        save_btn.setObjectName("ActionButton")
         save_btn.clicked.connect(self.save_model_config)
         config_card.add_widget(save_btn)
         
@@ -1208,11 +1767,8 @@ class ModernAdminPanel(QMainWindow):
         
         # Page title
         title = QLabel("⚙️ Cài đặt Hệ thống")
-        title_font = QFont()
-        title_font.setPointSize(24)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("color: #0f172a;")
+        title.setFont(TITLE_24)
+        title.setObjectName("PageTitle")
         layout.addWidget(title)
         
         # Settings card
@@ -1221,12 +1777,15 @@ class ModernAdminPanel(QMainWindow):
         form = QFormLayout()
         form.setSpacing(20)
         
+        # Đọc cả 3 settings trong một query
+        system_config = self.db.get_system_config()
+
         # Detection Cooldown
         self.cooldown_spin = QDoubleSpinBox()
         self.cooldown_spin.setMinimum(1.0)
         self.cooldown_spin.setMaximum(60.0)
         self.cooldown_spin.setSingleStep(0.5)
-        self.cooldown_spin.setValue(self.db.get_detection_cooldown())
+        self.cooldown_spin.setValue(system_config['detection_cooldown'])
         self.cooldown_spin.setSuffix(" giây")
         self.cooldown_spin.setMinimumHeight(40)
         form.addRow("Thời gian Cooldown:", self.cooldown_spin)
@@ -1236,7 +1795,7 @@ class ModernAdminPanel(QMainWindow):
         self.revisit_spin.setMinimum(0.5)
         self.revisit_spin.setMaximum(24.0)
         self.revisit_spin.setSingleStep(0.5)
-        self.revisit_spin.setValue(self.db.get_revisit_threshold())
+        self.revisit_spin.setValue(system_config['revisit_threshold'])
         self.revisit_spin.setSuffix(" giờ")
         self.revisit_spin.setMinimumHeight(40)
         form.addRow("Thời gian Revisit:", self.revisit_spin)
@@ -1246,7 +1805,7 @@ class ModernAdminPanel(QMainWindow):
         self.capture_spin.setMinimum(1.0)
         self.capture_spin.setMaximum(10.0)
         self.capture_spin.setSingleStep(0.5)
-        self.capture_spin.setValue(self.db.get_capture_interval())
+        self.capture_spin.setValue(system_config['capture_interval'])
         self.capture_spin.setSuffix(" giây")
         self.capture_spin.setMinimumHeight(40)
         form.addRow("Thời gian chụp:", self.capture_spin)
@@ -1261,34 +1820,14 @@ class ModernAdminPanel(QMainWindow):
             "• Thời gian chụp: Khoảng cách giữa các lần chụp ảnh (1-5s)"
         )
         info.setWordWrap(True)
-        info.setStyleSheet("""
-            color: #64748b;
-            background-color: #f8fafc;
-            padding: 16px;
-            border-radius: 8px;
-            border: none;
-            margin-top: 12px;
-        """)
+        info.setObjectName("InfoBox")
         settings_card.add_widget(info)
         
         # Save button
         save_btn = QPushButton("💾 Lưu Cài đặt")
         save_btn.setMinimumHeight(50)
         save_btn.setCursor(Qt.PointingHandCursor)
-        save_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #10b981;
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: 15px;
-                font-weight: 600;
-                padding: 12px 32px;
-            }
-            QPushButton:hover {
-                background-color: #059669;
-            }
-        """)
+        save_btn.setObjectName("ActionButton")
         save_btn.clicked.connect(self.save_system_settings)
         settings_card.add_widget(save_btn)
         
@@ -1298,74 +1837,52 @@ class ModernAdminPanel(QMainWindow):
         widget.setLayout(layout)
         return widget
     
-    def pagination_btn_style(self):
-        """Style for pagination buttons"""
-        return """
-            QPushButton {
-                background-color: white;
-                color: #475569;
-                border: 2px solid #e2e8f0;
-                border-radius: 8px;
-                padding: 8px 16px;
-                font-size: 13px;
-                font-weight: 600;
-            }
-            QPushButton:hover {
-                border-color: #6366f1;
-                color: #6366f1;
-            }
-        """
-    
+    def read_async(self, key, fn, callback, *args, **kwargs):
+        """Run fn(*args) off the UI thread, deliver result to callback (bỏ qua kết quả cũ)"""
+        generation = self._read_generations.get(key, 0) + 1
+        self._read_generations[key] = generation
+        task = DbReadTask(fn, *args, **kwargs)
+
+        def on_finished(result):
+            # Giữ tham chiếu đến task cho tới khi signal được xử lý
+            self._pending_reads.discard(task)
+            if result is not None and self._read_generations.get(key) == generation:
+                callback(result)
+
+        task.signals.finished.connect(on_finished)
+        self._pending_reads.add(task)
+        QThreadPool.globalInstance().start(task)
+
+    def cancel_read(self, key):
+        """Bỏ kết quả của read_async(key) đang chạy (nếu có)"""
+        self._read_generations[key] = self._read_generations.get(key, 0) + 1
+
     # Dashboard methods
     def refresh_dashboard(self):
         """Refresh dashboard statistics"""
+        # Page chưa được tạo (lazy) thì chưa có widget để cập nhật
+        if 0 not in self._pages_built:
+            return
+        self.read_async('dashboard', self._load_dashboard, self._apply_dashboard)
+
+    def _load_dashboard(self):
+        """Query dashboard data (worker thread)"""
+        # Một query cho cả 4 con số
+        return self.db.get_counts(), self.db.get_recent_events(limit=10)
+
+    def _apply_dashboard(self, result):
+        """Update dashboard widgets with query result"""
         try:
-            # Get statistics
-            total_customers = len(self.db.get_all_customers())
-            total_events = len(self.db.get_recent_events(limit=1000))
-            total_crops = len(self.db.get_recent_crops(limit=1000))
-            vip_customers = len([c for c in self.db.get_all_customers() if c.segment == CustomerSegment.VIP])
+            counts, recent_events = result
             
             # Update stats cards
-            self.total_customers_card.set_value(str(total_customers))
-            self.total_events_card.set_value(str(total_events))
-            self.total_crops_card.set_value(str(total_crops))
-            self.vip_customers_card.set_value(str(vip_customers))
+            self.total_customers_card.set_value(str(counts['customers']))
+            self.total_events_card.set_value(str(counts['events']))
+            self.total_crops_card.set_value(str(counts['crops']))
+            self.vip_customers_card.set_value(str(counts['vips']))
             
             # Update recent activity table
-            recent_events = self.db.get_recent_events(limit=10)
-            self.activity_table.setRowCount(len(recent_events))
-            
-            for row, event in enumerate(recent_events):
-                self.activity_table.setItem(row, 0, QTableWidgetItem(event.customer_name))
-                
-                # Hiển thị event type theo segment (đã được set trong events_manager)
-                event_type_display = event.event_type
-                # Format event type để dễ đọc hơn
-                if event_type_display == EventType.VIP_DETECTED:
-                    event_type_display = "VIP"
-                elif event_type_display == EventType.NEW_CUSTOMER:
-                    event_type_display = "Khách mới"
-                elif event_type_display == EventType.REGULAR_VISIT:
-                    event_type_display = "Khách thường"
-                elif event_type_display == EventType.BLACKLIST:
-                    event_type_display = "Blacklist"
-                
-                self.activity_table.setItem(row, 1, QTableWidgetItem(event_type_display))
-                
-                timestamp = event.timestamp.strftime("%H:%M:%S") if event.timestamp else "N/A"
-                self.activity_table.setItem(row, 2, QTableWidgetItem(timestamp))
-                
-                # Hiển thị confidence summary từ metadata nếu có, nếu không dùng confidence đầu tiên
-                confidence_display = f"{event.confidence:.1f}%"
-                if event.metadata and isinstance(event.metadata, dict):
-                    if 'confidence_avg' in event.metadata:
-                        confidence_display = f"{event.metadata['confidence_avg']:.1f}%"
-                    elif 'confidences' in event.metadata and len(event.metadata['confidences']) > 0:
-                        avg_conf = sum(event.metadata['confidences']) / len(event.metadata['confidences'])
-                        confidence_display = f"{avg_conf:.1f}%"
-                
-                self.activity_table.setItem(row, 3, QTableWidgetItem(confidence_display))
+            self.activity_model.set_rows(recent_events)
             
         except Exception as e:
             log.error(f"Error refreshing dashboard: {e}")
@@ -1373,75 +1890,55 @@ class ModernAdminPanel(QMainWindow):
     # Events methods
     def refresh_events(self):
         """Refresh events table"""
+        if 1 not in self._pages_built:
+            return
+        # Filters + pagination chạy trong SQL
+        search_text = self.events_search.text().strip()
+        event_type = self.event_type_filter.currentText()
+        # EventType lưu dạng lowercase trong database
+        type_filter = None if event_type == "Tất cả" else event_type.lower()
+
+        # Dùng keyset (id < cursor) nếu đã biết id cuối của trang trước, nếu không dùng OFFSET
+        before_id = self._events_page_cursors.get(self.events_page)
+        offset = 0 if before_id is not None else (self.events_page - 1) * self.events_per_page
+
+        self.read_async(
+            'events', self._load_events, self._apply_events,
+            offset, self.events_per_page, type_filter, search_text or None, before_id
+        )
+
+    def _load_events(self, offset, limit, type_filter, name_query, before_id):
+        """Query one page of events + total count (worker thread)"""
+        page_events = self.db.get_events(offset=offset, limit=limit, type_filter=type_filter,
+                                         name_query=name_query, before_id=before_id)
+        total_events = self.db.count_events(type_filter=type_filter, name_query=name_query)
+        return page_events, total_events
+
+    def _apply_events(self, result):
+        """Update events table with query result"""
         try:
-            events = self.db.get_recent_events(limit=self.events_per_page * 10)
-            
-            # Apply filters
-            search_text = self.events_search.text().lower()
-            event_type = self.event_type_filter.currentText()
-            
-            filtered_events = []
-            for event in events:
-                if search_text and search_text not in event.customer_name.lower():
-                    continue
-                if event_type != "Tất cả" and event.event_type != event_type:
-                    continue
-                filtered_events.append(event)
-            
-            # Pagination
-            start_idx = (self.events_page - 1) * self.events_per_page
-            end_idx = start_idx + self.events_per_page
-            page_events = filtered_events[start_idx:end_idx]
-            
+            page_events, total_events = result
+
             # Update table
-            self.events_table.setRowCount(len(page_events))
-            
-            for row, event in enumerate(page_events):
-                self.events_table.setItem(row, 0, QTableWidgetItem(str(event.id)))
-                self.events_table.setItem(row, 1, QTableWidgetItem(event.customer_name))
-                
-                # Format event type theo segment
-                event_type_display = event.event_type
-                if event.event_type == EventType.VIP_DETECTED:
-                    event_type_display = "VIP"
-                elif event.event_type == EventType.NEW_CUSTOMER:
-                    event_type_display = "Khách mới"
-                elif event.event_type == EventType.REGULAR_VISIT:
-                    event_type_display = "Khách thường"
-                elif event.event_type == EventType.BLACKLIST:
-                    event_type_display = "Blacklist"
-                elif event.event_type == EventType.UNKNOWN:
-                    event_type_display = "Unknown"
-                
-                self.events_table.setItem(row, 2, QTableWidgetItem(event_type_display))
-                
-                camera = f"Camera #{event.camera_id}" if event.camera_id else "N/A"
-                self.events_table.setItem(row, 3, QTableWidgetItem(camera))
-                
-                # Hiển thị confidence summary từ metadata nếu có
-                confidence_display = f"{event.confidence:.1f}%"
-                if event.metadata and isinstance(event.metadata, dict):
-                    if 'confidence_avg' in event.metadata:
-                        confidence_display = f"{event.metadata['confidence_avg']:.1f}%"
-                    elif 'confidences' in event.metadata and len(event.metadata['confidences']) > 0:
-                        avg_conf = sum(event.metadata['confidences']) / len(event.metadata['confidences'])
-                        confidence_display = f"{avg_conf:.1f}%"
-                
-                self.events_table.setItem(row, 4, QTableWidgetItem(confidence_display))
-                
-                timestamp = event.timestamp.strftime("%Y-%m-%d %H:%M:%S") if event.timestamp else "N/A"
-                self.events_table.setItem(row, 5, QTableWidgetItem(timestamp))
+            self.events_model.set_rows(page_events)
+            if page_events:
+                self._events_page_cursors[self.events_page + 1] = page_events[-1].id
             
             # Update page label
-            total_pages = (len(filtered_events) + self.events_per_page - 1) // self.events_per_page
+            total_pages = (total_events + self.events_per_page - 1) // self.events_per_page
             self.events_page_label.setText(f"Trang {self.events_page}/{max(1, total_pages)}")
             
         except Exception as e:
             log.error(f"Error refreshing events: {e}")
     
+    def _on_events_search_changed(self, _text):
+        """Restart debounce timer on each keystroke"""
+        self._events_search_timer.start()
+
     def filter_events(self):
         """Filter events"""
         self.events_page = 1
+        self._events_page_cursors.clear()
         self.refresh_events()
     
     def events_prev_page(self):
@@ -1457,123 +1954,153 @@ class ModernAdminPanel(QMainWindow):
     
     def show_event_detail(self, index):
         """Show event detail dialog"""
-        row = index.row()
-        event_id = int(self.events_table.item(row, 0).text())
+        event_id = self.events_model.row_at(index.row()).id
         
-        event = None
-        for e in self.db.get_recent_events(limit=1000):
-            if e.id == event_id:
-                event = e
-                break
+        # Lookup theo primary key
+        event = self.db.get_event(event_id)
         
         if event:
             dialog = EventDetailDialog(event, self.db, self)
             dialog.exec_()
     
     # Crops methods
-    def create_thumbnail_widget(self, crop):
-        """Create thumbnail widget for table cell"""
-        container = QWidget()
-        layout = QVBoxLayout()
-        layout.setContentsMargins(5, 5, 5, 5)
-        layout.setAlignment(Qt.AlignCenter)
-        
-        image_label = QLabel()
-        image_label.setFixedSize(80, 80)
-        image_label.setAlignment(Qt.AlignCenter)
-        image_label.setStyleSheet("""
-            QLabel {
-                border: 2px solid #e2e8f0;
-                border-radius: 4px;
-                background-color: #f8fafc;
-            }
-        """)
-        
-        try:
-            file_path = Path(crop.file_path)
-            if file_path.exists():
-                pixmap = QPixmap(str(file_path))
-                if not pixmap.isNull():
-                    scaled = pixmap.scaled(76, 76, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    image_label.setPixmap(scaled)
-                else:
-                    image_label.setText("N/A")
-            else:
-                image_label.setText("N/A")
-        except Exception as e:
-            log.error(f"Error loading thumbnail: {e}")
-            image_label.setText("Error")
-        
-        layout.addWidget(image_label)
-        container.setLayout(layout)
-        return container
     
     def refresh_crops(self):
-        """Refresh crops table"""
-        try:
-            crops = self.db.get_recent_crops(limit=1000)
-            
-            # Apply filter
-            search_text = self.crops_search.text().lower()
-            filtered_crops = []
-            
-            for crop in crops:
-                customer = self.db.get_customer(crop.customer_id) if crop.customer_id else None
-                customer_name = customer.name if customer else "Unknown"
-                
-                if search_text and search_text not in customer_name.lower():
+        """Refresh crops table (đếm lại tổng số crops, bỏ các trang đã cache)"""
+        self._crops_total = None
+        self._crops_page_cache.clear()
+        self.cancel_read('crops_prefetch')
+        self._load_crops_page()
+        if 2 in self._pages_built:
+            self.read_async('crops_version', self.db.get_crops_version, self._remember_crops_version)
+
+    def _remember_crops_version(self, version):
+        """Lưu version của bảng crops ứng với cache hiện tại"""
+        self._crops_version = version
+
+    def reload_crops_page(self):
+        """Timer: kiểm tra crops có thay đổi không rồi mới load lại trang hiện tại"""
+        if 2 not in self._pages_built:
+            return
+        self.read_async('crops_version', self.db.get_crops_version, self._apply_crops_version)
+
+    def _apply_crops_version(self, version):
+        """Bỏ cache/COUNT khi crops được thêm/xóa, nếu không chỉ load lại trang hiện tại"""
+        if version != self._crops_version:
+            self._crops_version = version
+            self._crops_total = None
+            self._crops_page_cache.clear()
+            self.cancel_read('crops_prefetch')
+        else:
+            # Giữ các trang khác và trang đã prefetch
+            self._crops_page_cache.pop(self.crops_page, None)
+        self._load_crops_page()
+
+    def _load_crops_page(self):
+        """Load current crops page, reuse cached page/total khi chỉ chuyển trang"""
+        if 2 not in self._pages_built:
+            return
+        # Filter theo tên khách hàng + pagination chạy trong SQL
+        search_text = self.crops_search.text().strip()
+        cache_key = (search_text, self.crops_per_page)
+        if cache_key != self._crops_cache_key:
+            self._crops_page_cache.clear()
+            self._crops_cache_key = cache_key
+
+        page = self.crops_page
+        cached = self._crops_page_cache.get(page)
+        if cached is not None:
+            self._crops_page_cache.move_to_end(page)
+            # Bỏ kết quả của query crops còn đang chạy (trang khác)
+            self.cancel_read('crops')
+            self._apply_crops(cached)
+            return
+
+        before_id = self._crops_page_cursors.get(page)
+        offset = 0 if before_id is not None else (page - 1) * self.crops_per_page
+        self.read_async('crops', self._load_crops, partial(self._cache_crops_page, page),
+                        offset, self.crops_per_page, search_text or None, before_id,
+                        self._crops_total)
+
+    def _cache_crops_page(self, page, result):
+        """Cache a loaded crops page (LRU) and show it"""
+        self._remember_crops_page(page, result)
+        self._apply_crops(result)
+
+    def _remember_crops_page(self, page, result):
+        """Put a crops page into the LRU page cache"""
+        self._crops_page_cache[page] = result
+        self._crops_page_cache.move_to_end(page)
+        while len(self._crops_page_cache) > CROPS_PAGE_CACHE_SIZE:
+            self._crops_page_cache.popitem(last=False)
+
+    def _prefetch_next_crops_page(self):
+        """Load trang crops kế tiếp vào cache ở background để Next hiển thị ngay"""
+        next_page = self.crops_page + 1
+        before_id = self._crops_page_cursors.get(next_page)
+        if (before_id is None or next_page in self._crops_page_cache
+                or self._crops_total is None
+                or self.crops_page * self.crops_per_page >= self._crops_total):
+            return
+        search_text, limit = self._crops_cache_key
+        self.read_async('crops_prefetch', self._load_crops,
+                        partial(self._store_prefetched_crops_page, self._crops_cache_key, next_page),
+                        0, limit, search_text or None, before_id, self._crops_total)
+
+    def _store_prefetched_crops_page(self, cache_key, page, result):
+        """Cache prefetched page nếu filter chưa đổi và trang chưa được load"""
+        if cache_key == self._crops_cache_key and page not in self._crops_page_cache:
+            self._remember_crops_page(page, result)
+
+    def _load_crops(self, offset, limit, name_query, before_id, total_crops=None):
+        """Query one page of crops, resolve customer name / event type (worker thread)"""
+        page_crops = self.db.get_crops(offset=offset, limit=limit,
+                                       name_query=name_query, before_id=before_id)
+        if total_crops is None:
+            total_crops = self.db.count_crops(name_query=name_query)
+
+        # Một query IN (...) cho tất cả khách hàng trên trang
+        customers = self.db.get_customers_by_ids(crop.customer_id for crop in page_crops if crop.customer_id)
+        customer_names = {customer_id: customer.name for customer_id, customer in customers.items()}
+
+        # Chọn ảnh cho thumbnail: ưu tiên file .thumb.webp, không có thì dùng ảnh gốc
+        thumb_sources = {}
+        for crop in page_crops:
+            for path in (crop.get_thumbnail_path(), crop.file_path):
+                try:
+                    thumb_sources[crop.id] = (path, os.stat(path).st_mtime)
+                    break
+                except OSError:
                     continue
-                
-                filtered_crops.append(crop)
-            
-            # Pagination
-            start_idx = (self.crops_page - 1) * self.crops_per_page
-            end_idx = start_idx + self.crops_per_page
-            page_crops = filtered_crops[start_idx:end_idx]
-            
+
+        event_types = {}
+        try:
+            # Crop là dataclass: event_id luôn tồn tại (có thể None)
+            events = self.db.get_events_by_ids(crop.event_id for crop in page_crops if crop.event_id)
+            event_types = {event_id: event.event_type for event_id, event in events.items()}
+        except Exception as e:
+            log.error(f"Error getting event for crop: {e}")
+
+        return page_crops, customer_names, event_types, thumb_sources, total_crops
+
+    def _apply_crops(self, result):
+        """Update crops table with query result"""
+        try:
+            page_crops, customer_names, event_types, thumb_sources, total_crops = result
+
             # Update table
-            self.crops_table.setRowCount(len(page_crops))
-            
-            for row, crop in enumerate(page_crops):
-                # ID
-                self.crops_table.setItem(row, 0, QTableWidgetItem(str(crop.id)))
-                
-                # Thumbnail
-                thumbnail_widget = self.create_thumbnail_widget(crop)
-                self.crops_table.setCellWidget(row, 1, thumbnail_widget)
-                
-                # Customer name
-                customer = self.db.get_customer(crop.customer_id) if crop.customer_id else None
-                customer_name = customer.name if customer else "Unknown"
-                self.crops_table.setItem(row, 2, QTableWidgetItem(customer_name))
-                
-                # Confidence
-                self.crops_table.setItem(row, 3, QTableWidgetItem(f"{crop.confidence:.1f}%"))
-                
-                # Event Type
-                event_type = "N/A"
-                if hasattr(crop, 'event_id') and crop.event_id:
-                    try:
-                        events = self.db.get_recent_events(limit=1000)
-                        event = next((e for e in events if e.id == crop.event_id), None)
-                        if event:
-                            event_type = event.event_type
-                    except Exception as e:
-                        log.error(f"Error getting event for crop: {e}")
-                
-                self.crops_table.setItem(row, 4, QTableWidgetItem(event_type))
-                
-                # Timestamp
-                if hasattr(crop, 'timestamp') and crop.timestamp:
-                    timestamp = crop.timestamp.strftime("%Y-%m-%d %H:%M:%S")
-                else:
-                    timestamp = "N/A"
-                self.crops_table.setItem(row, 5, QTableWidgetItem(timestamp))
+            if page_crops:
+                self._crops_page_cursors[self.crops_page + 1] = page_crops[-1].id
+            self.crops_model.set_rows(page_crops, customer_names, event_types, thumb_sources)
             
             # Update page label
-            total_crops = len(filtered_crops)
+            self._crops_total = total_crops
             total_pages = (total_crops + self.crops_per_page - 1) // self.crops_per_page
             self.crops_page_label.setText(f"Trang {self.crops_page}/{max(1, total_pages)}")
+            self.crops_prev_btn.setEnabled(self.crops_page > 1)
+            self.crops_next_btn.setEnabled(self.crops_page * self.crops_per_page < total_crops)
+
+            self._prefetch_next_crops_page()
             
         except Exception as e:
             log.error(f"Error refreshing crops: {e}")
@@ -1582,17 +2109,16 @@ class ModernAdminPanel(QMainWindow):
         """Change items per page"""
         self.crops_per_page = int(value)
         self.crops_page = 1
+        self._crops_page_cursors.clear()
         self.refresh_crops()
     
     def show_crop_detail_from_table(self, index):
         """Show crop detail from table row"""
         try:
-            row = index.row()
-            crop_id = int(self.crops_table.item(row, 0).text())
+            crop_id = self.crops_model.row_at(index.row()).id
             
-            # Find crop from database
-            crops = self.db.get_recent_crops(limit=1000)
-            crop = next((c for c in crops if c.id == crop_id), None)
+            # Lookup theo primary key (crop cũ hơn 1000 dòng gần nhất vẫn tìm được)
+            crop = self.db.get_crop(crop_id)
             
             if crop:
                 self.show_crop_detail(crop)
@@ -1607,8 +2133,8 @@ class ModernAdminPanel(QMainWindow):
         try:
             dialog = QDialog(self)
             dialog.setWindowTitle(f"Chi tiết Crop #{crop.id}")
+            dialog.setObjectName("DetailDialog")
             dialog.setMinimumSize(600, 700)
-            dialog.setStyleSheet("background-color: #f8fafc;")
             
             layout = QVBoxLayout()
             layout.setSpacing(20)
@@ -1616,33 +2142,42 @@ class ModernAdminPanel(QMainWindow):
             
             # Header
             header = QLabel(f"Crop #{crop.id}")
-            header_font = QFont()
-            header_font.setPointSize(18)
-            header_font.setBold(True)
-            header.setFont(header_font)
-            header.setStyleSheet("color: #0f172a;")
+            header.setFont(TITLE_18)
+            header.setObjectName("DialogHeader")
             layout.addWidget(header)
             
             # Image card
             image_card = ModernCard()
-            file_path = Path(crop.file_path)
-            if file_path.exists():
-                pixmap = QPixmap(str(file_path))
-                if not pixmap.isNull():
-                    image_label = QLabel()
-                    scaled = pixmap.scaled(500, 500, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            try:
+                st = os.stat(crop.file_path)
+            except OSError:
+                st = None
+            if st is not None:
+                image_label = QLabel()
+                image_label.setAlignment(Qt.AlignCenter)
+                image_card.add_widget(image_label)
+
+                # Ảnh đã scale được cache theo (path, mtime): mở lại cùng crop không đọc/scale lại
+                cache_key = f"crop_detail:{crop.file_path}:{st.st_mtime}:500"
+                scaled = QPixmapCache.find(cache_key)
+                if scaled is not None and not scaled.isNull():
                     image_label.setPixmap(scaled)
-                    image_label.setAlignment(Qt.AlignCenter)
-                    image_card.add_widget(image_label)
+                else:
+                    # Decode trên worker thread, dialog hiện ngay với placeholder
+                    image_label.setText("Đang tải…")
+                    loader = PixmapLoader(crop.file_path, 500, 500, smooth=None)
+                    loader.signals.loaded.connect(
+                        partial(self._on_crop_detail_image_loaded, image_label, cache_key)
+                    )
+                    dialog._loader = loader
+                    QThreadPool.globalInstance().start(loader)
             
             layout.addWidget(image_card)
             
             # Info card
             info_card = ModernCard()
-            info_form = QFormLayout()
-            info_form.setSpacing(12)
             
-            customer = self.db.get_customer(crop.customer_id) if crop.customer_id else None
+            customer = self._customer_by_id(crop.customer_id) if crop.customer_id else None
             customer_name = customer.name if customer else "Unknown"
             
             details = [
@@ -1652,40 +2187,22 @@ class ModernAdminPanel(QMainWindow):
                 ("Crop ID:", str(crop.id)),
             ]
             
-            if hasattr(crop, 'timestamp') and crop.timestamp:
-                details.append(("Thời gian:", crop.timestamp.strftime("%Y-%m-%d %H:%M:%S")))
+            if crop.timestamp:
+                details.append(("Thời gian:", _format_timestamp(crop.timestamp)))
             
-            for label_text, value_text in details:
-                label = QLabel(label_text)
-                label.setStyleSheet("color: #64748b; font-weight: 600; font-size: 13px;")
-                
-                value = QLabel(str(value_text))
-                value.setStyleSheet("color: #0f172a; font-size: 14px;")
-                value.setWordWrap(True)
-                
-                info_form.addRow(label, value)
-            
-            info_card.add_layout(info_form)
+            # Một QLabel rich text cho cả block thay vì một cặp QLabel mỗi dòng
+            info_label = QLabel(_detail_table_html(details))
+            info_label.setObjectName("DetailValue")
+            info_label.setTextFormat(Qt.RichText)
+            info_label.setWordWrap(True)
+            info_card.add_widget(info_label)
             layout.addWidget(info_card)
             
             # Close button
             close_btn = QPushButton("Đóng")
+            close_btn.setObjectName("PrimaryButton")
             close_btn.setMinimumHeight(44)
             close_btn.setCursor(Qt.PointingHandCursor)
-            close_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #6366f1;
-                    color: white;
-                    border: none;
-                    border-radius: 8px;
-                    font-size: 14px;
-                    font-weight: 600;
-                    padding: 12px 24px;
-                }
-                QPushButton:hover {
-                    background-color: #4f46e5;
-                }
-            """)
             close_btn.clicked.connect(dialog.accept)
             layout.addWidget(close_btn, alignment=Qt.AlignRight)
             
@@ -1696,21 +2213,38 @@ class ModernAdminPanel(QMainWindow):
             log.error(f"Error showing crop detail: {e}")
             QMessageBox.warning(self, "Lỗi", f"Không thể hiển thị chi tiết: {e}")
     
+    def _on_crop_detail_image_loaded(self, image_label, cache_key, image):
+        """Show decoded crop image in the detail dialog (GUI thread)"""
+        if image.isNull():
+            image_label.setText("Không có ảnh")
+            return
+        pixmap = QPixmap.fromImage(image)
+        QPixmapCache.insert(cache_key, pixmap)
+        image_label.setPixmap(pixmap)
+
+    def _on_crops_search_changed(self, _text):
+        """Restart debounce timer on each keystroke"""
+        self._crops_search_timer.start()
+
     def filter_crops(self):
         """Filter crops"""
         self.crops_page = 1
+        self._crops_page_cursors.clear()
         self.refresh_crops()
     
     def crops_prev_page(self):
         """Previous page"""
         if self.crops_page > 1:
             self.crops_page -= 1
-            self.refresh_crops()
+            self._load_crops_page()
     
     def crops_next_page(self):
         """Next page"""
+        # Trang cuối: không gửi query thừa
+        if self._crops_total is not None and self.crops_page * self.crops_per_page >= self._crops_total:
+            return
         self.crops_page += 1
-        self.refresh_crops()
+        self._load_crops_page()
     
     # Management methods
     def manage_users(self):
@@ -1722,147 +2256,84 @@ class ModernAdminPanel(QMainWindow):
             log.error(f"Error opening user management: {e}")
             QMessageBox.warning(self, "Lỗi", f"Không thể mở quản lý người dùng: {e}")
     
-    def load_models(self):
-        """Load face recognition models from database configuration"""
+    def load_models(self, on_done=None):
+        """Load face recognition models on a worker thread, on_done(success) chạy trên UI thread"""
+        if self._model_loader is not None:
+            # Đang load: không khởi động thêm thread
+            return
+
         # Reset models first to ensure clean state
+        self.core = None
         self.face_detector = None
         self.landmarks_detector = None
         self.face_identifier = None
         self.faces_database = None
         self.models_loaded = False
-        
-        try:
-            # Reload model config from database (in case it was updated)
-            model_config = self.db.get_model_config()
-            self.model_fd_path = model_config.get('model_fd_path', '')
-            self.model_lm_path = model_config.get('model_lm_path', '')
-            self.model_reid_path = model_config.get('model_reid_path', '')
-            self.gallery_path = model_config.get('gallery_path', './gallery')
-            
-            log.info(f"Loading models from config: FD={self.model_fd_path}, LM={self.model_lm_path}, ReID={self.model_reid_path}")
-            
-            # Check if Core and utils are available
-            if Core is None or FaceDetector is None:
-                log.error("OpenVINO or utils modules not available")
-                return False
-            
-            # Check if model files exist
-            if not all([
-                Path(self.model_fd_path).exists() if self.model_fd_path else False,
-                Path(self.model_lm_path).exists() if self.model_lm_path else False,
-                Path(self.model_reid_path).exists() if self.model_reid_path else False
-            ]):
-                log.warning(f"Model files not found. FD={self.model_fd_path}, LM={self.model_lm_path}, ReID={self.model_reid_path}")
-                return False
-            
-            # Initialize OpenVINO Core
-            self.core = Core()
-            log.info(f"OpenVINO Version: {get_version()}")
-            
-            # Load Face Detector
-            log.info(f"Loading Face Detection model: {self.model_fd_path}")
-            try:
-                self.face_detector = FaceDetector(
-                    self.core,
-                    Path(self.model_fd_path),
-                    input_size=(0, 0),
-                    confidence_threshold=0.6,
-                    roi_scale_factor=1.15
-                )
-                self.face_detector.deploy("CPU")
-                log.info("✓ Face Detection model loaded successfully")
-            except Exception as e:
-                log.error(f"Failed to load Face Detection model: {e}", exc_info=True)
-                raise
-            
-            # Load Landmarks Detector
-            log.info(f"Loading Landmarks model: {self.model_lm_path}")
-            try:
-                self.landmarks_detector = LandmarksDetector(
-                    self.core,
-                    Path(self.model_lm_path)
-                )
-                self.landmarks_detector.deploy("CPU", 16)
-                log.info("✓ Landmarks Detection model loaded successfully")
-            except Exception as e:
-                log.error(f"Failed to load Landmarks Detection model: {e}", exc_info=True)
-                raise
-            
-            # Load Face Identifier
-            log.info(f"Loading Re-ID model: {self.model_reid_path}")
-            try:
-                self.face_identifier = FaceIdentifier(
-                    self.core,
-                    Path(self.model_reid_path),
-                    match_threshold=0.3,
-                    match_algo='HUNGARIAN'
-                )
-                self.face_identifier.deploy("CPU", 16)
-                log.info("✓ Face Reidentification model loaded successfully")
-            except Exception as e:
-                log.error(f"Failed to load Face Reidentification model: {e}", exc_info=True)
-                raise
-            
-            # Ensure gallery folder exists before loading Faces Database
-            gallery_path_obj = Path(self.gallery_path)
-            if not gallery_path_obj.exists():
-                log.info(f"Gallery folder does not exist, creating: {self.gallery_path}")
-                gallery_path_obj.mkdir(parents=True, exist_ok=True)
-            
-            # Load Faces Database
-            log.info(f"Building faces database from: {self.gallery_path}")
-            try:
-                self.faces_database = FacesDatabase(
-                    self.gallery_path,
-                    self.face_identifier,
-                    self.landmarks_detector,
-                    self.face_detector,
-                    no_show=True
-                )
-                self.face_identifier.set_faces_database(self.faces_database)
-                log.info("✓ Faces database built successfully")
-            except Exception as e:
-                log.error(f"Error initializing FacesDatabase: {e}", exc_info=True)
-                raise  # Re-raise to be caught by outer exception handler
-            
-            # Verify all models are loaded correctly
-            models_status = {
-                'face_detector': self.face_detector is not None,
-                'landmarks_detector': self.landmarks_detector is not None,
-                'face_identifier': self.face_identifier is not None,
-                'faces_database': self.faces_database is not None
+
+        progress = QProgressDialog("Đang tải models... Vui lòng đợi.", None, 0, 0, self)
+        progress.setWindowTitle("Đang load models")
+        progress.setCancelButton(None)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.show()
+
+        self._model_loader = ModelLoaderThread(self.db, self._reusable_models, self)
+        self._model_loader.progress_changed.connect(progress.setLabelText)
+        self._model_loader.loaded.connect(partial(self._on_models_loaded, progress, on_done))
+        self._model_loader.start()
+
+    def _on_models_loaded(self, progress, on_done, result):
+        """Nhận models từ ModelLoaderThread (UI thread)"""
+        progress.close()
+        self._model_loader = None
+        model_config, models = result
+
+        self.model_fd_path = model_config.get('model_fd_path', '')
+        self.model_lm_path = model_config.get('model_lm_path', '')
+        self.model_reid_path = model_config.get('model_reid_path', '')
+        self.gallery_path = model_config.get('gallery_path', './gallery')
+        self.model_device = model_config.get('model_device', 'CPU')
+
+        self._reusable_models = {}
+        if models:
+            self.core = models['core']
+            self.face_detector = models['face_detector']
+            self.landmarks_detector = models['landmarks_detector']
+            self.face_identifier = models['face_identifier']
+            self.faces_database = models['faces_database']
+            self.models_loaded = True
+            self._reusable_models = {
+                'model_fd_path': ((self.model_fd_path, model_config.get('device_fd', self.model_device)),
+                                  self.face_detector),
+                'model_lm_path': ((self.model_lm_path, model_config.get('device_lm', self.model_device)),
+                                  self.landmarks_detector),
+                'model_reid_path': ((self.model_reid_path, model_config.get('device_reid', self.model_device)),
+                                    self.face_identifier),
             }
-            
-            if not all(models_status.values()):
-                failed_models = [name for name, status in models_status.items() if not status]
-                log.error(f"Some models failed to load properly. Failed models: {failed_models}")
-                log.error(f"Model status: {models_status}")
-                self.face_detector = None
-                self.landmarks_detector = None
-                self.face_identifier = None
-                self.faces_database = None
-                self.models_loaded = False
-                return False
-            
             log.info("✓ All models verified successfully")
-            
-            self.models_loaded = True
             log.info(f"Models loaded successfully. Database: {len(self.faces_database)} identities")
-            log.debug(f"Models verification: face_detector={self.face_detector is not None}, "
-                     f"landmarks_detector={self.landmarks_detector is not None}, "
-                     f"face_identifier={self.face_identifier is not None}, "
-                     f"faces_database={self.faces_database is not None}")
-            return True
-            
-        except Exception as e:
-            log.error(f"Error loading models: {e}", exc_info=True)
-            # Ensure models are reset on error
-            self.face_detector = None
-            self.landmarks_detector = None
-            self.face_identifier = None
-            self.faces_database = None
-            self.models_loaded = False
-            return False
+
+        if on_done:
+            on_done(self.models_loaded)
+
+    def _show_models_load_error(self):
+        """Warn that models could not be loaded"""
+        QMessageBox.warning(
+            self,
+            "Lỗi",
+            "Không thể load models!\n\n"
+            "Vui lòng kiểm tra:\n"
+            "• Đường dẫn models trong Cấu hình Models AI\n"
+            "• Models có tồn tại không\n"
+            "• Đã cài đặt OpenVINO chưa"
+        )
+
+    def _open_customers_after_load(self, success):
+        """Mở quản lý khách hàng sau khi load models xong"""
+        if success:
+            self.manage_customers()
+        else:
+            self._show_models_load_error()
     
     def manage_customers(self):
         """Open customer management dialog"""
@@ -1880,25 +2351,10 @@ class ModernAdminPanel(QMainWindow):
                 )
                 
                 if reply == QMessageBox.Yes:
-                    QMessageBox.information(
-                        self,
-                        "Đang load models",
-                        "Đang tải models... Vui lòng đợi."
-                    )
-                    if not self.load_models():
-                        QMessageBox.warning(
-                            self,
-                            "Lỗi",
-                            "Không thể load models!\n\n"
-                            "Vui lòng kiểm tra:\n"
-                            "• Đường dẫn models trong Cấu hình Models AI\n"
-                            "• Models có tồn tại không\n"
-                            "• Đã cài đặt OpenVINO chưa"
-                        )
-                        return
-                else:
-                    # User chose not to load models
-                    return
+                    # Load trên worker thread, dialog mở lại khi load xong
+                    self.load_models(self._open_customers_after_load)
+                # User chose not to load models hoặc đang chờ load
+                return
             
             # Verify models are actually loaded (not just flag set)
             # Use explicit None check because FacesDatabase can be empty (0 identities) but still valid
@@ -1916,22 +2372,8 @@ class ModernAdminPanel(QMainWindow):
                            f"faces_database={self.faces_database is not None}")
                 
                 # Try to reload models
-                QMessageBox.information(
-                    self,
-                    "Đang load models",
-                    "Models chưa được load đầy đủ. Đang tải lại models... Vui lòng đợi."
-                )
-                if not self.load_models():
-                    QMessageBox.warning(
-                        self,
-                        "Lỗi",
-                        "Không thể load models!\n\n"
-                        "Vui lòng kiểm tra:\n"
-                        "• Đường dẫn models trong Cấu hình Models AI\n"
-                        "• Models có tồn tại không\n"
-                        "• Đã cài đặt OpenVINO chưa"
-                    )
-                    return
+                self.load_models(self._open_customers_after_load)
+                return
             
             # Open dialog with models
             log.info(f"Opening customer management dialog with models loaded: "
@@ -1964,6 +2406,7 @@ class ModernAdminPanel(QMainWindow):
                 )
                 return
             
+            from customer_management_dialog import CustomerManagementDialog
             dialog = CustomerManagementDialog(
                 self.db,
                 self,
@@ -1974,6 +2417,8 @@ class ModernAdminPanel(QMainWindow):
                 gallery_path=self.gallery_path
             )
             dialog.exec_()
+            # Khách hàng có thể đã bị sửa/xoá trong dialog
+            self._customer_by_id.cache_clear()
         except Exception as e:
             log.error(f"Error opening customer management: {e}", exc_info=True)
             QMessageBox.warning(self, "Lỗi", f"Không thể mở quản lý khách hàng: {e}")
@@ -1986,24 +2431,37 @@ class ModernAdminPanel(QMainWindow):
             self.lm_input.setText(config.get('model_lm_path', ''))
             self.reid_input.setText(config.get('model_reid_path', ''))
             self.gallery_input.setText(config.get('gallery_path', ''))
+            self.device_input.setCurrentText(config.get('model_device', 'CPU'))
             
             # Update internal paths
             self.model_fd_path = config.get('model_fd_path', '')
             self.model_lm_path = config.get('model_lm_path', '')
             self.model_reid_path = config.get('model_reid_path', '')
             self.gallery_path = config.get('gallery_path', './gallery')
+            self.model_device = config.get('model_device', 'CPU')
         except Exception as e:
             log.error(f"Error loading model config: {e}")
     
+    def _loaded_models_match_ir(self, model_keys, use_int8):
+        """Models đang chạy có đúng file IR mà load lại sẽ chọn không (use_int8 có thể đã đổi)"""
+        resolve_model_path = _get_face_modules()[-1]
+        return all(Path(self._reusable_models[path_key][1].model_path)
+                   == Path(resolve_model_path(path, use_int8=use_int8))
+                   for path_key, (path, _) in model_keys.items())
+
     def save_model_config(self):
         """Save model configuration"""
         try:
+            old_paths = (self.model_fd_path, self.model_lm_path, self.model_reid_path,
+                         self.gallery_path, self.model_device)
+
             # Save to database
             self.db.save_model_config(
                 self.fd_input.text(),
                 self.lm_input.text(),
                 self.reid_input.text(),
-                self.gallery_input.text()
+                self.gallery_input.text(),
+                self.device_input.currentText().strip() or 'CPU'
             )
             
             # Update internal paths
@@ -2011,9 +2469,32 @@ class ModernAdminPanel(QMainWindow):
             self.model_lm_path = self.lm_input.text()
             self.model_reid_path = self.reid_input.text()
             self.gallery_path = self.gallery_input.text()
+            self.model_device = self.device_input.currentText().strip() or 'CPU'
+
+            new_paths = (self.model_fd_path, self.model_lm_path, self.model_reid_path,
+                         self.gallery_path, self.model_device)
+            # (path, device) mong muốn của từng model, device riêng (device_fd/...) nếu có
+            saved_config = self.db.get_model_config()
+            model_keys = {
+                path_key: (saved_config.get(path_key, ''),
+                           saved_config.get(MODEL_DEVICE_KEYS[path_key], self.model_device))
+                for path_key in MODEL_DEVICE_KEYS
+            }
+            use_int8 = saved_config.get('use_int8', '1') == '1'
+            if (self.models_loaded and new_paths == old_paths
+                    and all(self._reusable_models[k][0] == key for k, key in model_keys.items())
+                    and self._loaded_models_match_ir(model_keys, use_int8)):
+                # Cấu hình không đổi: models đang chạy vẫn hợp lệ
+                QMessageBox.information(self, "Đã lưu", "Cấu hình đã được lưu! Models không thay đổi.")
+                return
             
-            # Reset models_loaded flag and models since config changed
-            # Models cũ không còn hợp lệ với config mới
+            # Chỉ bỏ detector có đường dẫn/device thay đổi, detector còn lại được dùng lại khi load
+            for path_key, key in model_keys.items():
+                previous = self._reusable_models.get(path_key)
+                if previous is not None and previous[0] != key:
+                    del self._reusable_models[path_key]
+
+            # FacesDatabase phụ thuộc gallery + cả 3 detectors nên luôn build lại khi load
             self.models_loaded = False
             self.face_detector = None
             self.landmarks_detector = None
@@ -2031,23 +2512,7 @@ class ModernAdminPanel(QMainWindow):
             )
             
             if reply == QMessageBox.Yes:
-                if self.load_models():
-                    QMessageBox.information(
-                        self,
-                        "Thành công",
-                        f"Cấu hình đã được lưu và models đã được load!\n\n"
-                        f"Database: {len(self.faces_database)} identities"
-                    )
-                else:
-                    QMessageBox.warning(
-                        self,
-                        "Cảnh báo",
-                        "Cấu hình đã được lưu nhưng không thể load models!\n\n"
-                        "Vui lòng kiểm tra:\n"
-                        "• Đường dẫn models có đúng không\n"
-                        "• Models có tồn tại không\n"
-                        "• Đã cài đặt OpenVINO chưa"
-                    )
+                self.load_models(self._report_config_models_loaded)
             else:
                 # User chose not to load models - show info that they need to load later
                 QMessageBox.information(
@@ -2061,6 +2526,26 @@ class ModernAdminPanel(QMainWindow):
             log.error(f"Error saving model config: {e}")
             QMessageBox.warning(self, "Lỗi", f"Không thể lưu cấu hình: {e}")
     
+    def _report_config_models_loaded(self, success):
+        """Báo kết quả load models sau khi lưu cấu hình"""
+        if success:
+            QMessageBox.information(
+                self,
+                "Thành công",
+                f"Cấu hình đã được lưu và models đã được load!\n\n"
+                f"Database: {len(self.faces_database)} identities"
+            )
+        else:
+            QMessageBox.warning(
+                self,
+                "Cảnh báo",
+                "Cấu hình đã được lưu nhưng không thể load models!\n\n"
+                "Vui lòng kiểm tra:\n"
+                "• Đường dẫn models có đúng không\n"
+                "• Models có tồn tại không\n"
+                "• Đã cài đặt OpenVINO chưa"
+            )
+    
     def save_system_settings(self):
         """Save system settings"""
         try:
@@ -2091,13 +2576,17 @@ class ModernAdminPanel(QMainWindow):
     
     def refresh_current_page(self):
         """Refresh current active page"""
+        # Không refresh khi cửa sổ bị ẩn hoặc thu nhỏ
+        if not self.isVisible() or self.isMinimized():
+            return
+
         current_idx = self.stacked_widget.currentIndex()
         if current_idx == 0:  # Dashboard
             self.refresh_dashboard()
         elif current_idx == 1:  # Events
             self.refresh_events()
         elif current_idx == 2:  # Crops
-            self.refresh_crops()
+            self.reload_crops_page()
     
     def logout(self):
         """Logout - emit signal để main.py xử lý"""
@@ -2109,19 +2598,31 @@ class ModernAdminPanel(QMainWindow):
         if hasattr(self, 'refresh_timer'):
             self.refresh_timer.stop()
     
+    def on_application_state_changed(self, state):
+        """Pause refresh timer while the application is inactive"""
+        if state == Qt.ApplicationActive:
+            if self.isVisible() and not self.isMinimized():
+                self.refresh_timer.start()
+        else:
+            self.refresh_timer.stop()
+
+    def hideEvent(self, event):
+        """Stop refresh timer when hidden"""
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
     def showEvent(self, event):
         """Show fullscreen"""
         super().showEvent(event)
-        try:
-            from PyQt5.QtWidgets import QApplication
-            screen = QApplication.primaryScreen().availableGeometry()
-            self.setGeometry(screen)
-            self.showFullScreen()
-        except:
-            self.showFullScreen()
+        self.refresh_timer.start()
+        # showFullScreen đã chiếm toàn màn hình, setGeometry trước đó chỉ thêm một lượt layout
+        self.showFullScreen()
     
     def keyPressEvent(self, event):
         """Handle ESC key to exit fullscreen"""
+        # Giữ ESC sinh auto-repeat: chỉ toggle một lần cho mỗi lần nhấn
+        if event.isAutoRepeat():
+            return super().keyPressEvent(event)
         if event.key() == Qt.Key_Escape:
             # Toggle fullscreen on ESC
             if self.isFullScreen():
@@ -2133,6 +2634,12 @@ class ModernAdminPanel(QMainWindow):
     def closeEvent(self, event):
         """Handle close"""
         self.refresh_timer.stop()
+        # Bỏ kết quả của các query async còn đang chạy
+        self._read_generations.clear()
+        if self._model_loader is not None:
+            # QThread không được huỷ khi đang chạy
+            self._model_loader.loaded.disconnect()
+            self._model_loader.wait()
         event.accept()
 
 
@@ -5,46 +5,18 @@ Auto-apply enhancements to facere_gui.py
 Tự động apply tất cả modifications
 """
 
+import os
 import sys
+import json
 import shutil
+import hashlib
+from itertools import islice
 from pathlib import Path
 
-print("=" * 70)
-print("AUTO-APPLY ENHANCEMENTS TO FACERE_GUI.PY")
-print("=" * 70)
-
-# Check if original file exists
-original_file = Path("facere_gui.py")
-if not original_file.exists():
-    print("❌ Error: facere_gui.py not found!")
-    print("   Make sure you're in the correct directory.")
-    sys.exit(1)
-
-# Backup original file
-backup_file = Path("facere_gui.py.backup")
-if not backup_file.exists():
-    print(f"\n📦 Creating backup: {backup_file}")
-    shutil.copy2(original_file, backup_file)
-    print("   ✅ Backup created successfully!")
-else:
-    print(f"\n⚠️  Backup already exists: {backup_file}")
-    response = input("   Continue anyway? (y/n): ")
-    if response.lower() != 'y':
-        print("   ❌ Aborted.")
-        sys.exit(0)
-
-print("\n📝 Reading original file...")
-with open(original_file, 'r', encoding='utf-8') as f:
-    lines = f.readlines()
-
-print(f"   ✅ Read {len(lines)} lines")
+# Patch plan là hằng số của script: build một lần khi load module
 
-# Modifications
-modifications = []
-
-# 1. Add imports after line 45
-print("\n1️⃣  Adding new imports...")
-import_code = """
+# 1. Imports mới, chèn sau dòng 45
+_IMPORT_CODE = """
 # NEW IMPORTS FOR EVENTS & CROPS MANAGEMENT
 from datetime import datetime
 try:
@@ -57,20 +29,16 @@ except ImportError as e:
     log.warning("Events and Crops features will be disabled")
 
 """
-modifications.append(('insert_after', 45, import_code))
 
-# 2. Add new signals to VideoThread after line 54
-print("2️⃣  Adding new signals to VideoThread...")
-signals_code = """    # NEW: Signals for events and crops
+# 2. Signals mới cho VideoThread, chèn sau dòng 54
+_SIGNALS_CODE = """    # NEW: Signals for events and crops
     face_recognized_signal = pyqtSignal(dict)  # {'name': ..., 'id': ..., 'bbox': ..., 'confidence': ..., 'crop': ..., 'face_id': ...}
     unknown_face_signal = pyqtSignal(dict)  # {'bbox': ..., 'confidence': ..., 'crop': ...}
 
 """
-modifications.append(('insert_after', 54, signals_code))
 
-# 3. Replace face info appending in VideoThread.run() around line 159-164
-print("3️⃣  Modifying VideoThread.run() to emit new signals...")
-replace_code = """                            # Save face info
+# 3. Emit signals trong VideoThread.run(), thay dòng 159-164
+_REPLACE_CODE = """                            # Save face info
                             face_info = {
                                 'crop': face_crop,
                                 'label': label,
@@ -101,16 +69,95 @@ replace_code = """                            # Save face info
                                     'crop': face_crop
                                 })
 """
-modifications.append(('replace', (159, 164), replace_code))
+
+# (kind, target, code, số dòng của code)
+MODIFICATIONS = (
+    ('insert_after', 45, _IMPORT_CODE, _IMPORT_CODE.count('\n')),
+    ('insert_after', 54, _SIGNALS_CODE, _SIGNALS_CODE.count('\n')),
+    ('replace', (159, 164), _REPLACE_CODE, _REPLACE_CODE.count('\n')),
+)
+
+# Mỗi modification thành (start, end, code): dòng [start, end) (0-based) được thay bằng code
+# (insert_after N -> start = end = N), sắp theo dòng để áp dụng trong một lượt
+SEGMENTS = sorted(
+    ((mod[1], mod[1], mod[2]) if mod[0] == 'insert_after' else (mod[1][0], mod[1][1] + 1, mod[2])
+     for mod in MODIFICATIONS),
+    key=lambda segment: segment[0]
+)
+assert all(prev[1] <= cur[0] for prev, cur in zip(SEGMENTS, SEGMENTS[1:])), \
+    "Patch plan has overlapping line ranges"
+
+print("=" * 70)
+print("AUTO-APPLY ENHANCEMENTS TO FACERE_GUI.PY")
+print("=" * 70)
+
+# Check if original file exists
+original_file = Path("facere_gui.py")
+if not original_file.exists():
+    print("❌ Error: facere_gui.py not found!")
+    print("   Make sure you're in the correct directory.")
+    sys.exit(1)
+
+# Output đã được tạo từ đúng file gốc + modifications này thì không patch lại.
+# File nhỏ patch lại còn nhanh hơn hash, nên chỉ cache khi file gốc đủ lớn
+CACHE_MIN_SIZE = 16 * 1024
+cache_file = Path(".apply_enhancements.cache.json")
+output_file = Path("facere_gui_partial.py")
+
+
+def file_sha256(path):
+    """SHA-256 của file, đọc từng block 1 MiB"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+use_cache = original_file.stat().st_size > CACHE_MIN_SIZE
+if use_cache:
+    fingerprint = {
+        'src_hash': file_sha256(original_file),
+        'mods_hash': hashlib.sha256(repr(MODIFICATIONS).encode('utf-8')).hexdigest(),
+    }
+    try:
+        cached = json.loads(cache_file.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        cached = {}
+    if (output_file.exists()
+            and all(cached.get(key) == value for key, value in fingerprint.items())
+            and cached.get('out_hash') == file_sha256(output_file)):
+        print(f"\n✅ {output_file} is up to date (cached), nothing to do.")
+        sys.exit(0)
+
+# Backup original file
+backup_file = Path("facere_gui.py.backup")
+if not backup_file.exists():
+    print(f"\n📦 Creating backup: {backup_file}")
+    shutil.copy2(original_file, backup_file)
+    print("   ✅ Backup created successfully!")
+else:
+    print(f"\n⚠️  Backup already exists: {backup_file}")
+    response = input("   Continue anyway? (y/n): ")
+    if response.lower() != 'y':
+        print("   ❌ Aborted.")
+        sys.exit(0)
+
+print("\n📝 Reading original file...")
+# Chỉ đếm dòng, nội dung được stream lại khi ghi file output
+with open(original_file, 'r', encoding='utf-8') as f:
+    line_count = sum(1 for _ in f)
+
+print(f"   ✅ Read {line_count} lines")
 
 print("\n" + "=" * 70)
 print("MODIFICATIONS TO APPLY:")
 print("=" * 70)
-for i, mod in enumerate(modifications, 1):
+for i, mod in enumerate(MODIFICATIONS, 1):
     if mod[0] == 'insert_after':
-        print(f"{i}. Insert after line {mod[1]}: {mod[2].count(chr(10))} lines")
+        print(f"{i}. Insert after line {mod[1]}: {mod[3]} lines")
     elif mod[0] == 'replace':
-        print(f"{i}. Replace lines {mod[1][0]}-{mod[1][1]}: {mod[2].count(chr(10))} lines")
+        print(f"{i}. Replace lines {mod[1][0]}-{mod[1][1]}: {mod[3]} lines")
 
 print("\n⚠️  WARNING: This script applies PARTIAL modifications only!")
 print("   For COMPLETE modifications, follow IMPLEMENTATION_GUIDE.md manually.")
@@ -132,35 +179,56 @@ if response.lower() != 'y':
 # Apply modifications
 print("\n🔧 Applying modifications...")
 
-# Create new content
-new_lines = lines.copy()
-
-# Apply in reverse order to maintain line numbers
-for mod in reversed(modifications):
+for mod in MODIFICATIONS:
     if mod[0] == 'insert_after':
-        line_num = mod[1]
-        code = mod[2]
-        new_lines.insert(line_num, code)
-        print(f"   ✅ Inserted after line {line_num}")
-
+        print(f"   ✅ Inserted after line {mod[1]}")
     elif mod[0] == 'replace':
-        start_line, end_line = mod[1]
-        code = mod[2]
-        # Remove old lines
-        for _ in range(start_line, end_line + 1):
-            if start_line < len(new_lines):
-                new_lines.pop(start_line)
-        # Insert new code
-        new_lines.insert(start_line, code)
-        print(f"   ✅ Replaced lines {start_line}-{end_line}")
-
-# Write modified file
-output_file = Path("facere_gui_partial.py")
-print(f"\n💾 Writing to: {output_file}")
-with open(output_file, 'w', encoding='utf-8') as f:
-    f.writelines(new_lines)
+        print(f"   ✅ Replaced lines {mod[1][0]}-{mod[1][1]}")
+
+# Hash của output được tính trong lúc ghi thay vì đọc lại cả file vừa ghi
+out_digest = hashlib.sha256() if use_cache else None
 
-print(f"   ✅ Written {len(new_lines)} lines")
+
+def write_output(dst, text):
+    """Ghi text ra output, cập nhật hash theo bytes thực tế trên disk"""
+    dst.write(text)
+    if out_digest is not None:
+        out_digest.update(text.replace('\n', os.linesep).encode('utf-8'))
+
+
+# Write modified file: đọc từng dòng từ file gốc, ghi qua một buffered writer
+print(f"\n💾 Writing to: {output_file}")
+written = 0
+with open(original_file, 'r', encoding='utf-8') as src, \
+        open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as dst:
+    line_no = 0  # Số dòng đã đọc từ file gốc
+    for start, end, code in SEGMENTS:
+        # Copy các dòng trước modification
+        while line_no < start:
+            line = src.readline()
+            if not line:
+                break
+            write_output(dst, line)
+            line_no += 1
+            written += 1
+        write_output(dst, code)
+        written += code.count('\n')
+        # Bỏ các dòng bị replace trong một lần gọi (islice consume trong C)
+        if end > line_no:
+            next(islice(src, end - line_no, end - line_no), None)
+            line_no = end
+    for line in src:
+        write_output(dst, line)
+        written += 1
+
+print(f"   ✅ Written {written} lines")
+
+if use_cache:
+    fingerprint['out_hash'] = out_digest.hexdigest()
+    try:
+        cache_file.write_text(json.dumps(fingerprint, indent=2), encoding='utf-8')
+    except OSError as e:
+        print(f"   ⚠️  Could not write cache {cache_file}: {e}")
 
 print("\n" + "=" * 70)
 print("✅ PARTIAL MODIFICATIONS APPLIED SUCCESSFULLY!")
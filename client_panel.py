@@ -6,9 +6,12 @@ Chỉ có quyền xem Live View và crops, không được chỉnh sửa
 """
 
 import sys
+import queue
 import logging as log
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from time import perf_counter, time
+from time import perf_counter, perf_counter_ns
 from datetime import datetime
 
 import cv2
@@ -20,12 +23,12 @@ from PyQt5.QtWidgets import (
     QMenu, QFileDialog, QDialog, QDialogButtonBox,
     QFormLayout, QLineEdit, QMessageBox
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize, QEvent
 from PyQt5.QtGui import QImage, QPixmap, QIcon, QFont
 from PyQt5.QtWidgets import QApplication
 
 try:
-    from openvino import Core, get_version
+    from openvino import get_version
 except ImportError:
     print("Vui lòng cài đặt OpenVINO: pip install openvino")
     sys.exit(1)
@@ -36,30 +39,297 @@ try:
         FaceDetector,
         LandmarksDetector,
         FaceIdentifier,
-        FacesDatabase
+        FacesDatabase,
+        get_core,
+        resolve_model_path
     )
 except ImportError:
     print("Không thể import utils. Vui lòng đảm bảo file utils.py tồn tại.")
     sys.exit(1)
 
 from database import Database
-from crops_manager import CropsManager
+from crops_manager import CropsManager, CROP_JPEG_PARAMS
 from events_manager import EventsManager
 from models import CustomerSegment, EventType
 
 
+def _mkfont(size, bold=False):
+    """Build a QFont once for reuse across widgets"""
+    font = QFont()
+    font.setPointSize(size)
+    font.setBold(bold)
+    return font
+
+
+# Font dùng chung - card detection được tạo liên tục nên không dựng QFont mỗi lần
+VIDEO_PLACEHOLDER_FONT = _mkfont(14)
+FPS_FONT = _mkfont(10)
+STATUS_FONT = _mkfont(12, True)
+DETAIL_FONT = _mkfont(9)
+
+# (status_color, card background) theo trạng thái khách
+KNOWN_CARD_COLORS = ("#04ff00", "rgba(46, 204, 113, 0.25)")  # Xanh lá nổi bật
+NEW_CARD_COLORS = ("#ff9800", "rgba(255, 152, 0, 0.25)")  # Cam nổi bật
+
+DETECTION_CARD_QSS = """
+    QWidget {{ 
+        border: none; 
+        border-radius: 8px; 
+        padding: 10px; 
+        background: {bg_color}; 
+        margin-bottom: 5px;
+    }}
+"""
+# File/RTSP mở bằng FFMPEG + hardware decode (VAAPI/QSV/D3D11 tuỳ máy) để CPU dành cho inference;
+# có thể ép QSV bằng biến môi trường OPENCV_FFMPEG_CAPTURE_OPTIONS="hwaccel;qsv"
+HW_DECODE_PARAMS = [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+
+# Lề quanh sprite nhãn để giữ cả phần glyph tràn ra ngoài nền (vd. chữ "p", "(")
+LABEL_SPRITE_PAD = 4
+
+
+@lru_cache(maxsize=256)
+def _label_sprite(text, color):
+    """
+    Render nhãn (nền màu + chữ trắng) một lần, cache theo (text, color)
+
+    Returns:
+        (sprite BGR, mask bool, dx, dy): góc trái trên sprite nằm tại (xmin + dx, ymin + dy)
+    """
+    (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
+    pad = LABEL_SPRITE_PAD
+    top = text_h + 10  # Nền nhãn: từ ymin - text_h - 10 tới ymin
+    sprite = np.zeros((top + baseline + 2 * pad, text_w + 2 * pad, 3), np.uint8)
+    mask = np.zeros(sprite.shape[:2], np.uint8)
+    for canvas, fill, ink in ((sprite, color, (255, 255, 255)), (mask, 255, 255)):
+        cv2.rectangle(canvas, (pad, pad), (pad + text_w, pad + top), fill, -1)
+        cv2.putText(canvas, text, (pad, pad + top - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.7, ink, 2)
+    return sprite, mask > 0, -pad, -(pad + top)
+
+
+def draw_label(frame, text, color, xmin, ymin):
+    """Vẽ nhãn phía trên bbox từ sprite đã cache (cắt theo biên frame)"""
+    sprite, mask, dx, dy = _label_sprite(text, tuple(color))
+    x0, y0 = xmin + dx, ymin + dy
+    fx0, fy0 = max(x0, 0), max(y0, 0)
+    fx1 = min(x0 + sprite.shape[1], frame.shape[1])
+    fy1 = min(y0 + sprite.shape[0], frame.shape[0])
+    if fx0 >= fx1 or fy0 >= fy1:
+        return
+    sx, sy = slice(fx0 - x0, fx1 - x0), slice(fy0 - y0, fy1 - y0)
+    np.copyto(frame[fy0:fy1, fx0:fx1], sprite[sy, sx], where=mask[sy, sx, None])
+
+
+# Video label khi đang phát: không nền/border (set 1 lần, setStyleSheet mỗi frame sẽ polish lại widget)
+VIDEO_LABEL_PLAYING_QSS = """
+    QLabel {
+        background: transparent;
+        border: none;
+        border-radius: 8px;
+    }
+"""
+CONF_LABEL_QSS = "color: #ffffff; padding: 2px; background: transparent;"
+TIME_LABEL_QSS = "color: #e0e0e0; padding: 2px; background: transparent;"
+
+
+class SimpleTracker:
+    """IoU tracker nhẹ: gán track-id (int) ổn định cho faces giữa các frame"""
+
+    # Thời điểm chụp/số lần chụp lưu trong mảng theo slot track_id % MAX_TRACKS
+    MAX_TRACKS = 1024
+
+    def __init__(self, iou_threshold=0.3, match_threshold=0.3, max_age=10.0, embedding_alpha=0.3):
+        """
+        Args:
+            iou_threshold: IoU tối thiểu để nối bbox với track của frame trước
+            match_threshold: Cosine distance (như FacesDatabase) tối đa để nối lại track theo embedding
+            max_age: Số giây không thấy thì bỏ track
+            embedding_alpha: Hệ số EMA cho embedding của track
+        """
+        self.iou_threshold = iou_threshold
+        self.match_threshold = match_threshold
+        self.max_age = max_age
+        self.embedding_alpha = embedding_alpha
+        # {track_id: {'bbox', 'last_seen', 'embedding'}}
+        self.tracks = {}
+        self._next_id = 0
+        self._last_capture = np.full(self.MAX_TRACKS, -np.inf, np.float64)
+        self._capture_count = np.zeros(self.MAX_TRACKS, np.int32)
+
+    def clear(self):
+        """Xoá mọi track"""
+        self.tracks.clear()
+        self._last_capture.fill(-np.inf)
+        self._capture_count.fill(0)
+
+    @staticmethod
+    def iou(boxes, other_boxes):
+        """IoU mọi cặp giữa (N, 4) và (M, 4) bboxes xyxy, trả về (N, M)"""
+        top_left = np.maximum(boxes[:, None, :2], other_boxes[None, :, :2])
+        bottom_right = np.minimum(boxes[:, None, 2:], other_boxes[None, :, 2:])
+        intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+        areas = np.prod(boxes[:, 2:] - boxes[:, :2], axis=1)
+        other_areas = np.prod(other_boxes[:, 2:] - other_boxes[:, :2], axis=1)
+        union = areas[:, None] + other_areas[None, :] - intersection
+        return intersection / np.maximum(union, 1e-6)
+
+    @staticmethod
+    def _greedy_assign(scores, min_score, assigned, track_ids):
+        """Gán track cho faces chưa có track theo score giảm dần (mỗi track tối đa 1 face)"""
+        used = set(assigned)
+        for i, j in zip(*np.unravel_index(np.argsort(-scores, axis=None), scores.shape)):
+            if scores[i, j] < min_score:
+                break
+            if assigned[i] is None and track_ids[j] not in used:
+                assigned[i] = track_ids[j]
+                used.add(track_ids[j])
+
+    def update(self, boxes, descriptors, now):
+        """
+        Gán track-id cho faces của frame hiện tại
+
+        Args:
+            boxes: (N, 4) bboxes xyxy
+            descriptors: N reid descriptors
+            now: Timestamp hiện tại
+
+        Returns:
+            List track-id theo thứ tự boxes
+        """
+        # Bỏ tracks đã rời khung hình quá max_age giây
+        for track_id in [t for t, track in self.tracks.items() if now - track['last_seen'] > self.max_age]:
+            del self.tracks[track_id]
+
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        if len(boxes) == 0:
+            return []
+        embeddings = np.asarray(descriptors, dtype=np.float32).reshape(len(boxes), -1)
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+        assigned = [None] * len(boxes)
+        track_ids = list(self.tracks)
+        if track_ids:
+            track_boxes = np.array([self.tracks[t]['bbox'] for t in track_ids])
+            track_embeddings = np.array([self.tracks[t]['embedding'] for t in track_ids])
+            # Ưu tiên IoU với vị trí cũ; faces còn lại (vd. Unknown quay lại) nối theo embedding
+            self._greedy_assign(self.iou(boxes, track_boxes), self.iou_threshold, assigned, track_ids)
+            distances = (1.0 - embeddings @ track_embeddings.T) * 0.5
+            self._greedy_assign(-distances, -self.match_threshold, assigned, track_ids)
+
+        for i, track_id in enumerate(assigned):
+            if track_id is None:
+                track_id = assigned[i] = self._next_id
+                self._next_id += 1
+                self.tracks[track_id] = {'embedding': embeddings[i]}
+                self._last_capture[track_id % self.MAX_TRACKS] = -np.inf
+                self._capture_count[track_id % self.MAX_TRACKS] = 0
+            else:
+                track = self.tracks[track_id]
+                embedding = (1 - self.embedding_alpha) * track['embedding'] + self.embedding_alpha * embeddings[i]
+                track['embedding'] = embedding / max(np.linalg.norm(embedding), 1e-12)
+            self.tracks[track_id]['bbox'] = boxes[i]
+            self.tracks[track_id]['last_seen'] = now
+        return assigned
+
+    def mark_captures(self, track_ids, now, interval):
+        """
+        Đánh dấu chụp cho tracks mới hoặc đã quá interval giây kể từ lần chụp trước
+
+        Args:
+            track_ids: Track-id trả về từ update()
+            now: Timestamp hiện tại
+            interval: Số giây tối thiểu giữa 2 lần chụp của cùng track
+
+        Returns:
+            Mask bool (N,) các faces cần chụp
+        """
+        slots = np.asarray(track_ids, dtype=np.intp) % self.MAX_TRACKS
+        # Track mới (last capture = -inf) luôn được chụp
+        capture = now - self._last_capture[slots] >= interval
+        self._last_capture[slots[capture]] = now
+        self._capture_count[slots[capture]] += 1
+        return capture
+
+
+class CropWriterThread(QThread):
+    """Ghi crops (ảnh + DB) ngoài inference loop, gom batch tối đa BATCH_SIZE crops / BATCH_INTERVAL giây"""
+
+    QUEUE_SIZE = 256
+    BATCH_SIZE = 32
+    BATCH_INTERVAL = 0.1
+
+    def __init__(self, crops_manager):
+        super().__init__()
+        self.crops_manager = crops_manager
+        self._queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._run_flag = True
+
+    def put(self, **crop):
+        """Đưa crop (tham số của CropsManager.save_crop) vào queue; queue đầy thì bỏ crop cũ nhất"""
+        while True:
+            try:
+                self._queue.put_nowait(crop)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    log.warning("Crop queue full, dropping oldest crop")
+                except queue.Empty:
+                    pass
+
+    def run(self):
+        """Lấy crops từ queue và ghi theo batch cho tới khi stop() và queue rỗng"""
+        while self._run_flag or not self._queue.empty():
+            try:
+                batch = [self._queue.get(timeout=self.BATCH_INTERVAL)]
+            except queue.Empty:
+                continue
+            deadline = perf_counter() + self.BATCH_INTERVAL
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - perf_counter(), 0)))
+                except queue.Empty:
+                    break
+            try:
+                self.crops_manager.save_crops(batch)
+            except Exception as e:
+                log.error(f"Error writing crops: {e}")
+
+    def stop(self):
+        """Ghi nốt crops còn trong queue rồi dừng"""
+        self._run_flag = False
+        self.wait()
+
+
 class VideoThread(QThread):
     """Thread xử lý video để không block UI"""
 
-    change_pixmap_signal = pyqtSignal(np.ndarray)  # Frame hiển thị
+    change_pixmap_signal = pyqtSignal(QImage)  # Frame hiển thị (BGR888, đã resize theo video label)
     face_detected_signal = pyqtSignal(list)  # List các faces detected
     fps_signal = pyqtSignal(float)  # FPS
     error_signal = pyqtSignal(str)  # Error message
 
+    # Camera/stream: khi xử lý 1 frame lâu hơn 1/TARGET_FPS thì grab (bỏ qua) bớt frame
+    TARGET_FPS = 25.0
+    INFER_EMA_ALPHA = 0.1
+    # Cửa sổ bị ẩn/minimize: chỉ gửi 1/HIDDEN_PREVIEW_EVERY frames cho preview
+    HIDDEN_PREVIEW_EVERY = 5
+    # FPS tính trên FPS_WINDOW frames gần nhất, gửi fps_signal mỗi FPS_EMIT_EVERY frames
+    FPS_WINDOW = 30
+    FPS_EMIT_EVERY = 10
+    # Buffers dùng lại cho face crops trong 1 frame (256x256x3 mỗi buffer, tự lớn thêm khi cần)
+    CROP_POOL_SIZE = 8
+    CROP_POOL_BYTES = 256 * 256 * 3
+
     def __init__(self):
         super().__init__()
         self._run_flag = True
         self.cap = None
+        self._infer_ema_ms = 0.0  # EMA thời gian xử lý 1 frame
+        self._overlay_enabled = True  # Vẽ landmarks + nhãn khi video đang hiển thị
+        self._display_size = (0, 0)  # (w, h) của video label, (0, 0) = giữ kích thước frame
+        self._display_buf = None  # Buffer BGR dùng lại cho frame hiển thị đã resize
+        self._crop_pool = [np.empty(self.CROP_POOL_BYTES, np.uint8) for _ in range(self.CROP_POOL_SIZE)]
 
         # Models
         self.face_detector = None
@@ -70,14 +340,15 @@ class VideoThread(QThread):
         # Source
         self.source = 0  # Default webcam
         self.frame_count = 0
-        self.start_time = perf_counter()
+        self._frame_times = deque(maxlen=self.FPS_WINDOW)  # perf_counter_ns() của các frame gần nhất
 
         # Tracking cho mỗi người - để tránh spam
-        self.face_tracking = {}  # {face_id: {'last_capture_time': timestamp, 'count': int}}
+        self.tracker = SimpleTracker()
         self.capture_interval = 2.0  # Default, sẽ được cập nhật từ database
         self.db = None  # Sẽ được set từ ClientPanel
         self.events_manager = None  # Sẽ được set từ ClientPanel
         self.crops_manager = None  # Sẽ được set từ ClientPanel
+        self.crop_writer = None  # CropWriterThread, tạo khi run() nếu có crops_manager
         self.camera_id = None  # Sẽ được set từ ClientPanel
 
     def set_models(self, face_detector, landmarks_detector, face_identifier, faces_database):
@@ -103,12 +374,58 @@ class VideoThread(QThread):
         """Set video source"""
         self.source = source
 
+    def set_overlay(self, enabled):
+        """Bật/tắt vẽ landmarks + nhãn (tắt khi cửa sổ video không hiển thị)"""
+        self._overlay_enabled = enabled
+
+    def set_display_size(self, width, height):
+        """Set kích thước video label để resize frame ngay trên video thread"""
+        self._display_size = (width, height)
+
+    def _to_display_image(self, frame):
+        """Resize (INTER_AREA) vào buffer dùng lại nếu cần, trả về QImage độc lập với frame/buffer"""
+        width, height = self._display_size
+        if width <= 0 or height <= 0:
+            height, width = frame.shape[:2]
+        image = frame
+        if (width, height) != (frame.shape[1], frame.shape[0]):
+            if self._display_buf is None or self._display_buf.shape[:2] != (height, width):
+                self._display_buf = np.empty((height, width, 3), np.uint8)
+            cv2.resize(frame, (width, height), dst=self._display_buf, interpolation=cv2.INTER_AREA)
+            image = self._display_buf
+        # Qt đọc thẳng BGR (Format_BGR888, Qt >= 5.14) nên không cần cvtColor BGR->RGB
+        return QImage(image.data, width, height, image.strides[0], QImage.Format_BGR888).copy()
+
+    def _pooled_crop(self, frame, roi, slot):
+        """Crop face vào buffer thứ slot của pool (liên tục, không cấp phát mỗi frame); copy() nếu cần giữ lại"""
+        face = crop(frame, roi)
+        if slot >= self.CROP_POOL_SIZE:
+            return face.copy()
+        if face.size > self._crop_pool[slot].size:
+            self._crop_pool[slot] = np.empty(face.size, np.uint8)
+        face_crop = self._crop_pool[slot][:face.size].reshape(face.shape)
+        np.copyto(face_crop, face)
+        return face_crop
+
+    def _start_detection(self, frame):
+        """Bắt đầu face detection async cho frame, kết quả lấy bằng postprocess() ở vòng lặp sau"""
+        self.face_detector.clear()
+        self.face_detector.start_async(frame)
+
     def run(self):
         """Main loop"""
+        # File video xử lý đủ mọi frame, chỉ camera/stream mới bỏ frame
+        live_source = not (isinstance(self.source, str) and Path(self.source).is_file())
+        # Frame-skip chỉ cần khi backend không cho giới hạn buffer còn 1 frame
+        grab_skip = False
+
         # Mở camera/video
         try:
             if isinstance(self.source, str) and not self.source.isdigit():
-                self.cap = cv2.VideoCapture(self.source)
+                self.cap = cv2.VideoCapture(self.source, cv2.CAP_FFMPEG, HW_DECODE_PARAMS)
+                if not self.cap.isOpened():
+                    # Build OpenCV không có FFMPEG/hw decode: dùng backend mặc định
+                    self.cap = cv2.VideoCapture(self.source)
             else:
                 self.cap = cv2.VideoCapture(int(self.source))
 
@@ -116,23 +433,49 @@ class VideoThread(QThread):
                 self.error_signal.emit(f"Không thể mở nguồn video: {self.source}")
                 return
 
+            if live_source:
+                # Camera/RTSP: chỉ giữ frame mới nhất, tránh trễ dồn trong buffer
+                grab_skip = not self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
         except Exception as e:
             self.error_signal.emit(f"Lỗi khi mở video: {e}")
             return
 
-        while self._run_flag:
-            ret, frame = self.cap.read()
-            if not ret:
-                break
+        models_ready = self.face_detector and self.landmarks_detector and self.face_identifier
+        # Ghi crops xuống disk/SQLite trên thread riêng, inference loop chỉ đưa vào queue
+        if self.crops_manager:
+            self.crop_writer = CropWriterThread(self.crops_manager)
+            self.crop_writer.start()
+
+        # Pipeline 2 tầng: face detection của frame N+1 chạy trên infer queue
+        # trong lúc landmarks + reid của frame N đang xử lý
+        ret, frame = self.cap.read()
+        if ret and models_ready:
+            self._start_detection(frame)
+
+        while self._run_flag and ret:
+            if grab_skip:
+                # Frame-skip thích ứng: grab() không decode các frame trung gian,
+                # tránh dồn frame cũ trong buffer khi inference chậm hơn camera
+                skip = int(self._infer_ema_ms * self.TARGET_FPS / 1000)
+                for _ in range(skip):
+                    self.cap.grab()
+            next_ret, next_frame = self.cap.read()
+            frame_start = perf_counter()
 
             # Process frame
             try:
                 faces_info = []
-                current_time = time()
+                # Đồng hồ monotonic cho tracker/capture_interval (không nhảy khi chỉnh giờ hệ thống)
+                current_time = frame_start
 
-                if self.face_detector and self.landmarks_detector and self.face_identifier:
-                    # Detect faces
-                    rois = self.face_detector.infer((frame,))
+                if models_ready:
+                    # Lấy kết quả detect faces của frame hiện tại
+                    try:
+                        rois = self.face_detector.postprocess()
+                    finally:
+                        if next_ret:
+                            self._start_detection(next_frame)
 
                     if len(rois) > 0:
                         # Detect landmarks
@@ -141,195 +484,175 @@ class VideoThread(QThread):
                         # Identify faces
                         identities, unknowns = self.face_identifier.infer((frame, rois, landmarks))
 
-                        # Track detected face IDs in this frame
-                        detected_face_ids = set()
+                        # Bbox (N, 4) và landmarks (N, K, 2) theo pixel, tính 1 lần cho mọi face
+                        height, width = frame.shape[:2]
+                        positions = np.array([roi.position for roi in rois])
+                        sizes = np.array([roi.size for roi in rois])
+                        boxes = np.clip(np.concatenate([positions, positions + sizes], axis=1),
+                                        0, [width, height, width, height]).astype(np.int32)
+                        points = (boxes[:, None, :2] + sizes[:, None, :] * np.array(landmarks)).astype(np.int32)
+
+                        # Track-id ổn định cho mỗi face (IoU/embedding với các frame trước)
+                        track_ids = self.tracker.update(
+                            boxes, [identity.descriptor for identity in identities], current_time)
+
+                        # Label/màu/confidence cho mọi face bằng NumPy, không xen với vẽ/DB
+                        ids = np.array([identity.id for identity in identities])
+                        known = ids != FaceIdentifier.UNKNOWN_ID
+                        confidences = np.where(
+                            known, 100.0 * (1 - np.array([identity.distance for identity in identities])), 0)
+                        colors = np.where(known[:, None], (0, 255, 0), (0, 0, 255)).tolist()  # Green / Red
+                        labels = [self.face_identifier.get_identity_label(identity_id) if is_known else "Unknown"
+                                  for identity_id, is_known in zip(ids.tolist(), known.tolist())]
+                        texts = [f"{label} ({confidence:.1f}%)" if is_known else label
+                                 for label, confidence, is_known in zip(labels, confidences.tolist(), known.tolist())]
+                        # Unique ID cho unknown theo track
+                        face_ids = [label if is_known else f"Unknown_{track_id}"
+                                    for label, is_known, track_id in zip(labels, known.tolist(), track_ids)]
+
+                        # Track mới -> chụp ngay, sau đó mỗi capture_interval (theo interval từ database)
+                        capture = self.tracker.mark_captures(track_ids, current_time, self.capture_interval)
+                        # Crop trước khi vẽ: ảnh lưu/hiển thị không dính bbox, landmarks, label
+                        face_crops = {i: self._pooled_crop(frame, rois[i], slot)
+                                      for slot, i in enumerate(np.flatnonzero(capture))}
 
                         # Draw results on frame
-                        for roi, lm, identity in zip(rois, landmarks, identities):
-                            # Get info
-                            if identity.id != FaceIdentifier.UNKNOWN_ID:
-                                label = self.face_identifier.get_identity_label(identity.id)
-                                confidence = 100.0 * (1 - identity.distance)
-                                text = f"{label} ({confidence:.1f}%)"
-                                color = (0, 255, 0)  # Green
-                                face_id = label
-                            else:
-                                label = "Unknown"
-                                confidence = 0
-                                text = "Unknown"
-                                color = (0, 0, 255)  # Red
-                                face_id = f"Unknown_{int(current_time)}"  # Unique ID cho unknown
-
-                            detected_face_ids.add(face_id)
-
-                            # Draw bounding box
-                            xmin = max(int(roi.position[0]), 0)
-                            ymin = max(int(roi.position[1]), 0)
-                            xmax = min(int(roi.position[0] + roi.size[0]), frame.shape[1])
-                            ymax = min(int(roi.position[1] + roi.size[1]), frame.shape[0])
-
+                        box_list = boxes.tolist()
+                        for (xmin, ymin, xmax, ymax), color in zip(box_list, colors):
                             cv2.rectangle(frame, (xmin, ymin), (xmax, ymax), color, 2)
 
+                        if self._overlay_enabled:
                             # Draw landmarks
-                            for point in lm:
-                                x = int(xmin + roi.size[0] * point[0])
-                                y = int(ymin + roi.size[1] * point[1])
+                            for x, y in points.reshape(-1, 2).tolist():
                                 cv2.circle(frame, (x, y), 2, (0, 255, 255), -1)
 
                             # Draw text
-                            textsize = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
-                            cv2.rectangle(frame, (xmin, ymin - textsize[1] - 10),
-                                        (xmin + textsize[0], ymin), color, -1)
-                            cv2.putText(frame, text, (xmin, ymin - 5),
-                                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-
-                            # Reload capture_interval từ database (nếu có thay đổi)
-                            if self.db:
-                                self.capture_interval = self.db.get_capture_interval()
-                            
-                            # Kiểm tra xem có nên chụp ảnh không (theo interval từ database)
-                            should_capture = False
-                            if face_id not in self.face_tracking:
-                                # Lần đầu tiên gặp người này -> chụp ngay
-                                should_capture = True
-                                self.face_tracking[face_id] = {
-                                    'last_capture_time': current_time,
-                                    'count': 1
-                                }
-                            else:
-                                # Kiểm tra đã qua capture_interval chưa
-                                time_since_last = current_time - self.face_tracking[face_id]['last_capture_time']
-                                if time_since_last >= self.capture_interval:
-                                    should_capture = True
-                                    self.face_tracking[face_id]['last_capture_time'] = current_time
-                                    self.face_tracking[face_id]['count'] += 1
-
-                            # Chỉ emit face info nếu cần chụp (theo capture_interval)
-                            if should_capture:
-                                # Crop face for display
-                                face_crop = crop(frame, roi)
-
-                                # Lưu events và crops vào database
-                                event_id = None
-                                crop_id = None
-                                customer_id = None
-                                is_known = (identity.id != FaceIdentifier.UNKNOWN_ID)
-                                is_new_session = False
-                                event_info = None
-                                unknown_event_info = None
+                            for (xmin, ymin, _, _), color, text in zip(box_list, colors, texts):
+                                draw_label(frame, text, color, xmin, ymin)
+
+                        # Chỉ xử lý events/emit face info cho faces cần chụp (theo capture_interval)
+                        for i, face_crop in face_crops.items():
+                            xmin, ymin, xmax, ymax = box_list[i]
+                            label = labels[i]
+                            face_id = face_ids[i]
+                            confidence = float(confidences[i])
+
+                            # Lưu events và crops vào database
+                            event_id = None
+                            customer_id = None
+                            is_known = bool(known[i])
+                            is_new_session = False
+                            event_info = None
+                            unknown_event_info = None
                                 
-                                if is_known:
-                                    # Khách quen - lưu events và crops (session-based tracking)
-                                    if self.events_manager and self.crops_manager and self.db:
-                                        try:
-                                            # Get customer by face_id
-                                            customer = self.db.get_customer_by_face_id(face_id)
-                                            if customer:
-                                                customer_id = customer.id
-                                            else:
-                                                # Create new customer if not exists
-                                                customer_id = self.db.add_customer(
-                                                    face_id=face_id,
-                                                    name=label,
-                                                    segment=CustomerSegment.NEW
-                                                )
+                            if is_known:
+                                # Khách quen - lưu events và crops (session-based tracking)
+                                if self.events_manager and self.crops_manager and self.db:
+                                    try:
+                                        # Get customer by face_id
+                                        customer = self.db.get_customer_by_face_id(face_id)
+                                        if customer:
+                                            customer_id = customer.id
+                                        else:
+                                            # Create new customer if not exists
+                                            customer_id = self.db.add_customer(
+                                                face_id=face_id,
+                                                name=label,
+                                                segment=CustomerSegment.NEW
+                                            )
                                             
-                                            bbox_tuple = (xmin, ymin, xmax, ymax)
+                                        bbox_tuple = (xmin, ymin, xmax, ymax)
                                             
-                                            # Call events manager to handle recognition (session-based tracking)
-                                            # on_face_recognized() sẽ trả về event_info cho TẤT CẢ customers
-                                            # Chỉ tạo event khi có session mới, không phải mỗi frame
-                                            event_info = self.events_manager.on_face_recognized(
-                                                customer_name=label,
-                                                customer_id=customer_id,
-                                                confidence=confidence,
-                                                bbox=bbox_tuple,
-                                                camera_id=self.camera_id if self.camera_id else 0,
-                                                face_id=face_id
-                                            )
+                                        # Call events manager to handle recognition (session-based tracking)
+                                        # on_face_recognized() sẽ trả về event_info cho TẤT CẢ customers
+                                        # Chỉ tạo event khi có session mới, không phải mỗi frame
+                                        event_info = self.events_manager.on_face_recognized(
+                                            customer_name=label,
+                                            customer_id=customer_id,
+                                            confidence=confidence,
+                                            bbox=bbox_tuple,
+                                            camera_id=self.camera_id if self.camera_id else 0,
+                                            face_id=face_id
+                                        )
                                             
-                                            if event_info:
-                                                event_id = event_info.get('event_id')
-                                                should_save_crop = event_info.get('should_save_crop', False)
-                                                is_new_session = event_info.get('is_new_session', False)
+                                        if event_info:
+                                            event_id = event_info.get('event_id')
+                                            should_save_crop = event_info.get('should_save_crop', False)
+                                            is_new_session = event_info.get('is_new_session', False)
                                                 
-                                                # Lưu crop nếu cần (cho session mới hoặc theo cooldown)
-                                                if should_save_crop and event_id:
-                                                    crop_id = self.crops_manager.save_crop(
-                                                        face_image=face_crop,
-                                                        customer_name=label,
-                                                        customer_id=customer_id,
-                                                        event_id=event_id,
-                                                        bbox=bbox_tuple,
-                                                        confidence=confidence
-                                                    )
-                                        except Exception as e:
-                                            log.error(f"Error saving event/crop: {e}")
-                                else:
-                                    # Khách mới (Unknown) - session-based tracking
-                                    if self.events_manager and self.crops_manager:
-                                        try:
-                                            bbox_tuple = (xmin, ymin, xmax, ymax)
+                                            # Lưu crop nếu cần (cho session mới hoặc theo cooldown)
+                                            if should_save_crop and event_id:
+                                                self.crop_writer.put(
+                                                    face_image=face_crop.copy(),  # buffer của pool được dùng lại ở frame sau
+                                                    customer_name=label,
+                                                    customer_id=customer_id,
+                                                    event_id=event_id,
+                                                    bbox=bbox_tuple,
+                                                    confidence=confidence,
+                                                    track_id=track_ids[i],
+                                                    captured_at=current_time
+                                                )
+                                    except Exception as e:
+                                        log.error(f"Error saving event/crop: {e}")
+                            else:
+                                # Khách mới (Unknown) - session-based tracking
+                                if self.events_manager and self.crops_manager:
+                                    try:
+                                        bbox_tuple = (xmin, ymin, xmax, ymax)
                                             
-                                            # Call events manager for unknown face (session-based)
-                                            unknown_event_info = self.events_manager.on_unknown_face(
-                                                confidence=confidence,
-                                                bbox=bbox_tuple,
-                                                camera_id=self.camera_id if self.camera_id else 0
-                                            )
+                                        # Call events manager for unknown face (session-based)
+                                        unknown_event_info = self.events_manager.on_unknown_face(
+                                            confidence=confidence,
+                                            bbox=bbox_tuple,
+                                            camera_id=self.camera_id if self.camera_id else 0
+                                        )
                                             
-                                            # Lưu crop cho unknown face
-                                            # Chiến lược:
-                                            # - Chụp 1 ảnh khi xuất hiện lần đầu (session mới)
-                                            # - Chụp thêm ảnh khi có thay đổi đủ lớn (di chuyển hoặc thời gian)
-                                            if unknown_event_info:
-                                                event_id = unknown_event_info.get('event_id')
-                                                is_new_unknown_session = unknown_event_info.get('is_new_session', False)
-                                                should_save_crop = unknown_event_info.get('should_save_crop', False)
+                                        # Lưu crop cho unknown face
+                                        # Chiến lược:
+                                        # - Chụp 1 ảnh khi xuất hiện lần đầu (session mới)
+                                        # - Chụp thêm ảnh khi có thay đổi đủ lớn (di chuyển hoặc thời gian)
+                                        if unknown_event_info:
+                                            event_id = unknown_event_info.get('event_id')
+                                            is_new_unknown_session = unknown_event_info.get('is_new_session', False)
+                                            should_save_crop = unknown_event_info.get('should_save_crop', False)
                                                 
-                                                # Lưu crop nếu:
-                                                # 1. Session mới (lần đầu xuất hiện)
-                                                # 2. Hoặc should_save_crop = True (có thay đổi đủ lớn trong session đang tiếp diễn)
-                                                if event_id and (is_new_unknown_session or should_save_crop):
-                                                    crop_id = self.crops_manager.save_crop(
-                                                        face_image=face_crop,
-                                                        customer_name="Unknown",
-                                                        customer_id=None,
-                                                        event_id=event_id,
-                                                        bbox=bbox_tuple,
-                                                        confidence=confidence
-                                                    )
-                                                    # Set flag để hiển thị trong UI chỉ khi session mới
-                                                    if is_new_unknown_session:
-                                                        is_new_session = is_new_unknown_session
-                                        except Exception as e:
-                                            log.error(f"Error saving unknown crop: {e}")
-
-                                # Chỉ emit face info để hiển thị nếu là session mới
-                                # (tránh spam UI với cùng một người)
-                                if is_new_session:
-                                    # Session mới - hiển thị trong UI (cả known và unknown)
-                                    faces_info.append({
-                                        'crop': face_crop,
-                                        'label': label,
-                                        'confidence': confidence,
-                                        'bbox': (xmin, ymin, xmax, ymax),
-                                        'face_id': face_id,
-                                        'timestamp': datetime.now().strftime("%H:%M:%S")
-                                    })
-
-                        # Cleanup tracking - xóa những người không còn xuất hiện trong frame
-                        # (sau 10 giây không thấy thì xóa khỏi tracking)
-                        faces_to_remove = []
-                        for tracked_id in self.face_tracking:
-                            if tracked_id not in detected_face_ids:
-                                time_since_last = current_time - self.face_tracking[tracked_id]['last_capture_time']
-                                if time_since_last > 10.0:
-                                    faces_to_remove.append(tracked_id)
-                        
-                        for face_id in faces_to_remove:
-                            del self.face_tracking[face_id]
-                            
+                                            # Lưu crop nếu:
+                                            # 1. Session mới (lần đầu xuất hiện)
+                                            # 2. Hoặc should_save_crop = True (có thay đổi đủ lớn trong session đang tiếp diễn)
+                                            if event_id and (is_new_unknown_session or should_save_crop):
+                                                self.crop_writer.put(
+                                                    face_image=face_crop.copy(),  # buffer của pool được dùng lại ở frame sau
+                                                    customer_name="Unknown",
+                                                    customer_id=None,
+                                                    event_id=event_id,
+                                                    bbox=bbox_tuple,
+                                                    confidence=confidence,
+                                                    track_id=track_ids[i],
+                                                    captured_at=current_time
+                                                )
+                                                # Set flag để hiển thị trong UI chỉ khi session mới
+                                                if is_new_unknown_session:
+                                                    is_new_session = is_new_unknown_session
+                                    except Exception as e:
+                                        log.error(f"Error saving unknown crop: {e}")
+
+                            # Chỉ emit face info để hiển thị nếu là session mới
+                            # (tránh spam UI với cùng một người)
+                            if is_new_session:
+                                # Session mới - hiển thị trong UI (cả known và unknown)
+                                crop_jpg = b''
+                                if face_crop.size > 0:
+                                    # Crop gửi sang UI dạng JPEG (nhỏ hơn ~10x ndarray, không giữ cả frame)
+                                    crop_jpg = cv2.imencode('.jpg', face_crop, CROP_JPEG_PARAMS)[1].tobytes()
+                                faces_info.append({
+                                    'crop_jpg': crop_jpg,
+                                    'label': label,
+                                    'confidence': confidence,
+                                    'bbox': (xmin, ymin, xmax, ymax),
+                                    'face_id': face_id,
+                                    'timestamp': datetime.now().strftime("%H:%M:%S")
+                                })
+
                         # Check timeout sessions định kỳ (mỗi 5 giây)
                         if self.frame_count % 150 == 0 and self.events_manager:  # ~5 seconds at 30fps
                             try:
@@ -339,16 +662,20 @@ class VideoThread(QThread):
 
                 # Calculate FPS
                 self.frame_count += 1
-                elapsed = perf_counter() - self.start_time
-                fps = self.frame_count / elapsed if elapsed > 0 else 0
+                now_ns = perf_counter_ns()
+                self._frame_times.append(now_ns)
+                elapsed_ns = now_ns - self._frame_times[0]
+                fps = (len(self._frame_times) - 1) * 1e9 / elapsed_ns if elapsed_ns > 0 else 0.0
 
                 # Draw FPS
                 cv2.putText(frame, f"FPS: {fps:.1f}", (10, 30),
                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
 
                 # Emit signals
-                self.change_pixmap_signal.emit(frame)
-                self.fps_signal.emit(fps)
+                if self._overlay_enabled or self.frame_count % self.HIDDEN_PREVIEW_EVERY == 0:
+                    self.change_pixmap_signal.emit(self._to_display_image(frame))
+                if self.frame_count % self.FPS_EMIT_EVERY == 0:
+                    self.fps_signal.emit(fps)
 
                 # Chỉ emit face_detected_signal nếu có faces mới cần hiển thị
                 if len(faces_info) > 0:
@@ -357,15 +684,129 @@ class VideoThread(QThread):
             except Exception as e:
                 log.error(f"Error processing frame: {e}")
 
+            frame_ms = (perf_counter() - frame_start) * 1000
+            self._infer_ema_ms += self.INFER_EMA_ALPHA * (frame_ms - self._infer_ema_ms)
+            ret, frame = next_ret, next_frame
+
         # Cleanup
+        if models_ready:
+            self.face_detector.wait()
+        if self.crop_writer:
+            self.crop_writer.stop()
+            self.crop_writer = None
         if self.cap:
             self.cap.release()
 
     def stop(self):
         """Stop thread"""
         self._run_flag = False
-        self.face_tracking.clear()
         self.wait()
+        # Sau wait(): run() không còn dùng tracker
+        self.tracker.clear()
+
+
+class CropCard(QWidget):
+    """Card một crop (Khách quen/Khách mới) trong panel kết quả: dựng 1 lần, dùng lại chỉ đổi pixmap/text"""
+
+    def __init__(self):
+        super().__init__()
+        # Subclass của QWidget chỉ vẽ background của stylesheet khi bật WA_StyledBackground
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.crop_data = None
+        self._is_known = None
+
+        # Horizontal layout: tất cả trong 1 hàng ngang
+        face_layout = QHBoxLayout()
+        face_layout.setSpacing(10)
+
+        # Khách quen có ảnh database: ảnh database (trái) + ảnh crop hiện tại (giữa)
+        self.gallery_widget, self.gallery_label = self._image_column("📷 Database", "background: transparent;")
+        self.crop_widget, self.face_label = self._image_column("📸 Hiện tại")
+        face_layout.addWidget(self.gallery_widget)
+        face_layout.addWidget(self.crop_widget)
+
+        # Chỉ ảnh crop (khách mới hoặc không có ảnh database)
+        self.single_label = QLabel()
+        self.single_label.setAlignment(Qt.AlignCenter)
+        face_layout.addWidget(self.single_label)
+
+        # Info layout (vertical): trạng thái, độ tin cậy (nếu có), thời gian
+        info_layout = QVBoxLayout()
+        self.text_label = QLabel()
+        self.text_label.setFont(STATUS_FONT)
+        self.text_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+        info_layout.addWidget(self.text_label)
+
+        self.conf_label = QLabel()
+        self.conf_label.setFont(DETAIL_FONT)
+        self.conf_label.setStyleSheet(CONF_LABEL_QSS)
+        info_layout.addWidget(self.conf_label)
+
+        self.time_label = QLabel()
+        self.time_label.setFont(DETAIL_FONT)
+        self.time_label.setStyleSheet(TIME_LABEL_QSS)
+        info_layout.addWidget(self.time_label)
+
+        face_layout.addLayout(info_layout)
+        face_layout.addStretch()
+        self.setLayout(face_layout)
+
+    @staticmethod
+    def _image_column(caption, style=None):
+        """Cột [ảnh / chú thích] cho chế độ 2 ảnh, trả về (widget, label ảnh)"""
+        container = QVBoxLayout()
+        image_label = QLabel()
+        image_label.setAlignment(Qt.AlignCenter)
+        image_label.setStyleSheet("border: none; border-radius: 5px;")
+        container.addWidget(image_label)
+
+        info_label = QLabel(caption)
+        info_label.setAlignment(Qt.AlignCenter)
+        info_label.setStyleSheet("color: #d0d0d0; font-size: 9px; padding: 2px; background: transparent;")
+        container.addWidget(info_label)
+
+        widget = QWidget()
+        if style:
+            widget.setStyleSheet(style)
+        widget.setLayout(container)
+        return widget, image_label
+
+    def set_crop(self, crop_data):
+        """Hiển thị crop_data (dict trong ClientPanel.displayed_crops)"""
+        self.crop_data = crop_data
+        is_known = crop_data['is_known']
+        two_images = bool(is_known and crop_data.get('gallery_pixmap'))
+        self.gallery_widget.setVisible(two_images)
+        self.crop_widget.setVisible(two_images)
+        self.single_label.setVisible(not two_images)
+        if two_images:
+            self.gallery_label.setPixmap(
+                crop_data['gallery_pixmap'].scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            self.face_label.setPixmap(crop_data['pixmap'].scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        else:
+            self.single_label.setPixmap(
+                crop_data['pixmap'].scaled(140, 140, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
+        # Màu theo trạng thái - chỉ đổi stylesheet khi Khách quen/Khách mới thay đổi
+        if is_known != self._is_known:
+            self._is_known = is_known
+            status_color, bg_color = KNOWN_CARD_COLORS if is_known else NEW_CARD_COLORS
+            self.text_label.setStyleSheet(f"color: {status_color}; padding: 5px;")
+            self.setStyleSheet(DETECTION_CARD_QSS.format(bg_color=bg_color))
+        self.text_label.setText(f"Khách quen\n{crop_data['label']}" if is_known else "Khách mới")
+
+        confidence = crop_data.get('confidence', 0)
+        self.conf_label.setVisible(confidence > 0)
+        if confidence > 0:
+            self.conf_label.setText(f"Độ tin cậy: {confidence:.1f}%")
+        self.time_label.setText(f"⏰ {crop_data['timestamp']}")
+
+    def clear_crop(self):
+        """Bỏ crop đang hiển thị (giải phóng pixmaps) và ẩn card"""
+        self.crop_data = None
+        for label in (self.gallery_label, self.face_label, self.single_label):
+            label.clear()
+        self.hide()
 
 
 class ClientPanel(QMainWindow):
@@ -394,6 +835,7 @@ class ClientPanel(QMainWindow):
         self.model_lm_path = model_config['model_lm_path']
         self.model_reid_path = model_config['model_reid_path']
         self.gallery_path = model_config['gallery_path']
+        self.model_device = model_config['model_device']
 
         # Video source configuration
         self.video_source = None  # Will be set via File menu
@@ -412,12 +854,17 @@ class ClientPanel(QMainWindow):
         self.camera_id = None
 
         # Displayed crops storage - để hiển thị crops theo thứ tự
-        self.displayed_crops = []  # List of {face_id, crop_image, timestamp, is_known}
         self.max_displayed_crops = 20  # Giới hạn số lượng crops hiển thị
+        # {face_id, pixmap, timestamp, is_known, ...}, mới nhất ở đầu; đầy thì tự bỏ crop cũ nhất
+        self.displayed_crops = deque(maxlen=self.max_displayed_crops)
+        self._crop_cards = []  # CropCard dùng lại cho displayed_crops (tối đa max_displayed_crops)
 
         # Model config refresh timer (check if Admin updated models)
         self.model_config_timer = QTimer()
         self.model_config_timer.timeout.connect(self.check_model_config_update)
+        # Cùng timer: đẩy capture_interval (Admin có thể đổi) vào video thread,
+        # video thread không query database trong vòng lặp xử lý frame
+        self.model_config_timer.timeout.connect(self.refresh_capture_interval)
         self.model_config_timer.setInterval(5000)  # Check every 5 seconds
         self.last_model_config = None  # Track last known config
 
@@ -683,9 +1130,7 @@ class ClientPanel(QMainWindow):
         """)
         self.video_label.setText("Video sẽ hiển thị ở đây\n\nĐang tải models...")
 
-        font = QFont()
-        font.setPointSize(14)
-        self.video_label.setFont(font)
+        self.video_label.setFont(VIDEO_PLACEHOLDER_FONT)
         # Update style sheet khi có text (chế độ chờ)
         self.video_label.setStyleSheet("""
             QLabel {
@@ -697,14 +1142,14 @@ class ClientPanel(QMainWindow):
             }
         """)
 
+        # Label đổi kích thước -> video thread resize frame theo kích thước mới ngay từ frame sau
+        self.video_label.installEventFilter(self)
         layout.addWidget(self.video_label)
 
         # FPS label
         self.fps_label = QLabel("FPS: 0.0")
         self.fps_label.setAlignment(Qt.AlignRight)
-        font_small = QFont()
-        font_small.setPointSize(10)
-        self.fps_label.setFont(font_small)
+        self.fps_label.setFont(FPS_FONT)
         self.fps_label.setStyleSheet("color: #b0b0b0; background: transparent; padding: 5px;")
         layout.addWidget(self.fps_label)
 
@@ -756,6 +1201,8 @@ class ClientPanel(QMainWindow):
         self.faces_layout = QVBoxLayout()
         self.faces_layout.setContentsMargins(5, 5, 5, 5)
         self.faces_layout.setSpacing(8)
+        # Stretch cuối: cards (CropCard) luôn được chèn phía trên
+        self.faces_layout.addStretch()
         self.faces_container.setLayout(self.faces_layout)
 
         scroll.setWidget(self.faces_container)
@@ -776,8 +1223,10 @@ class ClientPanel(QMainWindow):
             self.model_lm_path = model_config['model_lm_path']
             self.model_reid_path = model_config['model_reid_path']
             self.gallery_path = model_config['gallery_path']
+            self.model_device = model_config['model_device']
+            use_int8 = model_config['use_int8'] == '1'
 
-            log.info(f"Loading models from config: FD={self.model_fd_path}, LM={self.model_lm_path}, ReID={self.model_reid_path}")
+            log.info(f"Loading models from config: FD={self.model_fd_path}, LM={self.model_lm_path}, ReID={self.model_reid_path}, Device={self.model_device}")
 
             # Check if model files exist
             if not all([
@@ -796,35 +1245,36 @@ class ClientPanel(QMainWindow):
                 self.video_label.setText(error_msg)
                 return
 
-            # Initialize OpenVINO Core
-            self.core = Core()
+            # Initialize OpenVINO Core (singleton, dùng chung model cache với Admin Panel)
+            self.core = get_core()
             log.info(f"OpenVINO Version: {get_version()}")
 
             # Load Face Detector
+            # Bản INT8 (FP16-INT8) nhanh hơn trên CPU, dùng khi có sẵn
             self.face_detector = FaceDetector(
                 self.core,
-                Path(self.model_fd_path),
+                resolve_model_path(self.model_fd_path, use_int8=use_int8),
                 input_size=(0, 0),
                 confidence_threshold=0.6,
                 roi_scale_factor=1.15
             )
-            self.face_detector.deploy("CPU")
+            self.face_detector.deploy(model_config['device_fd'])
 
             # Load Landmarks Detector
             self.landmarks_detector = LandmarksDetector(
                 self.core,
-                Path(self.model_lm_path)
+                resolve_model_path(self.model_lm_path, use_int8=use_int8)
             )
-            self.landmarks_detector.deploy("CPU", 16)
+            self.landmarks_detector.deploy(model_config['device_lm'], 16)
 
             # Load Face Identifier
             self.face_identifier = FaceIdentifier(
                 self.core,
-                Path(self.model_reid_path),
+                resolve_model_path(self.model_reid_path, use_int8=use_int8),
                 match_threshold=0.3,
                 match_algo='HUNGARIAN'
             )
-            self.face_identifier.deploy("CPU", 16)
+            self.face_identifier.deploy(model_config['device_reid'], 16)
 
             # Load Faces Database
             self.faces_database = FacesDatabase(
@@ -881,6 +1331,8 @@ class ClientPanel(QMainWindow):
             self.camera_id
         )  # Set managers để lưu events và crops
         self.video_thread.set_source(self.video_source)
+        self.video_thread.set_display_size(self.video_label.width(), self.video_label.height())
+        self.sync_video_overlay()
 
         # Connect signals
         self.video_thread.change_pixmap_signal.connect(self.update_image)
@@ -907,36 +1359,28 @@ class ClientPanel(QMainWindow):
         # Clear video display
         self.video_label.setText("Video đã dừng\n\nNhấn Start để tiếp tục")
 
-    def update_image(self, frame):
+    def update_image(self, image):
         """Update video display - video sẽ fill đầy khung màu đỏ"""
         try:
-            # Convert frame to QPixmap
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_image.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-
-            # Scale to fill entire label (stretch to fit - IgnoreAspectRatio)
-            # Điều này đảm bảo video fill đầy toàn bộ khung màu đỏ
-            pixmap = QPixmap.fromImage(qt_image)
+            # Frame là QImage Format_BGR888, đã resize theo label trên video thread
+            scaled_pixmap = QPixmap.fromImage(image)
             label_size = self.video_label.size()
             
             # Kiểm tra kích thước hợp lệ để tránh crash khi resize
             if label_size.width() > 0 and label_size.height() > 0:
-                scaled_pixmap = pixmap.scaled(
-                    label_size,
-                    Qt.IgnoreAspectRatio,  # Stretch để fill đầy khung
-                    Qt.SmoothTransformation  # Smooth scaling
-                )
+                if image.size() != label_size:
+                    # Frame resize theo kích thước cũ (trước resize event): frame này scale tại đây
+                    if self.video_thread:
+                        self.video_thread.set_display_size(label_size.width(), label_size.height())
+                    scaled_pixmap = scaled_pixmap.scaled(
+                        label_size,
+                        Qt.IgnoreAspectRatio,  # Stretch để fill đầy khung
+                        Qt.SmoothTransformation  # Smooth scaling
+                    )
                 
-                # Update style khi có video - không có border
-                self.video_label.setStyleSheet("""
-                    QLabel {
-                        background: transparent;
-                        border: none;
-                        border-radius: 8px;
-                    }
-                """)
+                # Update style khi có video - không có border (chỉ khi style đang khác)
+                if self.video_label.styleSheet() != VIDEO_LABEL_PLAYING_QSS:
+                    self.video_label.setStyleSheet(VIDEO_LABEL_PLAYING_QSS)
                 self.video_label.setPixmap(scaled_pixmap)
             else:
                 # Kích thước chưa hợp lệ, đợi resize event
@@ -987,15 +1431,10 @@ class ClientPanel(QMainWindow):
         """Update faces display - hiển thị real-time với interval 3 giây"""
         try:
             for face_info in faces_info:
-                # Convert crop to QPixmap
-                crop_img = face_info['crop']
-                if crop_img is not None and crop_img.size > 0:
-                    # Convert BGR to RGB
-                    rgb_crop = cv2.cvtColor(crop_img, cv2.COLOR_BGR2RGB)
-                    h, w, ch = rgb_crop.shape
-                    bytes_per_line = ch * w
-                    qt_image = QImage(rgb_crop.data, w, h, bytes_per_line, QImage.Format_RGB888)
-                    pixmap = QPixmap.fromImage(qt_image)
+                # Decode crop JPEG thành QPixmap
+                crop_jpg = face_info['crop_jpg']
+                pixmap = QPixmap()
+                if crop_jpg and pixmap.loadFromData(crop_jpg, 'JPG'):
 
                     # Xác định trạng thái: Khách quen hoặc Khách mới
                     is_known = face_info['label'] != "Unknown"
@@ -1008,17 +1447,16 @@ class ClientPanel(QMainWindow):
                             try:
                                 gallery_img = cv2.imread(gallery_image_path)
                                 if gallery_img is not None and gallery_img.size > 0:
-                                    rgb_gallery = cv2.cvtColor(gallery_img, cv2.COLOR_BGR2RGB)
-                                    h_g, w_g, ch_g = rgb_gallery.shape
+                                    h_g, w_g, ch_g = gallery_img.shape
                                     bytes_per_line_g = ch_g * w_g
-                                    qt_image_g = QImage(rgb_gallery.data, w_g, h_g, bytes_per_line_g, QImage.Format_RGB888)
+                                    qt_image_g = QImage(gallery_img.data, w_g, h_g, bytes_per_line_g, QImage.Format_BGR888)
                                     gallery_pixmap = QPixmap.fromImage(qt_image_g)
                             except Exception as e:
                                 log.warning(f"Error loading gallery image: {e}")
                                 gallery_pixmap = None
 
-                    # Thêm vào displayed_crops (thêm vào đầu list)
-                    self.displayed_crops.insert(0, {
+                    # Thêm vào đầu displayed_crops (deque tự bỏ crop cũ nhất ở cuối)
+                    self.displayed_crops.appendleft({
                         'face_id': face_info['face_id'],
                         'pixmap': pixmap,
                         'gallery_pixmap': gallery_pixmap,  # Ảnh từ database
@@ -1028,10 +1466,6 @@ class ClientPanel(QMainWindow):
                         'confidence': face_info['confidence']
                     })
 
-                    # Giới hạn số lượng crops hiển thị
-                    if len(self.displayed_crops) > self.max_displayed_crops:
-                        self.displayed_crops = self.displayed_crops[:self.max_displayed_crops]
-
             # Refresh display
             self.refresh_crops_display()
 
@@ -1039,134 +1473,35 @@ class ClientPanel(QMainWindow):
             log.error(f"Error updating faces: {e}")
 
     def refresh_crops_display(self):
-        """Refresh crops display từ displayed_crops list"""
+        """Refresh crops display từ displayed_crops: dùng lại cards, chỉ nạp dữ liệu cho crop mới"""
         try:
-            # Clear previous crops
-            for i in reversed(range(self.faces_layout.count())):
-                widget = self.faces_layout.itemAt(i).widget()
-                if widget:
-                    widget.setParent(None)
-
-            # Add crops từ displayed_crops
-            for crop_data in self.displayed_crops:
-                crop_widget = self.create_crop_widget_realtime(crop_data)
-                self.faces_layout.addWidget(crop_widget)
-
-            self.faces_layout.addStretch()
+            # Card đang hiển thị crop nào (card giữ reference tới dict nên id() không bị dùng lại)
+            cards_by_crop = {id(card.crop_data): card for card in self._crop_cards if card.crop_data is not None}
+            displayed_ids = {id(crop_data) for crop_data in self.displayed_crops}
+            free_cards = [card for card in self._crop_cards if id(card.crop_data) not in displayed_ids]
+
+            for index, crop_data in enumerate(self.displayed_crops):
+                card = cards_by_crop.get(id(crop_data))
+                if card is None:
+                    if free_cards:
+                        card = free_cards.pop()
+                    else:
+                        card = CropCard()
+                        self._crop_cards.append(card)
+                    card.set_crop(crop_data)
+                # Crop mới nằm ở đầu: chỉ di chuyển card khi vị trí thay đổi
+                if self.faces_layout.indexOf(card) != index:
+                    self.faces_layout.removeWidget(card)
+                    self.faces_layout.insertWidget(index, card)
+                card.show()
+
+            for card in free_cards:
+                if card.crop_data is not None:
+                    card.clear_crop()
 
         except Exception as e:
             log.error(f"Error refreshing crops display: {e}")
 
-    def create_crop_widget_realtime(self, crop_data):
-        """Create widget for a crop với trạng thái Khách quen/Khách mới (real-time)"""
-        widget = QWidget()
-        # Horizontal layout: tất cả trong 1 hàng ngang
-        face_layout = QHBoxLayout()
-        face_layout.setSpacing(10)
-
-        # Nếu là khách quen và có ảnh database, hiển thị cả 2 ảnh trong 1 hàng
-        if crop_data['is_known'] and crop_data.get('gallery_pixmap'):
-            # Ảnh từ database (bên trái)
-            gallery_container = QVBoxLayout()
-            gallery_label = QLabel()
-            gallery_label.setPixmap(crop_data['gallery_pixmap'].scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-            gallery_label.setAlignment(Qt.AlignCenter)
-            gallery_label.setStyleSheet("border: none; border-radius: 5px;")
-            gallery_container.addWidget(gallery_label)
-            
-            # Label cho ảnh database
-            gallery_info_label = QLabel("📷 Database")
-            gallery_info_label.setAlignment(Qt.AlignCenter)
-            gallery_info_label.setStyleSheet("color: #d0d0d0; font-size: 9px; padding: 2px; background: transparent;")
-            gallery_container.addWidget(gallery_info_label)
-            
-            gallery_widget = QWidget()
-            gallery_widget.setStyleSheet("background: transparent;")
-            gallery_widget.setLayout(gallery_container)
-            face_layout.addWidget(gallery_widget)
-            
-            # Ảnh crop hiện tại (giữa)
-            crop_container = QVBoxLayout()
-            face_label = QLabel()
-            face_label.setPixmap(crop_data['pixmap'].scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-            face_label.setAlignment(Qt.AlignCenter)
-            face_label.setStyleSheet("border: none; border-radius: 5px;")
-            crop_container.addWidget(face_label)
-            
-            # Label cho ảnh crop hiện tại
-            crop_info_label = QLabel("📸 Hiện tại")
-            crop_info_label.setAlignment(Qt.AlignCenter)
-            crop_info_label.setStyleSheet("color: #d0d0d0; font-size: 9px; padding: 2px; background: transparent;")
-            crop_container.addWidget(crop_info_label)
-            
-            crop_widget = QWidget()
-            crop_widget.setLayout(crop_container)
-            face_layout.addWidget(crop_widget)
-        else:
-            # Chỉ hiển thị ảnh crop (khách mới hoặc không có ảnh database)
-            face_label = QLabel()
-            face_label.setPixmap(crop_data['pixmap'].scaled(140, 140, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-            face_label.setAlignment(Qt.AlignCenter)
-            face_layout.addWidget(face_label)
-
-        # Xác định trạng thái và màu - nổi bật trên nền xám
-        if crop_data['is_known']:
-            status_text = f"Khách quen\n{crop_data['label']}"
-            status_color = "#04ff00"  # Xanh lá sáng
-            # Màu card cho khách quen: xanh lá nổi bật
-            bg_color = "rgba(46, 204, 113, 0.25)"  # Tăng opacity để nổi bật hơn
-        else:
-            status_text = "Khách mới"
-            status_color = "#ff9800"  # Cam sáng
-            # Màu card cho khách mới: cam nổi bật
-            bg_color = "rgba(255, 152, 0, 0.25)"  # Tăng opacity để nổi bật hơn
-        
-        # Info layout (vertical)
-        info_layout = QVBoxLayout()
-        
-        # Status label
-        text_label = QLabel(status_text)
-        text_font = QFont()
-        text_font.setPointSize(12)
-        text_font.setBold(True)
-        text_label.setFont(text_font)
-        text_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        text_label.setStyleSheet(f"color: {status_color}; padding: 5px;")
-        info_layout.addWidget(text_label)
-        
-        # Confidence score (nếu có)
-        if crop_data.get('confidence', 0) > 0:
-            conf_label = QLabel(f"Độ tin cậy: {crop_data['confidence']:.1f}%")
-            conf_font = QFont()
-            conf_font.setPointSize(9)
-            conf_label.setFont(conf_font)
-            conf_label.setStyleSheet("color: #ffffff; padding: 2px; background: transparent;")
-            info_layout.addWidget(conf_label)
-        
-        # Timestamp label
-        time_label = QLabel(f"⏰ {crop_data['timestamp']}")
-        time_font = QFont()
-        time_font.setPointSize(9)
-        time_label.setFont(time_font)
-        time_label.setStyleSheet("color: #e0e0e0; padding: 2px; background: transparent;")
-        info_layout.addWidget(time_label)
-        
-        face_layout.addLayout(info_layout)
-        face_layout.addStretch()
-
-        widget.setLayout(face_layout)
-        # Áp dụng màu động dựa trên trạng thái - không có border
-        widget.setStyleSheet(f"""
-            QWidget {{ 
-                border: none; 
-                border-radius: 8px; 
-                padding: 10px; 
-                background: {bg_color}; 
-                margin-bottom: 5px;
-            }}
-        """)
-        return widget
-
     def update_fps(self, fps):
         """Update FPS display"""
         self.fps_label.setText(f"FPS: {fps:.1f}")
@@ -1205,6 +1540,15 @@ class ClientPanel(QMainWindow):
         except Exception as e:
             log.error(f"Error checking model config: {e}")
 
+    def refresh_capture_interval(self):
+        """Update capture_interval của video thread đang chạy từ database"""
+        if not self.video_thread:
+            return
+        try:
+            self.video_thread.capture_interval = self.db.get_capture_interval()
+        except Exception as e:
+            log.error(f"Error refreshing capture interval: {e}")
+
     def configure_webcam(self):
         """Configure webcam source"""
         dialog = QDialog(self)
@@ -1482,19 +1826,40 @@ class ClientPanel(QMainWindow):
         self.logout_signal.emit()
         self.close()
 
+    def sync_video_overlay(self):
+        """Chỉ vẽ overlay khi cửa sổ video đang hiển thị (không minimize/ẩn)"""
+        if self.video_thread:
+            self.video_thread.set_overlay(self.isVisible() and not self.isMinimized())
+
+    def eventFilter(self, obj, event):
+        """Video label resize: báo kích thước mới cho video thread (frame được resize bằng cv2)"""
+        if obj is self.video_label and event.type() == QEvent.Resize and self.video_thread:
+            self.video_thread.set_display_size(event.size().width(), event.size().height())
+        return super().eventFilter(obj, event)
+
+    def changeEvent(self, event):
+        """Minimize/restore: bật/tắt overlay của video thread"""
+        if event.type() == QEvent.WindowStateChange:
+            self.sync_video_overlay()
+        super().changeEvent(event)
+
+    def hideEvent(self, event):
+        """Cửa sổ bị ẩn: tắt overlay"""
+        super().hideEvent(event)
+        self.sync_video_overlay()
+
     def showEvent(self, event):
         """Show fullscreen"""
         super().showEvent(event)
-        try:
-            from PyQt5.QtWidgets import QApplication
-            screen = QApplication.primaryScreen().availableGeometry()
-            self.setGeometry(screen)
-            self.showFullScreen()
-        except:
-            self.showFullScreen()
+        # showFullScreen đã chiếm toàn màn hình, setGeometry trước đó chỉ thêm một lượt layout
+        self.showFullScreen()
+        self.sync_video_overlay()
     
     def keyPressEvent(self, event):
         """Handle ESC key to exit fullscreen"""
+        # Giữ ESC sinh auto-repeat: chỉ toggle một lần cho mỗi lần nhấn
+        if event.isAutoRepeat():
+            return super().keyPressEvent(event)
         if event.key() == Qt.Key_Escape:
             # Toggle fullscreen on ESC
             if self.isFullScreen():
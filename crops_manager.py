@@ -9,13 +9,21 @@ import os
 import cv2
 import logging as log
 from pathlib import Path
+from collections import deque
 from datetime import datetime, timedelta
+from time import perf_counter
 from typing import Optional, List, Dict, Any
 import numpy as np
 import json
 
 from database import Database
-from models import Crop
+from models import Crop, THUMBNAIL_SIZE, thumbnail_path_for
+
+# JPEG 85 baseline: file nhỏ hơn và encode nhanh hơn mặc định (95), đủ cho ảnh crop
+CROP_JPEG_PARAMS = [int(cv2.IMWRITE_JPEG_QUALITY), 85, int(cv2.IMWRITE_JPEG_PROGRESSIVE), 0]
+# Crop gần giống (dHash lệch < DUPLICATE_MAX_BITS bit) của cùng track, chụp cách nhau < DUPLICATE_WINDOW giây -> bỏ qua
+DUPLICATE_WINDOW = 0.5
+DUPLICATE_MAX_BITS = 5
 
 
 class CropsManager:
@@ -31,6 +39,7 @@ class CropsManager:
         """
         self.db = db
         self.crops_folder = Path(crops_folder)
+        self._recent_hashes = deque(maxlen=32)  # (track_id, dhash, thời điểm chụp perf_counter)
         self.ensure_folders()
 
         log.info(f"CropsManager initialized with folder: {self.crops_folder}")
@@ -52,7 +61,9 @@ class CropsManager:
                   customer_id: Optional[int] = None,
                   event_id: Optional[int] = None,
                   bbox: Optional[tuple] = None,
-                  confidence: float = 0.0) -> Optional[int]:
+                  confidence: float = 0.0,
+                  track_id: Optional[int] = None,
+                  captured_at: Optional[float] = None) -> Optional[int]:
         """
         Save face crop to disk and database
 
@@ -63,49 +74,24 @@ class CropsManager:
             event_id: Optional event ID
             bbox: Optional bounding box (xmin, ymin, xmax, ymax)
             confidence: Recognition confidence
+            track_id: Optional track ID, dùng để bỏ crop gần giống của cùng track
+            captured_at: Thời điểm chụp (perf_counter), mặc định là lúc ghi
 
         Returns:
             Crop ID, or None if failed
         """
         try:
-            # Validate image
-            if face_image is None or face_image.size == 0:
-                log.warning("Empty face image, skipping crop save")
+            file_path = self._write_crop_files(face_image, customer_name, customer_id,
+                                               track_id, captured_at)
+            if file_path is None:
                 return None
 
-            # Generate filename
-            timestamp = datetime.now().strftime("%H%M%S")
-            customer_prefix = customer_name.replace(" ", "_")
-            if customer_id:
-                filename = f"CUST-{customer_id}_{customer_prefix}_{timestamp}.jpg"
-            else:
-                filename = f"UNKNOWN_{timestamp}.jpg"
-
-            # Get today's folder
-            today_folder = self.get_today_folder()
-            file_path = today_folder / filename
-
-            # Save image
-            cv2.imwrite(str(file_path), face_image)
-            log.info(f"Crop saved: {file_path}")
-
-            # Prepare bbox for database
-            bbox_json = None
-            if bbox:
-                bbox_dict = {
-                    'x': int(bbox[0]),
-                    'y': int(bbox[1]),
-                    'w': int(bbox[2] - bbox[0]),
-                    'h': int(bbox[3] - bbox[1])
-                }
-                bbox_json = json.dumps(bbox_dict)
-
             # Save to database
             crop_id = self.db.add_crop(
-                file_path=str(file_path),
+                file_path=file_path,
                 customer_id=customer_id,
                 event_id=event_id,
-                bbox=bbox_json,
+                bbox=self._bbox_json(bbox),
                 confidence=confidence
             )
 
@@ -116,6 +102,135 @@ class CropsManager:
             log.error(f"Error saving crop: {e}")
             return None
 
+    def save_crops(self, crops: List[Dict[str, Any]]) -> int:
+        """
+        Save many crops: ghi ảnh từng crop, insert DB trong một transaction
+
+        Args:
+            crops: List of save_crop() keyword arguments
+
+        Returns:
+            Number of crops saved
+        """
+        records = []
+        for crop in crops:
+            try:
+                file_path = self._write_crop_files(
+                    crop['face_image'], crop['customer_name'], crop.get('customer_id'),
+                    crop.get('track_id'), crop.get('captured_at'))
+                if file_path is not None:
+                    records.append((crop.get('customer_id'), crop.get('event_id'), file_path,
+                                    self._bbox_json(crop.get('bbox')), crop.get('confidence', 0.0)))
+            except Exception as e:
+                log.error(f"Error saving crop: {e}")
+
+        if records:
+            try:
+                self.db.add_crops(records)
+                log.info(f"{len(records)} crop records created in DB")
+            except Exception as e:
+                log.error(f"Error saving crop records: {e}")
+                return 0
+        return len(records)
+
+    def _write_crop_files(self, face_image: np.ndarray, customer_name: str,
+                          customer_id: Optional[int] = None, track_id: Optional[int] = None,
+                          captured_at: Optional[float] = None) -> Optional[str]:
+        """Ghi ảnh crop + thumbnail vào folder hôm nay, trả về đường dẫn crop"""
+        # Validate image
+        if face_image is None or face_image.size == 0:
+            log.warning("Empty face image, skipping crop save")
+            return None
+        if self._is_recent_duplicate(face_image, track_id, captured_at):
+            log.debug(f"Near-duplicate crop of {customer_name}, skipping crop save")
+            return None
+
+        # Generate filename
+        timestamp = datetime.now().strftime("%H%M%S")
+        customer_prefix = customer_name.replace(" ", "_")
+        if customer_id:
+            filename = f"CUST-{customer_id}_{customer_prefix}_{timestamp}.jpg"
+        else:
+            filename = f"UNKNOWN_{timestamp}.jpg"
+
+        # Get today's folder
+        today_folder = self.get_today_folder()
+        file_path = today_folder / filename
+
+        # Save image
+        cv2.imwrite(str(file_path), face_image, CROP_JPEG_PARAMS)
+        log.info(f"Crop saved: {file_path}")
+
+        # Thumbnail nhỏ cho bảng Crops trong admin panel
+        self.save_thumbnail(face_image, str(file_path))
+        return str(file_path)
+
+    @staticmethod
+    def _dhash(face_image: np.ndarray) -> int:
+        """Difference hash 64-bit của ảnh (xám, 9x8)"""
+        gray = cv2.cvtColor(face_image, cv2.COLOR_BGR2GRAY) if face_image.ndim == 3 else face_image
+        small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+        return int.from_bytes(np.packbits(small[:, 1:] > small[:, :-1]).tobytes(), 'big')
+
+    def _is_recent_duplicate(self, face_image: np.ndarray, track_id: Optional[int],
+                             captured_at: Optional[float] = None) -> bool:
+        """True nếu crop gần giống của cùng track được chụp trong DUPLICATE_WINDOW giây trước đó"""
+        # Không có track: không biết có cùng một người không (mọi Unknown đều customer_id=None)
+        if track_id is None:
+            return False
+        # Thời điểm chụp, không phải lúc ghi: queue bị dồn không làm crops trông như chụp cùng lúc
+        if captured_at is None:
+            captured_at = perf_counter()
+        image_hash = self._dhash(face_image)
+        for recent_track_id, recent_hash, recent_at in self._recent_hashes:
+            if (recent_track_id == track_id and abs(captured_at - recent_at) < DUPLICATE_WINDOW
+                    and bin(image_hash ^ recent_hash).count('1') < DUPLICATE_MAX_BITS):
+                return True
+        self._recent_hashes.append((track_id, image_hash, captured_at))
+        return False
+
+    @staticmethod
+    def _bbox_json(bbox: Optional[tuple]) -> Optional[str]:
+        """Bbox (xmin, ymin, xmax, ymax) -> JSON {x, y, w, h} cho database"""
+        if not bbox:
+            return None
+        return json.dumps({
+            'x': int(bbox[0]),
+            'y': int(bbox[1]),
+            'w': int(bbox[2] - bbox[0]),
+            'h': int(bbox[3] - bbox[1])
+        })
+
+    def save_thumbnail(self, face_image: np.ndarray, file_path: str) -> bool:
+        """
+        Save a downscaled WebP thumbnail next to the crop
+
+        Args:
+            face_image: Face crop image (numpy array)
+            file_path: Path of the full-size crop
+
+        Returns:
+            True if thumbnail was written
+        """
+        try:
+            h, w = face_image.shape[:2]
+            scale = THUMBNAIL_SIZE / max(h, w)
+            if scale < 1.0:
+                size = (max(1, int(w * scale)), max(1, int(h * scale)))
+                thumb = cv2.resize(face_image, size, interpolation=cv2.INTER_AREA)
+            else:
+                thumb = face_image
+
+            thumb_path = thumbnail_path_for(file_path)
+            if not cv2.imwrite(thumb_path, thumb, [cv2.IMWRITE_WEBP_QUALITY, 80]):
+                log.warning(f"Could not write thumbnail: {thumb_path}")
+                return False
+            return True
+
+        except Exception as e:
+            log.error(f"Error saving thumbnail: {e}")
+            return False
+
     def get_crop_image(self, crop_id: int) -> Optional[np.ndarray]:
         """
         Load crop image from disk
@@ -208,6 +323,10 @@ class CropsManager:
                 file_path.unlink()
                 log.info(f"Crop file deleted: {file_path}")
 
+            thumb_path = Path(crop.get_thumbnail_path())
+            if thumb_path.exists():
+                thumb_path.unlink()
+
             # Delete from database
             # TODO: Add delete_crop method to Database class
             # self.db.delete_crop(crop_id)
@@ -6,13 +6,26 @@ SQLite database với CRUD operations
 """
 
 import sqlite3
+import threading
 import logging as log
 from pathlib import Path
 from datetime import datetime, date
 from typing import List, Optional, Dict, Any
 from contextlib import contextmanager
 
-from models import Camera, Customer, Event, Crop, Visit
+from models import Camera, Customer, Event, Crop, Visit, CustomerSegment
+
+
+def _like_pattern(query: str) -> str:
+    """Substring LIKE pattern (dùng với ESCAPE '\\')"""
+    # Escape wildcard của LIKE trong từ khóa người dùng nhập
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def _fts_phrase(query: str) -> str:
+    """Quote user input as a single FTS5 phrase"""
+    return '"' + query.replace('"', '""') + '"'
 
 
 class Database:
@@ -22,21 +35,40 @@ class Database:
         """Initialize database connection"""
         self.db_path = db_path
         self.conn = None
+        # Mỗi thread (UI, video, QThreadPool worker) giữ một connection riêng
+        self._local = threading.local()
+        # Mọi connection đã mở (mọi thread) để close() đóng hết
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+        self.fts_enabled = False
         self.init_database()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with per-connection PRAGMAs applied"""
+        # check_same_thread=False chỉ để close() đóng được từ thread khác, mỗi thread vẫn dùng connection riêng
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Return rows as dicts
+        conn.execute('PRAGMA synchronous=NORMAL')  # an toàn với WAL
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        return conn
+
     @contextmanager
     def get_connection(self):
         """Get database connection as context manager"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dicts
+        conn = getattr(self._local, 'conn', None)
+        with self._connections_lock:
+            # Connection đã bị close() đóng thì mở lại
+            if conn is None or conn not in self._connections:
+                conn = self._connect()
+                self._local.conn = conn
+                self._connections.add(conn)
         try:
             yield conn
             conn.commit()
         except Exception as e:
             conn.rollback()
             raise e
-        finally:
-            conn.close()
 
     def init_database(self):
         """Initialize database tables"""
@@ -45,6 +77,9 @@ class Database:
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
+            # WAL: reader không bị block khi có writer commit (lưu vĩnh viễn trong file db)
+            cursor.execute('PRAGMA journal_mode=WAL')
+
             # Create cameras table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS cameras (
@@ -141,11 +176,18 @@ class Database:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp DESC)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_customer ON events(customer_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_type ON events(event_type)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_customer_name ON events(customer_name)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_crops_customer ON crops(customer_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_crops_event ON crops(event_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_crops_cust_ts ON crops(customer_id, timestamp)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_visits_customer ON visits(customer_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_customers_face_id ON customers(face_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)')
 
+            # Full-text index cho tìm kiếm theo tên khách hàng (events + crops qua customers)
+            self.fts_enabled = (self._init_fts(cursor, 'events', 'customer_name')
+                                and self._init_fts(cursor, 'customers', 'name'))
+
             # Initialize default users if not exist
             cursor.execute('SELECT COUNT(*) FROM users')
             user_count = cursor.fetchone()[0]
@@ -164,6 +206,47 @@ class Database:
 
             log.info("Database initialized successfully")
 
+    def _init_fts(self, cursor, table: str, column: str) -> bool:
+        """Create FTS5 (trigram) index {table}_fts over table.column, kept in sync by triggers"""
+        fts = f'{table}_fts'
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,))
+        exists = cursor.fetchone() is not None
+        try:
+            # trigram tokenizer hỗ trợ tìm chuỗi con như LIKE '%x%' (SQLite >= 3.34)
+            cursor.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                    {column}, content='{table}', content_rowid='id', tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            log.warning(f"FTS5 not available, name search falls back to LIKE: {e}")
+            return False
+
+        # Triggers giữ index đồng bộ với bảng gốc
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {column})
+                VALUES ('delete', old.id, old.{column});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {column})
+                VALUES ('delete', old.id, old.{column});
+                INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column});
+            END
+        ''')
+
+        if not exists:
+            # Index các dòng đã có trước khi tạo bảng FTS
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        return True
+
     # ==================== CAMERA OPERATIONS ====================
 
     def add_camera(self, name: str, source: str, source_type: str = "webcam") -> int:
@@ -234,6 +317,18 @@ class Database:
                 return Customer.from_dict(dict(row))
             return None
 
+    def get_customers_by_ids(self, customer_ids) -> Dict[int, Customer]:
+        """Get customers for many IDs in one query, keyed by ID"""
+        ids = list(set(customer_ids))
+        if not ids:
+            return {}
+        placeholders = ','.join('?' * len(ids))
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT * FROM customers WHERE id IN ({placeholders})', ids)
+            rows = cursor.fetchall()
+            return {row['id']: Customer.from_dict(dict(row)) for row in rows}
+
     def get_customer_by_face_id(self, face_id: str) -> Optional[Customer]:
         """Get customer by face_id"""
         with self.get_connection() as conn:
@@ -327,6 +422,18 @@ class Database:
                 return Event.from_dict(dict(row))
             return None
 
+    def get_events_by_ids(self, event_ids) -> Dict[int, Event]:
+        """Get events for many IDs in one query, keyed by ID"""
+        ids = list(set(event_ids))
+        if not ids:
+            return {}
+        placeholders = ','.join('?' * len(ids))
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT * FROM events WHERE id IN ({placeholders})', ids)
+            rows = cursor.fetchall()
+            return {row['id']: Event.from_dict(dict(row)) for row in rows}
+
     def update_event_metadata(self, event_id: int, metadata: Dict[str, Any]) -> bool:
         """Update event metadata"""
         import json
@@ -354,6 +461,54 @@ class Database:
             rows = cursor.fetchall()
             return [Event.from_dict(dict(row)) for row in rows]
 
+    def _event_filters(self, type_filter: Optional[str] = None,
+                       name_query: Optional[str] = None,
+                       before_id: Optional[int] = None):
+        """Build WHERE clause + params for event filters"""
+        clauses = []
+        params = []
+        if before_id is not None:
+            # Keyset pagination: trang sau bắt đầu ngay dưới id cuối của trang trước
+            clauses.append('id < ?')
+            params.append(before_id)
+        if type_filter:
+            clauses.append('event_type = ?')
+            params.append(type_filter)
+        if name_query and self.fts_enabled and len(name_query) >= 3:
+            # Trigram index cần >= 3 ký tự; tìm như một cụm từ
+            clauses.append('id IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?)')
+            params.append(_fts_phrase(name_query))
+        elif name_query:
+            clauses.append("customer_name LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(name_query))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def get_events(self, offset: int = 0, limit: int = 20,
+                   type_filter: Optional[str] = None,
+                   name_query: Optional[str] = None,
+                   before_id: Optional[int] = None) -> List[Event]:
+        """Get one page of events (newest first) with filters applied in SQL"""
+        where, params = self._event_filters(type_filter, name_query, before_id)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # id tăng theo thời điểm insert nên ORDER BY id DESC == mới nhất trước
+            cursor.execute(
+                f'SELECT * FROM events {where} ORDER BY id DESC LIMIT ? OFFSET ?',
+                (*params, limit, offset)
+            )
+            rows = cursor.fetchall()
+            return [Event.from_dict(dict(row)) for row in rows]
+
+    def count_events(self, type_filter: Optional[str] = None,
+                     name_query: Optional[str] = None) -> int:
+        """Count events matching filters"""
+        where, params = self._event_filters(type_filter, name_query)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT COUNT(*) FROM events {where}', params)
+            return cursor.fetchone()[0]
+
     def get_events_by_customer(self, customer_id: int, limit: int = 50) -> List[Event]:
         """Get events for a customer"""
         with self.get_connection() as conn:
@@ -411,6 +566,16 @@ class Database:
             )
             return cursor.lastrowid
 
+    def add_crops(self, crops: List[tuple]):
+        """Add many crops in one transaction: (customer_id, event_id, file_path, bbox, confidence)"""
+        with self.get_connection() as conn:
+            conn.executemany(
+                '''INSERT INTO crops
+                   (customer_id, event_id, file_path, bbox, confidence)
+                   VALUES (?, ?, ?, ?, ?)''',
+                crops
+            )
+
     def get_crop(self, crop_id: int) -> Optional[Crop]:
         """Get crop by ID"""
         with self.get_connection() as conn:
@@ -432,6 +597,85 @@ class Database:
             rows = cursor.fetchall()
             return [Crop.from_dict(dict(row)) for row in rows]
 
+    def get_crops_by_event(self, event_id: int, limit: int = 1) -> List[Crop]:
+        """Get crops for an event (uses idx_crops_event)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT * FROM crops WHERE event_id = ? LIMIT ?',
+                (event_id, limit)
+            )
+            rows = cursor.fetchall()
+            return [Crop.from_dict(dict(row)) for row in rows]
+
+    def get_crops_by_customer_between(self, customer_id: int, start: datetime,
+                                      end: datetime, limit: int = 1) -> List[Crop]:
+        """Get crops for a customer within a time window (uses idx_crops_cust_ts)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''SELECT * FROM crops
+                   WHERE customer_id = ? AND timestamp BETWEEN ? AND ?
+                   ORDER BY timestamp LIMIT ?''',
+                (customer_id, start, end, limit)
+            )
+            rows = cursor.fetchall()
+            return [Crop.from_dict(dict(row)) for row in rows]
+
+    def _crop_filters(self, name_query: Optional[str] = None,
+                      before_id: Optional[int] = None):
+        """Build JOIN + WHERE clause + params for crop filters"""
+        join = ""
+        clauses = []
+        params = []
+        if before_id is not None:
+            clauses.append('c.id < ?')
+            params.append(before_id)
+        if name_query and self.fts_enabled and len(name_query) >= 3:
+            # Chỉ lấy crops của các khách hàng khớp trong customers_fts, không cần JOIN
+            match = 'c.customer_id IN (SELECT rowid FROM customers_fts WHERE customers_fts MATCH ?)'
+            params.append(_fts_phrase(name_query))
+            if name_query.lower() in 'unknown':
+                # Crop không có khách hàng hiển thị là "Unknown"
+                match = f'({match} OR c.customer_id IS NULL OR c.customer_id NOT IN (SELECT id FROM customers))'
+            clauses.append(match)
+        elif name_query:
+            # Crop không có khách hàng hiển thị là "Unknown"
+            join = 'LEFT JOIN customers cu ON cu.id = c.customer_id'
+            clauses.append("COALESCE(cu.name, 'Unknown') LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(name_query))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return f"{join} {where}", params
+
+    def get_crops(self, offset: int = 0, limit: int = 20,
+                  name_query: Optional[str] = None,
+                  before_id: Optional[int] = None) -> List[Crop]:
+        """Get one page of crops (newest first) filtered by customer name"""
+        filters, params = self._crop_filters(name_query, before_id)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f'SELECT c.* FROM crops c {filters} ORDER BY c.id DESC LIMIT ? OFFSET ?',
+                (*params, limit, offset)
+            )
+            rows = cursor.fetchall()
+            return [Crop.from_dict(dict(row)) for row in rows]
+
+    def count_crops(self, name_query: Optional[str] = None) -> int:
+        """Count crops matching customer name filter"""
+        filters, params = self._crop_filters(name_query)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT COUNT(*) FROM crops c {filters}', params)
+            return cursor.fetchone()[0]
+
+    def get_crops_version(self) -> tuple:
+        """(COUNT, MAX(id)) of crops table, changes when crops are added or deleted"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*), MAX(id) FROM crops')
+            return tuple(cursor.fetchone())
+
     def get_recent_crops(self, limit: int = 20) -> List[Crop]:
         """Get recent crops"""
         with self.get_connection() as conn:
@@ -609,6 +853,17 @@ class Database:
                 return row['value']
             return default
 
+    def get_settings(self, keys) -> Dict[str, str]:
+        """Get many settings in one query (keys không có trong bảng bị bỏ qua)"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        placeholders = ','.join('?' * len(keys))
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT key, value FROM settings WHERE key IN ({placeholders})', keys)
+            return {row['key']: row['value'] for row in cursor.fetchall()}
+
     def set_setting(self, key: str, value: str):
         """Set setting value"""
         with self.get_connection() as conn:
@@ -620,21 +875,33 @@ class Database:
 
     def get_model_config(self) -> Dict[str, str]:
         """Get model configuration"""
+        model_device = self.get_setting('model_device', 'AUTO:GPU,CPU')
         return {
             'model_fd_path': self.get_setting('model_fd_path', './models/face-detection-retail-0004.xml'),
             'model_lm_path': self.get_setting('model_lm_path', './models/landmarks-regression-retail-0009.xml'),
             'model_reid_path': self.get_setting('model_reid_path', './models/face-reidentification-retail-0095.xml'),
-            'gallery_path': self.get_setting('gallery_path', './gallery')
+            'gallery_path': self.get_setting('gallery_path', './gallery'),
+            # OpenVINO device cho cả 3 models; AUTO tự fallback về CPU nếu không có iGPU
+            'model_device': model_device,
+            # Device riêng từng model (vd. FD trên GPU, ReID trên CPU); chưa set thì theo model_device
+            'device_fd': self.get_setting('device_fd') or model_device,
+            'device_lm': self.get_setting('device_lm') or model_device,
+            'device_reid': self.get_setting('device_reid') or model_device,
+            # '1': ưu tiên IR FP16-INT8 (NNCF/omz quantized) khi có sẵn, '0': dùng đúng path đã cấu hình
+            'use_int8': self.get_setting('use_int8', '1')
         }
 
     def save_model_config(self, model_fd_path: str, model_lm_path: str, 
-                         model_reid_path: str, gallery_path: str):
+                         model_reid_path: str, gallery_path: str,
+                         model_device: Optional[str] = None):
         """Save model configuration"""
         self.set_setting('model_fd_path', model_fd_path)
         self.set_setting('model_lm_path', model_lm_path)
         self.set_setting('model_reid_path', model_reid_path)
         self.set_setting('gallery_path', gallery_path)
-        log.info(f"Model configuration saved: FD={model_fd_path}, LM={model_lm_path}, ReID={model_reid_path}, Gallery={gallery_path}")
+        if model_device:
+            self.set_setting('model_device', model_device)
+        log.info(f"Model configuration saved: FD={model_fd_path}, LM={model_lm_path}, ReID={model_reid_path}, Gallery={gallery_path}, Device={model_device}")
 
     def get_detection_cooldown(self) -> float:
         """Get detection cooldown time in seconds"""
@@ -675,6 +942,22 @@ class Database:
         self.set_setting('capture_interval', str(interval_seconds))
         log.info(f"Capture interval set to {interval_seconds} seconds")
 
+    def get_system_config(self) -> Dict[str, float]:
+        """Get detection_cooldown / revisit_threshold / capture_interval in one query"""
+        defaults = {
+            'detection_cooldown': 5.0,  # giây
+            'revisit_threshold': 3.0,   # giờ
+            'capture_interval': 2.0,    # giây
+        }
+        values = self.get_settings(defaults)
+        config = {}
+        for key, default in defaults.items():
+            try:
+                config[key] = float(values.get(key, default))
+            except ValueError:
+                config[key] = default
+        return config
+
     # ==================== UTILITY METHODS ====================
 
     def get_statistics(self) -> Dict[str, Any]:
@@ -709,8 +992,26 @@ class Database:
                 'active_cameras': active_cameras
             }
 
+    def get_counts(self) -> Dict[str, int]:
+        """Get customers / VIPs / events / crops counts in one query"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''SELECT (SELECT COUNT(*) FROM customers) AS customers,
+                          (SELECT COUNT(*) FROM customers WHERE segment = ?) AS vips,
+                          (SELECT COUNT(*) FROM events) AS events,
+                          (SELECT COUNT(*) FROM crops) AS crops''',
+                (CustomerSegment.VIP,)
+            )
+            return dict(cursor.fetchone())
+
     def close(self):
-        """Close database connection"""
+        """Close database connections of all threads"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            conn.close()
+        self._local.conn = None
         if self.conn:
             self.conn.close()
             log.info("Database connection closed")
@@ -7,6 +7,7 @@ Quản lý và theo dõi các sự kiện nhận diện
 
 import logging as log
 from datetime import datetime, timedelta
+from statistics import fmean
 from typing import Dict, Optional, Any, List
 from database import Database
 from models import EventType, CustomerSegment
@@ -152,6 +153,7 @@ class EventsManager:
                     'face_id': face_id,
                     'entry_time': now.isoformat(),
                     'confidences': [confidence],
+                    'confidence_avg': confidence,
                     'frame_count': 1
                 }
             )
@@ -204,6 +206,7 @@ class EventsManager:
                         'face_id': face_id,
                         'entry_time': now.isoformat(),
                         'confidences': [confidence],
+                        'confidence_avg': confidence,
                         'frame_count': 1
                     }
                 )
@@ -238,7 +241,7 @@ class EventsManager:
                 # Update event metadata periodically (every 10 frames) - async
                 if active_session['frame_count'] % 10 == 0:
                     # Update metadata with latest info
-                    avg_confidence = sum(active_session['confidences']) / len(active_session['confidences'])
+                    avg_confidence = fmean(active_session['confidences'])
                     try:
                         event = self.db.get_event(active_session['event_id'])
                         if event:
@@ -308,6 +311,7 @@ class EventsManager:
                     'bbox': bbox,
                     'entry_time': now.isoformat(),
                     'confidences': [confidence],
+                    'confidence_avg': confidence,
                     'frame_count': 1
                 }
             )
@@ -355,6 +359,7 @@ class EventsManager:
                         'bbox': bbox,
                         'entry_time': now.isoformat(),
                         'confidences': [confidence],
+                        'confidence_avg': confidence,
                         'frame_count': 1
                     }
                 )
@@ -389,7 +394,7 @@ class EventsManager:
                 
                 # Update event metadata periodically
                 if active_session['frame_count'] % 10 == 0:
-                    avg_confidence = sum(active_session['confidences']) / len(active_session['confidences'])
+                    avg_confidence = fmean(active_session['confidences'])
                     try:
                         event = self.db.get_event(active_session['event_id'])
                         if event:
@@ -498,7 +503,7 @@ class EventsManager:
         # Calculate confidence summary
         confidences = session['confidences']
         if confidences:
-            avg_confidence = sum(confidences) / len(confidences)
+            avg_confidence = fmean(confidences)
             max_confidence = max(confidences)
             min_confidence = min(confidences)
         else:
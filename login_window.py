@@ -534,13 +534,8 @@ class ModernLoginWindow(QWidget):
     def showEvent(self, event):
         """Show fullscreen"""
         super().showEvent(event)
-        try:
-            from PyQt5.QtWidgets import QApplication
-            screen = QApplication.primaryScreen().availableGeometry()
-            self.setGeometry(screen)
-            self.showFullScreen()
-        except:
-            self.showFullScreen()
+        # showFullScreen đã chiếm toàn màn hình, setGeometry trước đó chỉ thêm một lượt layout
+        self.showFullScreen()
 
     def keyPressEvent(self, event):
         """Handle ESC key"""
@@ -7,10 +7,20 @@ Data Models for Face Recognition System
 
 from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
 from typing import Optional, Dict, Any
 import json
 
 
+# Kích thước thumbnail crop (cạnh dài nhất, pixel)
+THUMBNAIL_SIZE = 128
+
+
+def thumbnail_path_for(file_path: str) -> str:
+    """Thumbnail path for a crop image: <name>.thumb.webp"""
+    return str(Path(file_path).with_suffix('.thumb.webp'))
+
+
 @dataclass
 class Camera:
     """Camera model"""
@@ -211,6 +221,10 @@ class Crop:
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
 
+    def get_thumbnail_path(self) -> str:
+        """Path of the small WebP thumbnail saved next to the crop"""
+        return thumbnail_path_for(self.file_path)
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Crop':
         """Create from dictionary"""
@@ -8,11 +8,20 @@ Module độc lập cho face recognition system
 import logging as log
 import os
 import os.path as osp
+import threading
+from collections import OrderedDict
+from pathlib import Path
 import cv2
 import numpy as np
 from scipy.optimize import linear_sum_assignment
 from scipy.spatial.distance import cosine
-from openvino import AsyncInferQueue, PartialShape
+from openvino import AsyncInferQueue, Core, Dimension, PartialShape
+
+# Tuỳ chọn: HNSW index cho gallery lớn (pip install hnswlib), không có thì so khớp toàn bộ gallery
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
 
 
 # ============================================================================
@@ -91,6 +100,201 @@ def resize_input(image, target_shape, nchw_layout):
     return resized_image
 
 
+# Compiled models được cache ở đây, lần load sau chỉ import blob thay vì compile lại
+MODEL_CACHE_DIR = Path('./.ov_cache')
+
+
+def enable_model_cache(core, cache_dir=MODEL_CACHE_DIR):
+    """
+    Bật OpenVINO model caching cho core
+
+    Args:
+        core: OpenVINO Core
+        cache_dir: Thư mục chứa compiled blobs (key theo model + device)
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    core.set_property({"CACHE_DIR": str(cache_dir.resolve())})
+
+
+# OpenVINO Core dùng chung cho cả process (khởi tạo plugins chỉ một lần)
+_OV_CORE = None
+_OV_CORE_LOCK = threading.Lock()
+
+
+def get_core():
+    """
+    Lấy OpenVINO Core singleton (model cache đã được bật)
+
+    Returns:
+        OpenVINO Core
+    """
+    global _OV_CORE
+    with _OV_CORE_LOCK:
+        if _OV_CORE is None:
+            _OV_CORE = Core()
+            enable_model_cache(_OV_CORE)
+        return _OV_CORE
+
+
+# CompiledModel dùng chung trong process (Admin + Client panel, load lại models),
+# giữ tối đa COMPILED_MODEL_CACHE_SIZE bản dùng gần nhất
+COMPILED_MODEL_CACHE_SIZE = 8
+_COMPILED_MODELS = OrderedDict()
+_COMPILED_MODELS_LOCK = threading.Lock()
+
+
+def compile_model_cached(core, model, model_path, device, config):
+    """
+    compile_model, dùng lại CompiledModel đã compile cho cùng model/shape/device/config
+
+    Args:
+        core: OpenVINO Core
+        model: Model đã read (và reshape nếu cần)
+        model_path: Đường dẫn .xml của model (mtime thay đổi -> compile lại)
+        device: OpenVINO device
+        config: Compile config
+
+    Returns:
+        CompiledModel
+    """
+    model_path = Path(model_path).resolve()
+    try:
+        mtime = model_path.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    key = (id(core), str(model_path), mtime,
+           tuple(str(port.get_partial_shape()) for port in model.inputs),
+           device, tuple(sorted(config.items())))
+    with _COMPILED_MODELS_LOCK:
+        compiled_model = _COMPILED_MODELS.get(key)
+        if compiled_model is not None:
+            _COMPILED_MODELS.move_to_end(key)
+            log.info('Reusing compiled model {} on {}'.format(model_path, device))
+            return compiled_model
+
+    # Compile ngoài lock: các models được load song song
+    compiled_model = core.compile_model(model, device, config)
+    with _COMPILED_MODELS_LOCK:
+        _COMPILED_MODELS[key] = compiled_model
+        while len(_COMPILED_MODELS) > COMPILED_MODEL_CACHE_SIZE:
+            _COMPILED_MODELS.popitem(last=False)
+    return compiled_model
+
+
+# Các thư mục precision do omz_downloader tạo (models/<name>/<precision>/<name>.xml)
+MODEL_PRECISIONS = ('FP32', 'FP16', 'FP16-INT8')
+
+
+# CPU flags có lệnh INT8 dot-product; thiếu chúng model INT8 có thể chậm hơn FP16 trên CPU
+VNNI_CPU_FLAGS = ('avx512_vnni', 'avx_vnni', 'amx_int8')
+# CPU flags có lệnh BF16 (Cooper Lake / Sapphire Rapids trở lên)
+BF16_CPU_FLAGS = ('avx512_bf16', 'amx_bf16')
+_VNNI_WARNED = False
+
+
+def _cpu_flags():
+    """Set flags CPU từ /proc/cpuinfo, None nếu không đọc được (không phải Linux)"""
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('flags'):
+                    return set(line.split(':', 1)[1].split())
+    except OSError:
+        pass
+    return None
+
+
+def cpu_has_vnni():
+    """
+    Kiểm tra CPU có VNNI/AMX qua /proc/cpuinfo
+
+    Returns:
+        True/False, None nếu không xác định được (không phải Linux)
+    """
+    flags = _cpu_flags()
+    return None if flags is None else any(flag in flags for flag in VNNI_CPU_FLAGS)
+
+
+def cpu_has_bf16():
+    """Kiểm tra CPU có AVX512-BF16/AMX-BF16; True/False, None nếu không xác định được"""
+    flags = _cpu_flags()
+    return None if flags is None else any(flag in flags for flag in BF16_CPU_FLAGS)
+
+
+def precision_hint(device):
+    """
+    INFERENCE_PRECISION_HINT cho device đơn: bf16 trên CPU có BF16, f16 trên GPU
+
+    Args:
+        device: Device đã resolve, vd. 'CPU', 'GPU.0'
+
+    Returns:
+        'bf16' / 'f16', None để giữ mặc định của plugin (kể cả AUTO/MULTI)
+    """
+    if device.startswith('GPU'):
+        return 'f16'
+    if device == 'CPU' and cpu_has_bf16():
+        return 'bf16'
+    return None
+
+
+def resolve_model_path(model_path, precision='FP16-INT8', use_int8=True):
+    """
+    Ưu tiên bản quantized của model nếu có
+
+    Args:
+        model_path: Đường dẫn .xml đã cấu hình
+        precision: Precision ưu tiên (mặc định INT8)
+        use_int8: False để luôn dùng đúng model_path (setting use_int8)
+
+    Returns:
+        Path tới <name>/<precision>/<name>.xml nếu tồn tại, ngược lại model_path
+    """
+    global _VNNI_WARNED
+    model_path = Path(model_path)
+    # Người dùng đã chọn thẳng một precision thì giữ nguyên
+    if not use_int8 or model_path.parent.name in MODEL_PRECISIONS:
+        return model_path
+    candidate = model_path.parent / model_path.stem / precision / model_path.name
+    if candidate.exists() and candidate.with_suffix('.bin').exists():
+        if 'INT8' in precision and cpu_has_vnni() is False and not _VNNI_WARNED:
+            _VNNI_WARNED = True
+            log.warning("CPU không có VNNI (avx512_vnni/avx_vnni): model INT8 có thể chậm hơn FP16 "
+                        "trên CPU, tắt setting use_int8 nếu FPS giảm")
+        return candidate
+    return model_path
+
+
+def resolve_device(core, device):
+    """
+    Bỏ GPU khỏi device khi máy không có GPU (compile_model sẽ lỗi)
+
+    Args:
+        core: OpenVINO Core
+        device: Device đã cấu hình, vd. 'GPU', 'MULTI:GPU,CPU', 'AUTO:GPU,CPU'
+
+    Returns:
+        device, hoặc bản không có GPU (fallback 'CPU')
+    """
+    if 'GPU' not in device or any(d.startswith('GPU') for d in core.get_available_devices()):
+        return device
+    fallback = 'CPU'
+    if ':' in device:
+        plugin, devices = device.split(':', 1)
+        devices = [d for d in devices.split(',') if not d.startswith('GPU')]
+        if devices:
+            fallback = '{}:{}'.format(plugin, ','.join(devices))
+    log.warning('GPU not available, using {} instead of {}'.format(fallback, device))
+    return fallback
+
+
+# PERFORMANCE_HINT theo cách dùng model: 1 request / frame (face detector) cần latency thấp,
+# nhiều requests song song (landmarks/reid cho mọi face, build gallery) cần throughput
+LATENCY_CONFIG = {'PERFORMANCE_HINT': 'LATENCY'}
+THROUGHPUT_CONFIG = {'PERFORMANCE_HINT': 'THROUGHPUT'}
+
+
 # ============================================================================
 # BASE MODULE CLASS
 # ============================================================================
@@ -107,10 +311,23 @@ class Module:
         self.active_requests = 0
         self.clear()
 
-    def deploy(self, device, max_requests=1):
-        """Deploy model lên device"""
+    def deploy(self, device, max_requests=1, config=None):
+        """
+        Deploy model lên device
+
+        Args:
+            device: OpenVINO device
+            max_requests: Số infer requests song song
+            config: Compile config; mặc định chọn PERFORMANCE_HINT theo max_requests
+        """
         self.max_requests = max_requests
-        compiled_model = self.core.compile_model(self.model, device)
+        if config is None:
+            config = THROUGHPUT_CONFIG if max_requests > 1 else LATENCY_CONFIG
+        device = resolve_device(self.core, device)
+        hint = precision_hint(device)
+        if hint and 'INFERENCE_PRECISION_HINT' not in config:
+            config = dict(config, INFERENCE_PRECISION_HINT=hint)
+        compiled_model = compile_model_cached(self.core, self.model, self.model_path, device, config)
         self.output_tensor = compiled_model.outputs[0]
         self.infer_queue = AsyncInferQueue(compiled_model, self.max_requests)
         self.infer_queue.set_callback(self.completion_callback)
@@ -153,6 +370,33 @@ class Module:
         self.start_async(*inputs)
         return self.postprocess()
 
+    def infer_all(self, inputs):
+        """
+        Chạy inference cho nhiều inputs đã preprocess, luôn giữ max_requests
+        requests in flight (start_async tự đợi khi hết request rảnh)
+
+        Returns:
+            np.ndarray (len(inputs), *output_shape[1:])
+        """
+        self.wait()
+        outputs = np.empty((len(inputs), *self.item_output_shape()), dtype=np.float32)
+
+        def store_output(infer_request, id):
+            outputs[id] = infer_request.results[self.output_tensor][0]
+
+        self.infer_queue.set_callback(store_output)
+        try:
+            for id, input_data in enumerate(inputs):
+                self.infer_queue.start_async({self.input_tensor_name: input_data}, id)
+            self.infer_queue.wait_all()
+        finally:
+            self.infer_queue.set_callback(self.completion_callback)
+        return outputs
+
+    def item_output_shape(self):
+        """Shape output của một input (bỏ chiều batch)"""
+        return tuple(self.output_tensor.shape)[1:]
+
 
 # ============================================================================
 # FACE DETECTOR
@@ -320,6 +564,8 @@ class FaceIdentifier(Module):
 
     UNKNOWN_ID = -1
     UNKNOWN_ID_LABEL = "Unknown"
+    # Trên CPU: gộp tối đa MAX_BATCH faces của một frame vào một infer request (batch động)
+    MAX_BATCH = 16
 
     class Result:
         """Identity result"""
@@ -343,11 +589,28 @@ class FaceIdentifier(Module):
         if len(output_shape) not in (2, 4):
             raise RuntimeError("The model expects output shape [1, n, 1, 1] or [1, n], got {}".format(
                 output_shape))
+        self.descriptor_shape = tuple(output_shape)[1:]
+        self.batched = False
+        self._batch_buf = None  # Buffer (MAX_BATCH, C, H, W) dùng lại để ghép faces thành batch
 
         self.faces_database = None
         self.match_threshold = match_threshold
         self.match_algo = match_algo
 
+    def deploy(self, device, max_requests=1, config=None):
+        """Deploy model; device không có GPU thì dùng batch động để infer mọi face trong 1 request"""
+        device = resolve_device(self.core, device)
+        # GPU giữ batch 1 (mỗi face 1 request song song), batch động chỉ bật khi chạy trên CPU
+        self.batched = 'GPU' not in device
+        if self.batched:
+            self.model.reshape({self.input_tensor_name: PartialShape(
+                [Dimension(1, self.MAX_BATCH), *self.input_shape[1:]])})
+        super(FaceIdentifier, self).deploy(device, max_requests, config)
+
+    def item_output_shape(self):
+        """Shape descriptor của một face (output đã compile có batch động)"""
+        return self.descriptor_shape
+
     def set_faces_database(self, database):
         """Set faces database"""
         self.faces_database = database
@@ -360,9 +623,8 @@ class FaceIdentifier(Module):
 
     def preprocess(self, frame, rois, landmarks):
         """Preprocess frame, ROIs và landmarks"""
-        image = frame.copy()
-        inputs = cut_rois(image, rois)
-        self._align_rois(inputs, landmarks)
+        # _align_rois warp ra ảnh mới nên cắt thẳng từ frame, không copy cả frame
+        inputs = self._align_rois(cut_rois(frame, rois), landmarks)
         inputs = [resize_input(input_img, self.input_shape, self.nchw_layout)
                   for input_img in inputs]
         return inputs
@@ -374,8 +636,16 @@ class FaceIdentifier(Module):
     def start_async(self, frame, rois, landmarks):
         """Bắt đầu async inference"""
         inputs = self.preprocess(frame, rois, landmarks)
-        for input_data in inputs:
-            self.enqueue(input_data)
+        if not self.batched:
+            for input_data in inputs:
+                self.enqueue(input_data)
+            return
+        # Ghép faces (1, C, H, W) thành batch trong buffer dùng lại, input được copy khi start_async
+        for start in range(0, len(inputs), self.MAX_BATCH):
+            chunk = inputs[start:start + self.MAX_BATCH]
+            if self._batch_buf is None or self._batch_buf.dtype != chunk[0].dtype:
+                self._batch_buf = np.empty((self.MAX_BATCH, *chunk[0].shape[1:]), chunk[0].dtype)
+            self.enqueue(np.concatenate(chunk, out=self._batch_buf[:len(chunk)]))
 
     def get_threshold(self):
         """Get matching threshold"""
@@ -402,8 +672,11 @@ class FaceIdentifier(Module):
         return results, unknowns_list
 
     def get_descriptors(self):
-        """Get descriptor vectors"""
-        return [out.flatten() for out in self.get_outputs()]
+        """Get descriptor vectors (một vector mỗi face, kể cả khi output theo batch)"""
+        outputs = self.get_outputs()
+        if not outputs:
+            return []
+        return list(np.concatenate([out.reshape(len(out), -1) for out in outputs]))
 
     @staticmethod
     def normalize(array, axis):
@@ -431,17 +704,19 @@ class FaceIdentifier(Module):
         return transform
 
     def _align_rois(self, face_images, face_landmarks):
-        """Align face images theo landmarks"""
+        """Align face images theo landmarks, trả về list ảnh đã align (không sửa input)"""
         assert len(face_images) == len(face_landmarks), \
             'Input lengths differ, got {} and {}'.format(len(face_images), len(face_landmarks))
 
+        aligned = []
         for image, image_landmarks in zip(face_images, face_landmarks):
             scale = np.array((image.shape[1], image.shape[0]))
             desired_landmarks = np.array(self.REFERENCE_LANDMARKS, dtype=float) * scale
             landmarks = image_landmarks * scale
 
             transform = FaceIdentifier.get_transform(desired_landmarks, landmarks)
-            cv2.warpAffine(image, transform, tuple(scale), image, flags=cv2.WARP_INVERSE_MAP)
+            aligned.append(cv2.warpAffine(image, transform, tuple(scale), flags=cv2.WARP_INVERSE_MAP))
+        return aligned
 
 
 # ============================================================================
@@ -452,6 +727,13 @@ class FacesDatabase:
     """Database quản lý khuôn mặt đã đăng ký"""
 
     IMAGE_EXTENSIONS = ['jpg', 'png', 'jpeg']
+    # Gallery từ ANN_MIN_SIZE descriptors trở lên: tìm ANN_K descriptors gần nhất qua HNSW (hnswlib)
+    # thay vì nhân ma trận với toàn bộ gallery; gallery nhỏ hơn thì brute-force vừa nhanh vừa chính xác
+    ANN_MIN_SIZE = 2000
+    ANN_K = 10
+    ANN_EF = 50
+    # Descriptors của từng ảnh + fingerprint (mtime, size), lưu trong thư mục gallery
+    DESCRIPTOR_CACHE_FILE = '_gallery.npz'
 
     class Identity:
         """Identity của một người"""
@@ -517,6 +799,26 @@ class FacesDatabase:
             log.info("The images database folder has no images or is empty. Database will be empty but models can still be used.")
 
         self.database = []
+        # Descriptors đã normalize theo thứ tự thêm vào (buffer tăng gấp đôi khi đầy) + identity của từng hàng
+        self._rows = None
+        self._row_owners = None
+        self._row_count = 0
+        # (embeddings, offsets) của _gallery_embeddings() sắp theo identity; None = cần sắp lại
+        self._embeddings = None
+        # HNSW index của _gallery_index() (item id = hàng của _rows); build một lần sau Pass 3
+        self._index = None
+
+        # Descriptors của lần build trước: chỉ chạy inference cho ảnh mới hoặc đã thay đổi
+        models_key = '|'.join(str(module.model_path) if module else '-'
+                              for module in (face_detector, landmarks_detector, face_identifier))
+        cached = self._load_descriptor_cache(models_key)
+        fingerprints = {}
+        file_descriptors = {}
+        labels = {}
+        reused = 0
+
+        # Pass 1: đọc ảnh + detect faces, chỉ giữ lại face crops (không giữ cả ảnh gốc)
+        faces = []
         for path in paths:
             # Lấy label từ tên folder (nếu ảnh trong folder con) hoặc từ tên file
             folder_name = osp.basename(osp.dirname(path))
@@ -533,10 +835,17 @@ class FacesDatabase:
                 match = re.match(r'(.+?)-\d+$', label)
                 if match:
                     label = match.group(1)
+            labels[path] = label
 
-            image = cv2.imread(path, flags=cv2.IMREAD_COLOR)
+            stat = os.stat(path)
+            fingerprints[path] = (stat.st_mtime_ns, stat.st_size)
+            file_descriptors[path] = []
+            if path in cached and cached[path][0] == fingerprints[path]:
+                file_descriptors[path] = cached[path][1]
+                reused += 1
+                continue
 
-            orig_image = image.copy()
+            image = cv2.imread(path, flags=cv2.IMREAD_COLOR)
 
             if face_detector:
                 rois = face_detector.infer((image,))
@@ -547,18 +856,36 @@ class FacesDatabase:
                 w, h = image.shape[1], image.shape[0]
                 rois = [FaceDetector.Result([0, 0, 0, 0, 0, w, h])]
 
-            for roi in rois:
-                r = [roi]
-                landmarks = landmarks_detector.infer((image, r))
-
-                face_identifier.start_async(image, r, landmarks)
-                descriptor = face_identifier.get_descriptors()[0]
-
+            faces.extend((path, crop(image, roi).copy()) for roi in rois)
+
+        # Pass 2: landmarks + descriptors cho cả gallery qua AsyncInferQueue,
+        # không còn wait đồng bộ cho từng face
+        face_rois = [[self._whole_image_roi(face)] for _, face in faces]
+        landmarks = landmarks_detector.infer_all(
+            [landmarks_detector.preprocess(face, r)[0]
+             for (_, face), r in zip(faces, face_rois)])
+        landmarks = [out.reshape((-1, 2)).astype(np.float64) for out in landmarks]
+        descriptors = face_identifier.infer_all(
+            [face_identifier.preprocess(face, r, [face_landmarks])[0]
+             for (_, face), r, face_landmarks in zip(faces, face_rois, landmarks)])
+        for (path, _), descriptor in zip(faces, descriptors):
+            file_descriptors[path].append(descriptor.flatten())
+
+        if faces or cached.keys() != fingerprints.keys():
+            log.info("Embedded {} gallery faces, {} images reused from cache".format(
+                len(faces), reused))
+            self._save_descriptor_cache(models_key, fingerprints, file_descriptors)
+
+        # Pass 3: thêm vào database theo đúng thứ tự ảnh
+        for path in paths:
+            label = labels[path]
+            for descriptor in file_descriptors[path]:
                 if face_detector:
                     mm = self.check_if_face_exist(descriptor, face_identifier.get_threshold())
                     if mm >= 0:
                         # Face đã tồn tại, append descriptor
                         self.database[mm].descriptors.append(descriptor)
+                        self._append_descriptor(descriptor, mm)
                         log.debug("Appending descriptor for existing label {}".format(
                             self.database[mm].label))
                     else:
@@ -569,17 +896,144 @@ class FacesDatabase:
                     log.debug("Adding label {} to the gallery".format(label))
                     self.add_item(descriptor, label)
 
+        # Gallery đã đầy đủ: build HNSW index một lần, add_item sau đó chỉ thêm vào index
+        self._gallery_index()
+
+    def _load_descriptor_cache(self, models_key):
+        """
+        Đọc descriptors đã lưu của gallery
+
+        Returns:
+            {image path: ((mtime_ns, size), [descriptors])}, rỗng nếu không có cache
+            hoặc cache được tạo bởi models khác
+        """
+        cache_path = osp.join(self.fg_path, self.DESCRIPTOR_CACHE_FILE)
+        if not osp.isfile(cache_path):
+            return {}
+        try:
+            with np.load(cache_path, allow_pickle=False) as data:
+                if str(data['models']) != models_key:
+                    log.info("Gallery descriptor cache was built with other models, ignoring it")
+                    return {}
+                descriptors = np.split(data['descriptors'], np.cumsum(data['counts'])[:-1])
+                return {
+                    osp.join(self.fg_path, file): ((int(mtime), int(size)), list(file_descriptors))
+                    for file, mtime, size, file_descriptors in zip(
+                        data['files'], data['mtimes'], data['sizes'], descriptors)
+                }
+        except (OSError, KeyError, ValueError) as e:
+            log.warning(f"Cannot read gallery descriptor cache {cache_path}: {e}")
+            return {}
+
+    def _save_descriptor_cache(self, models_key, fingerprints, file_descriptors):
+        """Lưu descriptors + fingerprint của từng ảnh gallery (ghi file tạm rồi replace)"""
+        cache_path = osp.join(self.fg_path, self.DESCRIPTOR_CACHE_FILE)
+        files = list(fingerprints)
+        descriptors = [desc for file in files for desc in file_descriptors[file]]
+        try:
+            with open(cache_path + '.tmp', 'wb') as cache_file:
+                np.savez(
+                    cache_file,
+                    models=np.array(models_key),
+                    files=np.array([osp.relpath(file, self.fg_path) for file in files], dtype=str),
+                    mtimes=np.array([fingerprints[file][0] for file in files], dtype=np.int64),
+                    sizes=np.array([fingerprints[file][1] for file in files], dtype=np.int64),
+                    counts=np.array([len(file_descriptors[file]) for file in files], dtype=np.int64),
+                    descriptors=(np.array(descriptors, dtype=np.float32) if descriptors
+                                 else np.empty((0, 0), dtype=np.float32))
+                )
+            os.replace(cache_path + '.tmp', cache_path)
+        except OSError as e:
+            log.warning(f"Cannot write gallery descriptor cache {cache_path}: {e}")
+
+    @staticmethod
+    def _whole_image_roi(image):
+        """ROI bao toàn bộ ảnh"""
+        return FaceDetector.Result([0, 0, 0, 0, 0, image.shape[1], image.shape[0]])
+
+    def _gallery_embeddings(self):
+        """
+        Descriptors của mọi identity trong một ma trận liên tục (M, D) float32 đã normalize,
+        kèm offset hàng đầu tiên của từng identity
+        """
+        if self._embeddings is None:
+            owners = self._row_owners[:self._row_count]
+            # Stable: descriptors của cùng identity giữ thứ tự thêm vào
+            order = np.argsort(owners, kind='stable')
+            embeddings = self._rows[order]
+            offsets = np.searchsorted(owners[order], np.arange(len(self.database)))
+            self._embeddings = (embeddings, offsets)
+        return self._embeddings
+
+    def _append_descriptor(self, desc, identity):
+        """Descriptor mới của database[identity]: normalize 1 lần, nối vào _rows và HNSW index (nếu đã build)"""
+        row = np.asarray(desc, dtype=np.float32).reshape(-1)
+        row = row / max(np.linalg.norm(row), 1e-12)
+        count = self._row_count
+        if self._rows is None:
+            self._rows = np.empty((16, len(row)), dtype=np.float32)
+            self._row_owners = np.empty(16, dtype=np.intp)
+        elif count == len(self._rows):
+            self._rows = np.concatenate([self._rows, np.empty_like(self._rows)])
+            self._row_owners = np.concatenate([self._row_owners, np.empty_like(self._row_owners)])
+        self._rows[count] = row
+        self._row_owners[count] = identity
+        self._row_count = count + 1
+        self._embeddings = None
+
+        if self._index is not None:
+            if count >= self._index.get_max_elements():
+                self._index.resize_index(max(2 * count, count + 1))
+            self._index.add_items(row[None], [count])
+
+    def _gallery_index(self):
+        """
+        HNSW index trên embeddings của gallery, build một lần rồi được add_item nối thêm
+
+        Returns:
+            HNSW index (item id = hàng của _rows), None nếu không có hnswlib hoặc gallery nhỏ
+        """
+        if self._index is None:
+            count = self._row_count
+            if hnswlib is None or count < self.ANN_MIN_SIZE:
+                return None
+            index = hnswlib.Index(space='cosine', dim=self._rows.shape[1])
+            index.init_index(max_elements=count, ef_construction=200, M=16)
+            index.add_items(self._rows[:count], np.arange(count))
+            index.set_ef(max(self.ANN_EF, self.ANN_K))
+            self._index = index
+            log.info(f"Built HNSW index for {count} gallery descriptors")
+        return self._index
+
+    def _distances(self, descriptors, exact=False):
+        """
+        Cosine distance (len(descriptors), len(database)), lấy min theo descriptors của mỗi identity
+
+        exact=True bỏ qua HNSW index, so với toàn bộ embeddings
+        """
+        if not self.database:
+            return np.empty((len(descriptors), 0))
+        probes = np.array(descriptors, dtype=np.float32).reshape(len(descriptors), -1)
+        probes /= np.maximum(np.linalg.norm(probes, axis=1, keepdims=True), 1e-12)
+
+        index = None if exact else self._gallery_index()
+        if index is not None:
+            # Chỉ ANN_K descriptors gần nhất có distance thật, identity còn lại = 1.0 (xa nhất)
+            labels, ann_distances = index.knn_query(probes, k=self.ANN_K, num_threads=1)
+            distances = np.ones((len(probes), len(self.database)))
+            # hnswlib 'cosine' = 1 - cosine_similarity -> chia 2 như cosine_dist; min theo identity
+            np.minimum.at(distances, (np.arange(len(probes))[:, None], self._row_owners[labels]),
+                          ann_distances * 0.5)
+            return distances
+        embeddings, offsets = self._gallery_embeddings()
+        # Giống Identity.cosine_dist: (1 - cosine_similarity) / 2, một phép nhân ma trận cho mọi cặp
+        distances = (1.0 - probes @ embeddings.T) * 0.5
+        # float64 như cosine_dist cũ: distance/confidence đi tiếp vào json.dumps của events
+        return np.minimum.reduceat(distances, offsets, axis=1).astype(np.float64)
+
     def match_faces(self, descriptors, match_algo='HUNGARIAN'):
         """Match faces với database"""
-        database = self.database
-        distances = np.empty((len(descriptors), len(database)))
-
-        for i, desc in enumerate(descriptors):
-            for j, identity in enumerate(database):
-                dist = []
-                for id_desc in identity.descriptors:
-                    dist.append(FacesDatabase.Identity.cosine_dist(desc, id_desc))
-                distances[i][j] = dist[np.argmin(dist)]
+        distances = self._distances(descriptors)
 
         matches = []
         # MIN_DIST: chọn face với khoảng cách nhỏ nhất
@@ -610,15 +1064,15 @@ class FacesDatabase:
 
     def check_if_face_exist(self, desc, threshold):
         """Kiểm tra xem face đã tồn tại chưa"""
-        match = -1
-        for j, identity in enumerate(self.database):
-            dist = []
-            for id_desc in identity.descriptors:
-                dist.append(FacesDatabase.Identity.cosine_dist(desc, id_desc))
-            if dist[np.argmin(dist)] < threshold:
-                match = j
-                break
-        return match
+        if not self.database:
+            return -1
+        # So thẳng với _rows (thứ tự thêm vào): không phải sắp lại embeddings sau mỗi descriptor của Pass 3
+        probe = np.asarray(desc, dtype=np.float32).reshape(-1)
+        probe = probe / max(np.linalg.norm(probe), 1e-12)
+        distances = (1.0 - self._rows[:self._row_count] @ probe) * 0.5
+        # Identity nhỏ nhất có descriptor dưới ngưỡng, như thứ tự duyệt database
+        owners = self._row_owners[:self._row_count][distances < threshold]
+        return int(owners.min()) if len(owners) else -1
 
     def check_if_label_exists(self, label):
         """Kiểm tra xem label đã tồn tại chưa"""
@@ -678,9 +1132,11 @@ class FacesDatabase:
 
         if match < 0:
             self.database.append(FacesDatabase.Identity(label, [desc]))
+            self._append_descriptor(desc, len(self.database) - 1)
         else:
             self.database[match].descriptors.append(desc)
             log.debug("Appending new descriptor for label {}.".format(label))
+            self._append_descriptor(desc, match)
 
         return match, label
 
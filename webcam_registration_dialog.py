@@ -240,11 +240,10 @@ class WebcamRegistrationDialog(QDialog):
         else:
             display_frame = frame
         
-        # Convert to QPixmap and display
-        rgb_image = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
+        # Convert to QPixmap and display (Format_BGR888: Qt đọc thẳng frame BGR, không cvtColor)
+        h, w, ch = display_frame.shape
+        bytes_per_line = display_frame.strides[0]
+        qt_image = QImage(display_frame.data, w, h, bytes_per_line, QImage.Format_BGR888)
         pixmap = QPixmap.fromImage(qt_image)
         scaled_pixmap = pixmap.scaled(640, 480, Qt.KeepAspectRatio, Qt.SmoothTransformation)
         self.video_label.setPixmap(scaled_pixmap)